@@ -31,8 +31,9 @@ import numpy as np
 # pyQT5 import
 from PyQt5.QtWidgets import QFileDialog, QApplication
 from PyQt5.QtWidgets import QMessageBox
+from PyQt5.QtGui import QPixmap
 
-from . import model, view, thread
+from . import model, view, thread, hdrviewer
 import hdrCore.image, hdrCore.processing, hdrCore.utils
 import hdrCore.coreC
 import preferences.preferences as pref
@@ -80,7 +81,9 @@ class GalleryMode(enum.Enum):
 # --- Class ImageWidgetController ---------------------------------------------
 # -----------------------------------------------------------------------------
 class ImageWidgetController:
-    """ image widget controller """
+    """ image widget controller 
+        zoom (editor, see enableZoom): double click toggles zoomed (1:1) viewport on the full size image, drag pans the viewport.
+    """
 
     def __init__(self, image=None,id = -1):
 
@@ -89,18 +92,73 @@ class ImageWidgetController:
 
         self._id = id # store an (unique) id 
 
+        # zoomed viewport
+        self.getProcessPipe = None      # function that returns edited process-pipe, None: zoom disabled
+        self.requestRoi = None          # guiQt.thread.RequestRoiCompute
+        self.zoomed = False
+        self.center = (0.5, 0.5)        # center of viewport relative to output image size
+        self.roiShape = None            # output image shape (full size)
+
         if isinstance(image, (np.ndarray, hdrCore.image.Image)):
             self.model.setImage(image)
             self.view.setPixmap(self.model.getColorData())
 
-    def setImage(self, image):
+    def setImage(self, image, qImage=None):
+        """ set image, qImage: image converted for display on a worker thread (see view.ImageWidgetView.toQImage) """
         self.model.setImage(image)
+        if self.zoomed:
+            # viewport is updated with new parameters, pixmap of full image is returned (gallery)
+            self.requestZoom()
+            return QPixmap.fromImage(qImage) if qImage != None else self.view.toQPixmap(self.model.getColorData())
+        if qImage != None: return self.view.setQImage(qImage)
         return self.view.setPixmap(self.model.getColorData())
 
     def setQPixmap(self, qPixmap):
         self.view.setQPixmap(qPixmap)
 
     def id(self): return self._id
+
+    # zoomed viewport -------------------------------------------------------------
+    def enableZoom(self, getProcessPipe):
+        self.getProcessPipe = getProcessPipe
+        self.requestRoi = thread.RequestRoiCompute(self)
+        self.view.zoomable = True
+
+    def toggleZoom(self, x, y):
+        """ double click at (x,y) (relative to image size): zoom 1:1 centered on (x,y) or back to full image """
+        if pref.verbose: print(" [CONTROL] >> ImageWidgetController.toggleZoom(",x,y,")")
+        if self.zoomed: self.resetZoom()
+        else:
+            self.zoomed = True
+            self.center = (x, y)
+            self.requestZoom()
+
+    def resetZoom(self):
+        if self.zoomed:
+            self.zoomed = False
+            self.requestRoi.cancel()
+            self.view.setPixmap(self.model.getColorData())
+
+    def pan(self, dx, dy):
+        """ drag of (dx,dy) pixels: move viewport """
+        if self.zoomed and self.roiShape:
+            x = min(max(0.0, self.center[0] - dx/self.roiShape[1]), 1.0)
+            y = min(max(0.0, self.center[1] - dy/self.roiShape[0]), 1.0)
+            self.center = (x, y)
+            self.requestZoom()
+
+    def requestZoom(self):
+        processPipe = self.getProcessPipe()
+        if processPipe: self.requestRoi.requestRoi(processPipe, self.center, (self.view.width(), self.view.height()))
+
+    def setRoiImage(self, roi, shape):
+        """ called when viewport image is computed (guiQt.thread.RequestRoiCompute) """
+        if not self.zoomed: return
+        self.roiShape = shape
+        # keep center inside image (viewport is clipped to image)
+        halfX, halfY = min(0.5, self.view.width()/2/shape[1]), min(0.5, self.view.height()/2/shape[0])
+        self.center = (min(max(halfX, self.center[0]), 1-halfX), min(max(halfY, self.center[1]), 1-halfY))
+        self.view.setPixmap(roi.colorData)
 # -----------------------------------------------------------------------------
 # --- Class ImageGalleryController --------------------------------------------
 # -----------------------------------------------------------------------------
@@ -198,9 +256,19 @@ class ImageGalleryController():
         if (idxImage < len(self.model.processPipes)):
             # update selected image
             processPipe = self.model.processPipes[idxImage]
+            if processPipe and processPipe.originalImage.isEmbeddedPreview():
+                # editor input of raw file: half size decoding (same processing as display and export), not the embedded preview
+                img = hdrCore.image.Image.read(processPipe.originalImage.path+'/'+processPipe.originalImage.name, thumb=True)
+                processPipe = model.EditImageModel.buildProcessPipe()
+                processPipe.setImage(img)
+                processPipe.compute()
+                self.model.processPipes[idxImage] = processPipe
             if processPipe:
                 if self.parent.dock.setProcessPipe(processPipe):
                     self.model.setSelectedImage(idxImage)
+                    # decode full size image for display, compare, export
+                    if pref.fullSizeCache['warmOnSelect']:
+                        thread.RunDecodeFullSize.request(processPipe.originalImage.path+'/'+processPipe.originalImage.name)
 
     def getSelectedProcessPipe(self):
         if pref.verbose:  print(" [CONTROL] >> ImageGalleryController.getSelectedProcessPipe()")
@@ -211,6 +279,7 @@ class ImageGalleryController():
         nbImagePage = GalleryMode.nbRow(self.view.shapeMode)*GalleryMode.nbCol(self.view.shapeMode)
         idxImageWidget = idxProcessPipe%nbImagePage
         if pref.verbose:  print(" >> ImageGalleryController.setProcessPipeWidgetQPixmap(...)[ image id:",idxProcessPipe,">> image widget controller:",idxImageWidget,"]")
+        self.model.tiles.pop(idxProcessPipe, None)     # display-ready image of loader is out of date
         self.view.imagesControllers[idxImageWidget].setQPixmap(qPixmap)
 
     def save(self):
@@ -267,6 +336,10 @@ class AppController(object):
 
         self.dirName = None
         self.imagesName = []
+
+        # full size decoded images cache
+        hdrCore.processing.DecodedImageCache.maxBytes = pref.fullSizeCache['budget']*1024*1024
+        hdrCore.processing.DecodedImageCache.maxAge = pref.fullSizeCache['maxAge']
         
         self.view.show()
     # -----------------------------------------------------------------------------
@@ -307,20 +380,18 @@ class AppController(object):
             originalImage.metadata.metadata['processpipe'] = selectedProcessPipe.toDict()
             originalImage.metadata.save()
 
-            # load full size image
-            img = hdrCore.image.Image.read(originalImage.path+'/'+originalImage.name)
+            # load full size image (decoded once, see hdrCore.processing.DecodedImageCache)
+            img = hdrCore.processing.DecodedImageCache.read(originalImage.path+'/'+originalImage.name, linear=True)
 
             # turn off: autoResize
             hdrCore.processing.ProcessPipe.autoResize = False 
-            # make a copy of selectedProcessPipe  
-            processpipe = copy.deepcopy(selectedProcessPipe)
 
             # set size to display size
             size = pref.getDisplayShape()
             img = img.process(hdrCore.processing.resize(),size=(None, size[1]))
 
-            # set image to process-pipe
-            processpipe.setImage(img)
+            # build process-pipe from snapshot of selectedProcessPipe (parameters only) and set image
+            processpipe = hdrCore.processing.ProcessPipe.fromSnapshot(selectedProcessPipe.snapshot(), img)
 
             thread.cCompute(self.callBackEndDisplay, processpipe, toneMap=False, progress=self.view.statusBar().showMessage)
     # -----------------------------------------------------------------------------
@@ -333,12 +404,9 @@ class AppController(object):
         
         self.view.statusBar().showMessage('displaying HDR image, full size image computation: done !')
 
-        # clip, scale
-        img = img.process(hdrCore.processing.clip())
-        img.colorData = img.colorData*pref.getDisplayScaling()
-
-        colour.write_image(img.colorData,"temp.hdr", method='Imageio') # local copy for display
-        self.hdrDisplay.displayFile("temp.hdr")
+        # clip, scale, display (live HDR preview in flight is dropped)
+        self.hdrDisplay.preview.cancel()
+        self.hdrDisplay.displayIMG(img)
     # -----------------------------------------------------------------------------
     def callBackCloseDisplayHDR(self):
         if pref.verbose: print(" [CONTROL] >> AppController.callBackCloseDisplayHDR()")
@@ -360,7 +428,7 @@ class AppController(object):
         if selectedProcessPipe:         # check if a process pipe is selected
 
             # read original image
-            img = hdrCore.image.Image.read(selectedProcessPipe.originalImage.path+'/'+selectedProcessPipe.originalImage.name)
+            img = hdrCore.processing.DecodedImageCache.read(selectedProcessPipe.originalImage.path+'/'+selectedProcessPipe.originalImage.name)
 
             # resize
             screenY, screenX = pref.getDisplayShape()
@@ -376,15 +444,11 @@ class AppController(object):
             # original image after resize
             ori = copy.deepcopy(img)
 
-            # build process pipe from selected one them compute
-            pp = hdrCore.processing.ProcessPipe()
+            # build process pipe from snapshot of selected one them compute
             hdrCore.processing.ProcessPipe.autoResize = False   # stop autoResize
-            params= []
-            for p in selectedProcessPipe.processNodes: 
-                pp.append(copy.deepcopy(p.process),paramDict=None, name=copy.deepcopy(p.name))
-                params.append({p.name:p.params})
-            img.metadata.metadata['processpipe'] = params
-            pp.setImage(img)
+            snapshot = selectedProcessPipe.snapshot()
+            img.metadata.metadata['processpipe'] = snapshot.toDict()
+            pp = hdrCore.processing.ProcessPipe.fromSnapshot(snapshot, img)
 
             res = hdrCore.coreC.coreCcompute(img, pp)
             res = res.process(hdrCore.processing.clip())
@@ -393,19 +457,12 @@ class AppController(object):
 
             hdrCore.processing.ProcessPipe.autoResize = True    # return to autoResize
 
-            # make comparison image
-            oriColorData = ori.colorData*pref.getDisplayScaling()
-            resColorData = res.colorData*pref.getDisplayScaling()
-            display = np.ones((screenY,screenX,3))*0.2
+            # display comparison: original (left), edited (right), live HDR preview in flight is dropped
             marginY = int((screenY - imgY)/2)
             marginYres = int((screenY - imgYres)/2)
-
-            display[marginY:marginY+imgY, marginX:marginX+imgX,:] = oriColorData
-            display[marginYres:marginYres+imgYres, 2*marginX+imgX:2*marginX+imgX+imgXres,:] = resColorData
-            
-            # save as compOrigFinal.hdr
-            colour.write_image(display,'compOrigFinal.hdr', method='Imageio')
-            self.hdrDisplay.displayFile('compOrigFinal.hdr')
+            self.hdrDisplay.preview.cancel()
+            self.hdrDisplay.display({'left': (ori.colorData, (marginY, marginX)), 
+                                     'right': (res.colorData, (marginYres, 2*marginX+imgX))}, pref.getDisplayScaling())
     # -----------------------------------------------------------------------------
     def callBackExportHDR(self):
         """
@@ -432,16 +489,13 @@ class AppController(object):
             originalImage.metadata.metadata['processpipe'] = selectedProcessPipe.toDict()
             originalImage.metadata.save()
 
-            # load full size image
-            img = hdrCore.image.Image.read(originalImage.path+'/'+originalImage.name)
+            # load full size image (decoded once, see hdrCore.processing.DecodedImageCache)
+            img = hdrCore.processing.DecodedImageCache.read(originalImage.path+'/'+originalImage.name, linear=True)
 
             # turn off: autoResize
             hdrCore.processing.ProcessPipe.autoResize = False 
-            # make a copy of selectedProcessPipe  
-            processpipe = copy.deepcopy(selectedProcessPipe)
-
-            # set image to process-pipe
-            processpipe.setImage(img)
+            # build process-pipe from snapshot of selectedProcessPipe (parameters only) and set image
+            processpipe = hdrCore.processing.ProcessPipe.fromSnapshot(selectedProcessPipe.snapshot(), img)
 
             thread.cCompute(self.callBackEndExportHDR, processpipe, toneMap=False, progress=self.view.statusBar().showMessage)
     # -----------------------------------------------------------------------------
@@ -463,8 +517,11 @@ class AppController(object):
 
             img.write(pathExport)
 
-        colour.write_image(img.colorData,"temp.hdr", method='Imageio') # local copy for display
-        self.hdrDisplay.displayFile("temp.hdr")
+        # display (already clipped and scaled) at display size, full size image is only exported
+        size = pref.getDisplayShape()
+        imgDisplay = img.process(hdrCore.processing.resize(),size=(None, size[1]))
+        self.hdrDisplay.preview.cancel()
+        self.hdrDisplay.display({'image': (imgDisplay.colorData, None)})
     # -----------------------------------------------------------------------------
     def callBackExportAllHDR(self):
         if pref.verbose:  print(" [CONTROL] >> AppController.callBackExportAllHDR()")
@@ -484,16 +541,13 @@ class AppController(object):
         originalImage.metadata.metadata['processpipe'] = pp.toDict()
         originalImage.metadata.save()
 
-        # load full size image
-        img = hdrCore.image.Image.read(originalImage.path+'/'+originalImage.name)
+        # load full size image (decoded once, see hdrCore.processing.DecodedImageCache)
+        img = hdrCore.processing.DecodedImageCache.read(originalImage.path+'/'+originalImage.name, linear=True)
 
         # turn off: autoResize
         hdrCore.processing.ProcessPipe.autoResize = False 
-        # make a copy of selectedProcessPipe  
-        processpipe = copy.deepcopy(pp)
-
-        # set image to process-pipe
-        processpipe.setImage(img)
+        # build process-pipe from snapshot of pp (parameters only) and set image
+        processpipe = hdrCore.processing.ProcessPipe.fromSnapshot(pp.snapshot(), img)
 
         thread.cCompute(self.callBackEndAllExportHDR, processpipe, toneMap=False, progress=self.view.statusBar().showMessage)            
     # -----------------------------------------------------------------------------
@@ -532,16 +586,13 @@ class AppController(object):
             originalImage.metadata.metadata['processpipe'] = pp.toDict()
             originalImage.metadata.save()
 
-            # load full size image
-            img = hdrCore.image.Image.read(originalImage.path+'/'+originalImage.name)
+            # load full size image (decoded once, see hdrCore.processing.DecodedImageCache)
+            img = hdrCore.processing.DecodedImageCache.read(originalImage.path+'/'+originalImage.name, linear=True)
 
             # turn off: autoResize
             hdrCore.processing.ProcessPipe.autoResize = False 
-            # make a copy of selectedProcessPipe  
-            processpipe = copy.deepcopy(pp)
-
-            # set image to process-pipe
-            processpipe.setImage(img)
+            # build process-pipe from snapshot of pp (parameters only) and set image
+            processpipe = hdrCore.processing.ProcessPipe.fromSnapshot(pp.snapshot(), img)
 
             thread.cCompute(self.callBackEndAllExportHDR, processpipe, toneMap=False, progress=self.view.statusBar().showMessage)            
 # ------------------------------------------------------------------------------------------
@@ -590,6 +641,7 @@ class EditImageController:
 
             # update view
             self.view.setProcessPipe(processPipe)
+            self.view.imageWidgetController.resetZoom()
             self.view.imageWidgetController.setImage(processPipe.getImage())
 
             self.view.plotToneCurve()
@@ -651,14 +703,15 @@ class EditImageController:
         if pref.verbose: print(" [CONTROL] >> EditImageController.changeGeometry(",values,")")
         if self.model.processpipe: self.model.changeGeometry(values)
     # -----------------------------------------------------------------------------
-    def updateImage(self,imgTM):
+    def updateImage(self,imgTM,qImage=None):
         """
         updateImage: called when process-pipe computation is done
             
         Args:
             imgTM (hdrCoreimage.Image, required): tone mapped image (resized) for GUI display
+            qImage (QImage, optional): imgTM converted for display (worker thread)
         """
-        qPixmap =  self.view.setImage(imgTM)
+        qPixmap =  self.view.setImage(imgTM,qImage)
         self.parent.controller.parent.controller.view.imageGalleryController.setProcessPipeWidgetQPixmap(qPixmap)
         self.view.plotToneCurve()
 
@@ -666,7 +719,7 @@ class EditImageController:
 
 
         if self.previewHDR and self.model.autoPreviewHDR:
-            self.controllerHDR.callBackUpdate()
+            self.controllerHDR.requestPreview(self.model.processpipe)
 # ------------------------------------------------------------------------------------------
 # ------------------------------------------------------------------------------------------
 # ------------------------------------------------------------------------------------------
@@ -958,6 +1011,10 @@ class LightnessMaskController():
 # ------------------------------------------------------------------------------------------
 # ------------------------------------------------------------------------------------------
 class HDRviewerController():
+    """controller of the HDR display: images are pasted in the display canvas (guiQt.hdrviewer.ViewerCanvas, reused, changed region only)
+        that is shown by the viewer adapter (guiQt.hdrviewer.ViewerAdapter: HDRImageViewer.exe or local stand-in viewer).
+        live HDR preview (auto preview HDR): edits are previewed at display resolution by a background job (guiQt.thread.RequestHDRPreview).
+    """
     def __init__(self, parent):
         if pref.verbose: print(" [CONTROL] >> HDRviewerController.__init__(",")")
 
@@ -965,20 +1022,34 @@ class HDRviewerController():
         self.model = model.HDRviewerModel(self)
         self.view = None 
 
-        self.viewerProcess = None
+        self.viewer = hdrviewer.ViewerAdapter.create()
+        self.preview = thread.RequestHDRPreview(self)         # live HDR preview (auto preview HDR)
 
         self.displaySplash()
 
     def setView(self, view): self.view = view
 
+    def canvas(self): return hdrviewer.ViewerCanvas.get(pref.getDisplayShape())
+
     def callBackUpdate(self):
         selectedProcessPipe = self.parent.view.imageGalleryController.model.getSelectedProcessPipe()
         img = selectedProcessPipe.getImage(toneMap = False)
+        self.preview.cancel()
         self.displayIMG(img)
         self.model.currentIMG = img
 
     def callBackAuto(self,on_off):
         self.parent.view.dock.view.childControllers[0].model.autoPreviewHDR = on_off
+        if not on_off: self.preview.cancel()
+
+    def requestPreview(self, processpipe):
+        """request live HDR preview of processpipe (computed at display resolution by a background job, see guiQt.thread.RequestHDRPreview)."""
+        self.preview.request(processpipe)
+
+    def displayPreview(self, img):
+        """display live HDR preview (computed, clipped image at display resolution)."""
+        self.display({'image': (img.colorData, None)}, pref.getDisplayScaling())
+        self.model.currentIMG = img
 
     def callBackCompare(self):
         if self.model.currentIMG:
@@ -989,77 +1060,50 @@ class HDRviewerController():
             img = sp.getImage(toneMap = False)
             img = img.process(hdrCore.processing.clip())
 
+            # side by side: images wider than half display (live HDR preview at display resolution) are resized
+            hD, wD = pref.getDisplayShape()
+            if old.colorData.shape[1] > wD//2: old = old.process(hdrCore.processing.resize(), size=(None, wD//2))
+            if img.colorData.shape[1] > wD//2: img = img.process(hdrCore.processing.resize(), size=(None, wD//2))
 
             h1, w1, _ = old.colorData.shape
             h2, w2, _ = img.colorData.shape
-            hD, wD = self.model.displayModel['shape']
             hM = int((hD - max(h1,h2))/2)
             wM = int((wD - (w1+w2))/3)
-            back =  np.ones((hD,wD,3))*0.2
 
-            back[hM:hM+h1,wM:wM+w1,:] = old.colorData*self.model.displayModel['scaling']
-            back[hM:hM+h2,2*wM+w1:2*wM+w1+w2,:] = img.colorData*self.model.displayModel['scaling']
-
-            # save as temp.hdr
-            colour.write_image(back,'temp.hdr', method='Imageio')
-            self.displayFile('temp.hdr')
+            self.preview.cancel()
+            self.display({'left': (old.colorData, (hM,wM)), 'right': (img.colorData, (hM,2*wM+w1))}, pref.getDisplayScaling())
 
             self.model.currentIMG = img
         else: self.callBackUpdate()
 
-    def displayFile(self, HDRfilename):
-        """
-        HDRviewerController display file: run HDRImageViewer process ti display HDR image (from filename)
+    def display(self, images, scaling=1.0):
+        """display images (other images of the display are cleared).
 
         Args:
-            HDRfilename: string
-                Required  : hdr image filename
-                
+            images: dict
+                Required  : key: slot name, value: (colour data, position (row, col) or None: centered)
+            scaling: float
+                Optional  : scaling of colour data (display scaling)
         """
-
-         # check that no current display process already open
-        if self.viewerProcess:
-            # the display HDR process is already running
-            # close current
-            subprocess.run(['taskkill', '/F', '/T', '/IM', "HDRImageViewer*"],capture_output=False)
-            time.sleep(0.05)
-        # run display HDR process
-        self.viewerProcess = subprocess.Popen(["HDRImageViewer.exe","-f", "-input:"+HDRfilename, "-f", "-h"], shell=True)
-        time.sleep(0.10)
-        psData = subprocess.run(['tasklist'], capture_output=True, universal_newlines=True).stdout
-        if not 'HDRImageViewer' in psData: 
-            # re-run display HDR process
-            self.viewerProcess = subprocess.Popen(["HDRImageViewer.exe","-f", "-input:"+HDRfilename, "-f", "-h"], shell=True)
+        canvas = self.canvas()
+        canvas.keep(list(images.keys()))
+        for slot, (colorData, position) in images.items(): canvas.paste(slot, colorData, position, scaling)
+        self.viewer.show(canvas)
+        if pref.verbose: print(" [CONTROL] >> HDRviewerController.display(",list(images.keys()),"): latency:", self.viewer.latency())
 
     def displayIMG(self, img):
         img = img.process(hdrCore.processing.clip())
-        colorData = img.colorData*self.model.displayModel['scaling']
-
-        h,w, _ = colorData.shape
-        hD, wD = self.model.displayModel['shape']
-
-        if w<wD:
-            back = np.ones((hD,wD,3))*0.2
-            marginW = int((wD-w)/2)
-            marginH = int((hD-h)/2)
-
-            back[marginH:marginH+h,marginW:marginW+w,:]=colorData
-
-        # save as temp.hdr
-        colour.write_image(back,'temp.hdr', method='Imageio')
-        self.displayFile('temp.hdr')
+        self.display({'image': (img.colorData, None)}, pref.getDisplayScaling())
 
     def displaySplash(self):
+        self.preview.cancel()
         self.model.currentIMG = None
-        self.displayFile('grey.hdr')
+        self.viewer.splash(self.canvas())
 
     def close(self):
-        # check that no current display process already open
-        if self.viewerProcess:
-            # the display HDR process is already running
-            # close current
-            subprocess.run(['taskkill', '/F', '/T', '/IM', "HDRImageViewer*"],capture_output=False)
-            self.viewerProcess = None
+        self.preview.cancel()
+        self.viewer.close()
+        hdrviewer.ViewerCanvas.release()
 # ------------------------------------------------------------------------------------------
 # ---- Class LchColorSelectorController ----------------------------------------------------
 # ------------------------------------------------------------------------------------------
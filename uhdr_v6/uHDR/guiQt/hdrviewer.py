@@ -0,0 +1,360 @@
+# uHDR: HDR image editing software
+#   Copyright (C) 2021  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020
+# author: remi.cozot@univ-littoral.fr
+
+# -----------------------------------------------------------------------------
+# --- Package hdrGUI ---------------------------------------------------------
+# -----------------------------------------------------------------------------
+"""
+package hdrGUI consists of the classes for GUI.
+
+module hdrviewer: canvas of the HDR display and adapters of the HDR viewer process.
+"""
+# -----------------------------------------------------------------------------
+# --- Import ------------------------------------------------------------------
+# -----------------------------------------------------------------------------
+import os, sys, time, tempfile, subprocess, threading, collections, multiprocessing, abc
+from multiprocessing import shared_memory
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# --- Class ViewerCanvas ------------------------------------------------------
+# -----------------------------------------------------------------------------
+class ViewerCanvas(object):
+    """
+    frame sent to the HDR display: float32 colour data in shared memory, one canvas per display shape (reused, GUI thread only):
+        - images are pasted in named slots (e.g. 'image', 'left', 'right'), the region of the previous image of a slot is cleared (background),
+        - only the changed region (dirty rectangle: union of cleared and pasted regions) is written, viewers read it from shared memory.
+
+    Attributes:
+        shape ((int,int)): display shape (height, width).
+        memory (multiprocessing.shared_memory.SharedMemory): shared memory of colour data.
+        colorData (numpy.ndarray): colour data (height, width, 3), float32, view of memory.
+        slots (dict): key: slot name, value: region (row min, row max, col min, col max) of image of slot.
+        dirty ((int,int,int,int)): changed region since last takeDirty(), None if unchanged.
+
+    Class attributes:
+        background (float): colour of background (grey).
+        canvases (dict): key: display shape, value: canvas.
+
+    Methods:
+        get (static)
+        release (static)
+        paste
+        keep
+        takeDirty
+    """
+    background = 0.2
+    canvases = {}
+
+    @staticmethod
+    def get(shape):
+        """returns the canvas of display shape (allocated once).
+
+            Args:
+                shape ((int,int), Required): display shape (height, width)
+
+            Returns:
+                (guiQt.hdrviewer.ViewerCanvas)
+        """
+        shape = (int(shape[0]), int(shape[1]))
+        if shape not in ViewerCanvas.canvases: ViewerCanvas.canvases[shape] = ViewerCanvas(shape)
+        return ViewerCanvas.canvases[shape]
+
+    @staticmethod
+    def release():
+        """releases shared memory of all canvases (quit)."""
+        for canvas in ViewerCanvas.canvases.values():
+            canvas.colorData = None
+            canvas.memory.close()
+            canvas.memory.unlink()
+        ViewerCanvas.canvases = {}
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.memory = shared_memory.SharedMemory(create=True, size=shape[0]*shape[1]*3*4)
+        self.colorData = np.ndarray((shape[0], shape[1], 3), dtype=np.float32, buffer=self.memory.buf)
+        self.colorData.fill(ViewerCanvas.background)
+        self.slots = {}
+        self.dirty = (0, shape[0], 0, shape[1])
+
+    def paste(self, slot, colorData, position=None, scaling=1.0):
+        """pastes colour data (scaled) in slot, the image previously pasted in slot is cleared.
+
+            Args:
+                slot (str, Required): slot name
+                colorData (numpy.ndarray, Required): colour data (height, width, 3), cropped to the canvas
+                position ((int,int), Optional): position (row, col) of upper left corner, default: centered
+                scaling (float, Optional): scaling factor of colour data (display scaling)
+
+            Returns:
+        """
+        h, w = colorData.shape[0], colorData.shape[1]
+        y, x = position if position else ((self.shape[0]-h)//2, (self.shape[1]-w)//2)
+
+        # crop to canvas
+        y0, y1 = max(y, 0), min(y+h, self.shape[0])
+        x0, x1 = max(x, 0), min(x+w, self.shape[1])
+        region = (y0, y1, x0, x1)
+
+        old = self.slots.get(slot)
+        if old and old != region: self.__clear(old)
+        if y1 > y0 and x1 > x0:
+            np.multiply(colorData[y0-y:y1-y, x0-x:x1-x, :3], scaling, out=self.colorData[y0:y1, x0:x1], casting='unsafe')
+            self.slots[slot] = region
+            self.__touch(region)
+        else: self.slots.pop(slot, None)
+
+    def keep(self, slots=()):
+        """clears images of slots that are not in slots.
+
+            Args:
+                slots (list of str, Optional): slots to keep, default: clear all
+
+            Returns:
+        """
+        for slot in [s for s in self.slots if s not in slots]: self.__clear(self.slots.pop(slot))
+
+    def takeDirty(self):
+        """returns the changed region since last call (None if unchanged) and resets it.
+
+            Args:
+
+            Returns:
+                ((int,int,int,int)): (row min, row max, col min, col max)
+        """
+        dirty, self.dirty = self.dirty, None
+        return dirty
+
+    def __clear(self, region):
+        y0, y1, x0, x1 = region
+        self.colorData[y0:y1, x0:x1] = ViewerCanvas.background
+        self.__touch(region)
+
+    def __touch(self, region):
+        if self.dirty: region = (min(region[0], self.dirty[0]), max(region[1], self.dirty[1]), min(region[2], self.dirty[2]), max(region[3], self.dirty[3]))
+        self.dirty = region
+# -----------------------------------------------------------------------------
+# --- Class ViewerAdapter -----------------------------------------------------
+# -----------------------------------------------------------------------------
+class ViewerAdapter(abc.ABC):
+    """
+    interface of the HDR viewer process (GUI thread): the canvas is shown by the viewer, frame latencies are recorded
+        (time from show() to the frame being available in the viewer).
+        abstract class: adapters implement show.
+
+    Attributes:
+        latencies (collections.deque): last frame latencies (s).
+
+    Methods:
+        create (static)
+        show
+        splash
+        latency
+        close
+    """
+    maxLatencies = 100
+
+    @staticmethod
+    def create():
+        """returns the adapter of the platform: HDRImageViewer.exe on Windows, local stand-in viewer otherwise.
+
+            Args:
+
+            Returns:
+                (guiQt.hdrviewer.ViewerAdapter)
+        """
+        return HDRImageViewerAdapter() if sys.platform == 'win32' else LocalViewerAdapter()
+
+    def __init__(self):
+        self.latencies = collections.deque(maxlen=ViewerAdapter.maxLatencies)
+
+    @abc.abstractmethod
+    def show(self, canvas):
+        """shows canvas (changed region only when the viewer supports it).
+
+            Args:
+                canvas (guiQt.hdrviewer.ViewerCanvas, Required)
+
+            Returns:
+        """
+
+    def splash(self, canvas):
+        """shows empty canvas."""
+        canvas.keep()
+        self.show(canvas)
+
+    def latency(self):
+        """returns frame latency statistics (s): {'last', 'mean', 'max', 'frames'}, None if no frame."""
+        latencies = list(self.latencies)
+        if not latencies: return None
+        return {'last': latencies[-1], 'mean': sum(latencies)/len(latencies), 'max': max(latencies), 'frames': len(latencies)}
+
+    def close(self): pass
+# -----------------------------------------------------------------------------
+# --- Class HDRImageViewerAdapter ---------------------------------------------
+# -----------------------------------------------------------------------------
+class HDRImageViewerAdapter(ViewerAdapter):
+    """
+    HDRImageViewer.exe (Windows): the viewer reads HDR files only (command line), each frame is written (whole canvas) to
+    a file of the temporary directory and the viewer process is restarted.
+    """
+    filename = os.path.join(tempfile.gettempdir(), 'uHDR_display.hdr')
+    splashFilename = 'grey.hdr'
+
+    def __init__(self):
+        super().__init__()
+        self.viewerProcess = None
+
+    def show(self, canvas):
+        start = time.perf_counter()
+        if canvas.takeDirty() or not os.path.exists(HDRImageViewerAdapter.filename):
+            import colour
+            colour.write_image(canvas.colorData, HDRImageViewerAdapter.filename, method='Imageio')
+        self.displayFile(HDRImageViewerAdapter.filename)
+        self.latencies.append(time.perf_counter()-start)
+
+    def splash(self, canvas):
+        canvas.keep()
+        if os.path.exists(HDRImageViewerAdapter.splashFilename): self.displayFile(HDRImageViewerAdapter.splashFilename)
+        else: self.show(canvas)
+
+    def displayFile(self, HDRfilename):
+        """run HDRImageViewer process to display HDR image (from filename)
+
+            Args:
+                HDRfilename (str, Required): hdr image filename
+
+            Returns:
+        """
+        # check that no current display process already open
+        if self.viewerProcess:
+            # the display HDR process is already running: close current
+            subprocess.run(['taskkill', '/F', '/T', '/IM', "HDRImageViewer*"],capture_output=False)
+            time.sleep(0.05)
+        # run display HDR process
+        self.viewerProcess = subprocess.Popen(["HDRImageViewer.exe","-f", "-input:"+HDRfilename, "-f", "-h"], shell=True)
+        time.sleep(0.10)
+        psData = subprocess.run(['tasklist'], capture_output=True, universal_newlines=True).stdout
+        if not 'HDRImageViewer' in psData:
+            # re-run display HDR process
+            self.viewerProcess = subprocess.Popen(["HDRImageViewer.exe","-f", "-input:"+HDRfilename, "-f", "-h"], shell=True)
+
+    def close(self):
+        if self.viewerProcess:
+            subprocess.run(['taskkill', '/F', '/T', '/IM', "HDRImageViewer*"],capture_output=False)
+            self.viewerProcess = None
+# -----------------------------------------------------------------------------
+# --- Class LocalViewerAdapter ------------------------------------------------
+# -----------------------------------------------------------------------------
+class LocalViewerAdapter(ViewerAdapter):
+    """
+    local stand-in viewer (Linux, tests): a viewer process (localViewer) copies the changed region of each frame from the
+    shared memory of the canvas, frames are notified through a pipe (no file), acknowledgements give the frame latency.
+
+    Attributes:
+        process (multiprocessing.Process): viewer process, started on first show().
+        connection (multiprocessing.connection.Connection): pipe to viewer process.
+        reader (threading.Thread): receives acknowledgements of viewer process.
+        frames (int): number of frames shown.
+        acknowledged (int): number of frames acknowledged by the viewer process.
+    """
+    def __init__(self):
+        super().__init__()
+        self.process = None
+        self.connection = None
+        self.reader = None
+        self.frames = 0
+        self.acknowledged = 0
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        self.connection, viewerConnection = context.Pipe()
+        self.process = context.Process(target=localViewer, args=(viewerConnection,), daemon=True)
+        self.process.start()
+        self.reader = threading.Thread(target=self.read, daemon=True)
+        self.reader.start()
+
+    def show(self, canvas):
+        dirty = canvas.takeDirty()
+        if not dirty: return
+        if not self.process: self.start()
+        self.frames += 1
+        self.connection.send((canvas.memory.name, canvas.shape, dirty, time.perf_counter()))
+
+    def read(self):
+        # acknowledgements: time of show() of each frame
+        try:
+            while True:
+                sent = self.connection.recv()
+                self.latencies.append(time.perf_counter()-sent)
+                self.acknowledged += 1
+        except (EOFError, OSError): pass
+
+    def waitFrames(self, timeout=5.0):
+        """waits until all frames shown are acknowledged by the viewer process (tests), returns True if they are."""
+        end = time.perf_counter()+timeout
+        while self.acknowledged < self.frames and time.perf_counter() < end: time.sleep(0.001)
+        return self.acknowledged >= self.frames
+
+    def close(self):
+        if self.process:
+            self.connection.send(None)
+            self.process.join(1.0)
+            self.connection.close()
+            self.process, self.connection = None, None
+# -----------------------------------------------------------------------------
+# --- Functions ----------------------------------------------------------------
+# -----------------------------------------------------------------------------
+def localViewer(connection):
+    """viewer process of LocalViewerAdapter: keeps its own frame up to date (changed regions), acknowledges each frame.
+
+        Args:
+            connection (multiprocessing.connection.Connection, Required): messages (shared memory name, shape, dirty region, time), None to quit
+
+        Returns:
+    """
+    memories, frame = {}, None
+    while True:
+        message = connection.recv()
+        if message is None: break
+        name, shape, (y0, y1, x0, x1), sent = message
+        if name not in memories: memories[name] = shared_memory.SharedMemory(name=name)     # same resource tracker as uHDR: unlinked by uHDR
+        colorData = np.ndarray((shape[0], shape[1], 3), dtype=np.float32, buffer=memories[name].buf)
+        if frame is None or frame.shape != colorData.shape:
+            frame = np.empty_like(colorData)
+            y0, y1, x0, x1 = 0, shape[0], 0, shape[1]
+        frame[y0:y1, x0:x1] = colorData[y0:y1, x0:x1]
+        del colorData
+        connection.send(sent)
+    for memory in memories.values(): memory.close()
+# -----------------------------------------------------------------------------
+# --- Main: frame latency of local viewer --------------------------------------
+# -----------------------------------------------------------------------------
+if __name__ == '__main__':
+    canvas = ViewerCanvas.get((2160, 3840))
+    adapter = LocalViewerAdapter()
+    rng = np.random.default_rng(0)
+    image = rng.random((1080, 1920, 3), dtype=np.float32)
+    for i in range(200):
+        canvas.keep(['image'])
+        canvas.paste('image', image, position=(540, 960+(i % 10)), scaling=12)
+        adapter.show(canvas)
+        adapter.waitFrames()
+    adapter.splash(canvas)
+    adapter.waitFrames()
+    print('local viewer frame latency:', adapter.latency())
+    adapter.close()
+    ViewerCanvas.release()
@@ -36,7 +36,7 @@ from datetime import datetime
 
 import hdrCore.image, hdrCore.utils, hdrCore.aesthetics, hdrCore.image
 from . import controller, thread
-import hdrCore.processing, hdrCore.quality
+import hdrCore.processing, hdrCore.quality, hdrCore.metadata
 import preferences.preferences as pref
 
 from PyQt5.QtCore import QRunnable
@@ -69,6 +69,8 @@ class ImageGalleryModel:
             imagesFilenames (list[str]): list of image filenames
             processPipes (list[hdrCore.porocessing.ProcessPipe]): list of process-pipes associated to images
             _selectedImage (int): index of current (selected) process-pipe
+            tiles (dict[int, QImage]): display-ready images (key: index of process-pipe) converted by loader at tileSize
+            tileSize (tuple[int,int]): size in device pixels of gallery images
 
             aestheticsModels (list[hdrCore.aesthetics.MultidimensionalImageAestheticsModel])
 
@@ -90,6 +92,8 @@ class ImageGalleryModel:
         self.imageFilenames = []
         self.processPipes = []
         self._selectedImage= -1
+        self.tiles = {}
+        self.tileSize = None
 
         self.aesthetics = []
 
@@ -109,6 +113,10 @@ class ImageGalleryModel:
 
         self.imageFilenames = list(filenames)
         self.imagesMetadata, self.processPipes =  [], [] # reset metadata and processPipes
+        self.tiles = {}
+
+        # exif of images without metadata file: single exiftool call
+        hdrCore.metadata.metadata.readExifBatch(self.imageFilenames)
 
         self.aestheticsModels = [] # reset aesthetics models
 
@@ -128,6 +136,10 @@ class ImageGalleryModel:
         nbImagePage = controller.GalleryMode.nbRow(self.controller.view.shapeMode)*controller.GalleryMode.nbCol(self.controller.view.shapeMode)
         min_,max_ = (nb*nbImagePage), ((nb+1)*nbImagePage)
 
+        # gallery images are converted for display by loader threads at the size of gallery images
+        tileSize = self.controller.view.tileSize()
+        if tileSize != self.tileSize: self.tileSize, self.tiles = tileSize, {}
+
         loadThreads = thread.RequestLoadImage(self)
 
         for i,f in enumerate(self.imageFilenames[min_:max_]): # load only the current page nb
@@ -136,7 +148,7 @@ class ImageGalleryModel:
                 self.controller.parent.statusBar().repaint()
                 loadThreads.requestLoad(min_,i, f)
             else:
-                self.controller.view.updateImage(i, self.processPipes[min_+i], f)
+                self.controller.view.updateImage(i, self.processPipes[min_+i], f, self.tiles.get(min_+i))
 
     def save(self):
         if pref.verbose:  print(" [MODEL] >> ImageGalleryModel.save()")
@@ -217,6 +229,7 @@ class EditImageModel(object):
 
         # create a RequestCompute
         self.requestCompute  = thread.RequestCompute(self)
+        self.requestCompute.getDisplaySize = lambda: self.controller.view.imageWidgetController.view.deviceSize()
 
     def getProcessPipe(self): return self.processpipe
 
@@ -224,10 +237,10 @@ class EditImageModel(object):
         if self.requestCompute.readyToRun:
             self.processpipe = processPipe
             self.requestCompute.setProcessPipe(self.processpipe)
-            self.processpipe.compute()
+            # output already computed with current parameters (loading or last edit): no computation
+            if not self.processpipe.isUpToDate(): self.processpipe.compute()
             if self.controller.previewHDR and self.autoPreviewHDR:
-                img = self.processpipe.getImage(toneMap = False)
-                self.controller.controllerHDR.displayIMG(img)
+                self.controller.controllerHDR.requestPreview(self.processpipe)
             return True
         else:
             return False
@@ -332,8 +345,7 @@ class EditImageModel(object):
         self.processpipe.compute()
 
         if self.controller.previewHDR and self.autoPreviewHDR:
-            img = self.processpipe.getImage(toneMap = False)
-            self.controller.controllerHDR.displayIMG(img)
+            self.controller.controllerHDR.requestPreview(self.processpipe)
 
         return self.processpipe.getImage()
 
@@ -393,8 +405,8 @@ class EditImageModel(object):
         id = self.processpipe.getProcessNodeByName("geometry")
         self.requestCompute.requestCompute(id,values)
 
-    def updateImage(self, imgTM):
-        self.controller.updateImage(imgTM)
+    def updateImage(self, imgTM, qImage=None):
+        self.controller.updateImage(imgTM, qImage)
 # ------------------------------------------------------------------------------------------
 # ------------------------------------------------------------------------------------------
 # ------------------------------------------------------------------------------------------
@@ -569,7 +581,7 @@ class HDRviewerModel(object):
         # current image
         self.currentIMG = None
 
-        self.displayModel = pref.getHDRdisplays()
+        self.displayModel = pref.getHDRdisplay()
 
     def scaling(self): 
         if pref.verbose: print(f" [MODEL] >> HDRviewerModel.scaling():{self.displayModel['scaling']}")
@@ -0,0 +1,267 @@
+# uHDR: HDR image editing software
+#   Copyright (C) 2021  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020
+# author: remi.cozot@univ-littoral.fr
+
+# -----------------------------------------------------------------------------
+# --- Package hdrGUI ---------------------------------------------------------
+# -----------------------------------------------------------------------------
+"""
+package hdrGUI consists of the classes for GUI.
+"""
+# -----------------------------------------------------------------------------
+# --- Import ------------------------------------------------------------------
+# -----------------------------------------------------------------------------
+import enum, threading
+from PyQt5.QtCore import QRunnable, QThreadPool
+import preferences.preferences as pref
+
+# -----------------------------------------------------------------------------
+# --- Class Priority ----------------------------------------------------------
+# -----------------------------------------------------------------------------
+class Priority(enum.IntEnum):
+    """
+    priority classes of jobs submitted to the scheduler, the highest value is run first:
+        - EDIT: interactive editing (process-pipe computation of the edited image),
+        - VISIBLE: loading of the images displayed in the current gallery page,
+        - PREFETCH: loading of images that are not yet displayed,
+        - BATCH: display HDR, export HDR, export all, aesthetics.
+    """
+    BATCH       = 0
+    PREFETCH    = 1
+    VISIBLE     = 2
+    EDIT        = 3
+# -----------------------------------------------------------------------------
+# --- Class JobScheduler ------------------------------------------------------
+# -----------------------------------------------------------------------------
+class JobScheduler(object):
+    """
+    central scheduler of all multithreading computations (loading, editing, display, export):
+        - jobs are started in the Qt thread pool according to their priority (guiQt.scheduler.Priority),
+        - jobs belong to an optional group that has a generation number: starting a new generation cancels the queued jobs of the previous ones,
+        - jobs have an optional key (image filename): a request for a key that is already queued is dropped.
+
+    Attributes:
+        pool (QThreadPool): Qt thread pool.
+        lock (threading.Lock): protects the scheduler state (jobs start and end on worker threads).
+        generations (dict): key: group name, value: current generation (int).
+        queued (set[guiQt.scheduler.Job]): jobs submitted but not yet started.
+        keys (dict): key: job key, value: queued job (guiQt.scheduler.Job).
+        running (dict): key: priority, value: number of running jobs.
+        counters (dict): number of submitted, started, done, cancelled and dropped jobs.
+
+    Methods:
+        instance (static)
+        generation
+        newGeneration
+        isCurrent
+        submit
+        queueDepth
+        metrics
+
+    Example:
+        scheduler = JobScheduler.instance()
+        scheduler.submit(RunLoadImage(...), Priority.VISIBLE, key=filename, group='gallery')
+    """
+    _instance = None
+
+    @staticmethod
+    def instance():
+        """returns the scheduler shared by the whole application (built on the Qt global thread pool).
+
+            Args:
+
+            Returns:
+                (guiQt.scheduler.JobScheduler)
+        """
+        if not JobScheduler._instance: JobScheduler._instance = JobScheduler(QThreadPool.globalInstance())
+        return JobScheduler._instance
+
+    def __init__(self, pool):
+
+        self.pool = pool
+        self.lock = threading.Lock()
+
+        self.generations = {}
+        self.queued = set()
+        self.keys = {}
+        self.running = {p: 0 for p in Priority}
+        self.counters = {'submitted': 0, 'started': 0, 'done': 0, 'cancelled': 0, 'dropped': 0}
+
+    def generation(self, group):
+        """returns the current generation of a group of jobs.
+
+            Args:
+                group (str, Required): group name
+
+            Returns:
+                (int)
+        """
+        with self.lock: return self.generations.get(group, 0)
+
+    def newGeneration(self, group):
+        """starts a new generation of a group of jobs: queued jobs of the group are removed from the thread pool,
+            jobs of the group already running are not interrupted but their owners can check isCurrent().
+
+            Args:
+                group (str, Required): group name
+
+            Returns:
+                (int): the new generation
+        """
+        with self.lock:
+            generation = self.generations.get(group, 0) + 1
+            self.generations[group] = generation
+            nbCancelled = 0
+            for job in list(self.queued):
+                if job.group == group and self.pool.tryTake(job):
+                    self._unqueue(job)
+                    self.counters['cancelled'] += 1
+                    nbCancelled += 1
+        if pref.verbose: print(" [SCHED] >> JobScheduler.newGeneration(",group,"):",generation,"cancelled:",nbCancelled)
+        return generation
+
+    def isCurrent(self, group, generation):
+        """returns True if generation is the current generation of group.
+
+            Args:
+                group (str, Required): group name
+                generation (int, Required): generation of the job
+
+            Returns:
+                (bool)
+        """
+        return self.generation(group) == generation
+
+    def submit(self, runnable, priority=Priority.BATCH, key=None, group=None):
+        """submits a runnable to the thread pool.
+
+            Args:
+                runnable (QRunnable, Required): object with a run() method
+                priority (guiQt.scheduler.Priority, Optional): priority class of the job
+                key (str, Optional): dedup key (image filename), a request for a queued key is dropped
+                    unless its priority is higher: the queued job is then replaced.
+                group (str, Optional): group of the job, see newGeneration()
+
+            Returns:
+                (bool): False if the request has been dropped
+        """
+        with self.lock:
+            generation = self.generations.get(group, 0)
+            if key != None and key in self.keys:
+                queuedJob = self.keys[key]
+                if queuedJob.generation == self.generations.get(queuedJob.group, 0) and queuedJob.priority >= priority:
+                    self.counters['dropped'] += 1
+                    return False
+                # stale or lower priority job: replace it
+                if self.pool.tryTake(queuedJob):
+                    self._unqueue(queuedJob)
+                    self.counters['cancelled'] += 1
+            job = Job(self, runnable, priority, key, group, generation)
+            self.queued.add(job)
+            if key != None: self.keys[key] = job
+            self.counters['submitted'] += 1
+        self.pool.start(job, int(priority))
+        return True
+
+    def queueDepth(self):
+        """returns the number of queued (not started) jobs per priority class.
+
+            Args:
+
+            Returns:
+                (dict): key: priority name, value: number of queued jobs
+        """
+        with self.lock:
+            res = {p.name: 0 for p in Priority}
+            for job in self.queued: res[job.priority.name] += 1
+            return res
+
+    def metrics(self):
+        """returns scheduler metrics: queue depth and running jobs per priority class, job counters.
+
+            Args:
+
+            Returns:
+                (dict)
+        """
+        queued = self.queueDepth()
+        with self.lock:
+            return {'queued':   queued,
+                    'running':  {p.name: n for p, n in self.running.items()},
+                    'threads':  self.pool.activeThreadCount(),
+                    **self.counters}
+
+    def _unqueue(self, job):
+        """removes job from the queued jobs, lock must be acquired."""
+        self.queued.discard(job)
+        if job.key != None and self.keys.get(job.key) is job: del self.keys[job.key]
+
+    def _begin(self, job):
+        """called by job before running: returns False if job belongs to a previous generation."""
+        with self.lock:
+            self._unqueue(job)
+            if job.group != None and job.generation != self.generations.get(job.group, 0):
+                self.counters['cancelled'] += 1
+                return False
+            self.running[job.priority] += 1
+            self.counters['started'] += 1
+            return True
+
+    def _end(self, job):
+        """called by job after running."""
+        with self.lock:
+            self.running[job.priority] -= 1
+            self.counters['done'] += 1
+# -----------------------------------------------------------------------------
+# --- Class Job ---------------------------------------------------------------
+# -----------------------------------------------------------------------------
+class Job(QRunnable):
+    """wraps a runnable submitted to the scheduler: skips it if its generation is over, updates scheduler metrics.
+
+        Attributes:
+            scheduler (guiQt.scheduler.JobScheduler): scheduler
+            runnable (QRunnable): wrapped runnable
+            priority (guiQt.scheduler.Priority): priority class
+            key (str): dedup key or None
+            group (str): group or None
+            generation (int): generation of group when the job has been submitted
+
+        Methods:
+            run
+    """
+    def __init__(self, scheduler, runnable, priority, key, group, generation):
+        super().__init__()
+        self.scheduler = scheduler
+        self.runnable = runnable
+        self.priority = Priority(priority)
+        self.key = key
+        self.group = group
+        self.generation = generation
+
+    def run(self):
+        """method called by the Qt Thread pool.
+
+            Args:
+
+            Returns:
+
+        """
+        if not self.scheduler._begin(self): return
+        try:
+            self.runnable.run()
+        finally:
+            self.scheduler._end(self)
+# -----------------------------------------------------------------------------
+# -----------------------------------------------------------------------------
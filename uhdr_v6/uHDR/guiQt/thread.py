@@ -23,50 +23,100 @@ package hdrGUI consists of the classes for GUI.
 # -----------------------------------------------------------------------------
 # --- Import ------------------------------------------------------------------
 # -----------------------------------------------------------------------------
-import copy, time, random
-import hdrCore
-from . import model
-from PyQt5.QtCore import QRunnable, Qt, QThreadPool
+import copy, time, random, threading, colour
+import numpy as np
+import hdrCore, hdrCore.processing, hdrCore.coreC
+from . import model, view
+from .scheduler import JobScheduler, Priority
+from PyQt5.QtCore import QObject, QRunnable, QTimer, Qt, pyqtSignal
 from timeit import default_timer as timer
 import preferences.preferences as pref
 
 # -----------------------------------------------------------------------------
 # --- Class RequestCompute ----------------------------------------------------
 # -----------------------------------------------------------------------------
-class RequestCompute(object):
+class RequestCompute(QObject):
     """
-    manage parallel (multithreading) computation of processpipe.compute() when editing image (not used for display HDR or export HDR):
-        - uses a single/specific thread to compute process-pipe,
-        - store compute request when user changes editing values, restart process-pipe computing when the previous one is finished.
+    manage parallel (multithreading) computation of processpipe when editing image (not used for display HDR or export HDR):
+        - each request (new editing values) gets a new generation number, its values are merged into the pending request (latest values win),
+        - a single computation is in flight: when it is over, the pending request (if any) is computed by the same job,
+          the hand-off of the pending request (values, generation) is done under lock so that the last request is always computed,
+        - computed images are sent to the GUI thread by the 'computed' signal then to parent (parent.updateImage()),
+          if getDisplaySize is set, they are converted for display (QImage, see guiQt.view.ImageWidgetView.toQImage) by the computation job,
+        - progressive preview (preferences.preview): while editing values arrive quickly (drag) a proxy of the input image is computed,
+          the input image is computed when they settle.
 
     Attributes:
         parent (guiQt.model.EditImageModel): reference to parent, used to callback parent when processing is over.
-        requestDict (dict): dict that stores editing values.
-        pool (QThreadPool): Qt thread pool.
+        scheduler (guiQt.scheduler.JobScheduler): job scheduler.
         processpipe (hdrCore.processing.Processpipe): active processpipe.
-        readyToRun (bool): True when no processing is ongoing, else False.
-        waitingUpdate (bool): True if requestCompute has been called during a processing.
+        lock (threading.Lock): protects requestDict, generation, computeGeneration, running, proxy and processpipe.
+        requestDict (dict): pending editing values, key: processNode id, value: processNode params.
+        generation (int): generation of last request.
+        computeGeneration (int): generation of last request taken by the computation job.
+        minGeneration (int): results of generations lower than minGeneration are dropped (processpipe changed).
+        running (bool): True when a computation job is submitted or running.
+        proxy (bool): True if pending request must be computed with the proxy input image.
+        lastRequestTime (float): time of last requestCompute.
+        settleTimer (QTimer): starts refinement when no requestCompute occurs during preferences.preview['settleDelay'] ms.
+        getDisplaySize (function): returns display size (width, height in device pixels) of computed images (GUI thread), None: no display conversion.
+        displaySize ((int,int)): display size of pending request.
+
+    Class attributes:
+        priority (guiQt.scheduler.Priority): priority of computation jobs.
+        progressive (bool): True if progressive preview is used.
 
     Methods:
+        readyToRun
         setProcessPipe
         requestCompute
+        refine
+        compute
+        process
         endCompute
     """
+    # signal: computed image, display QImage (None if no display conversion), generation (worker thread -> GUI thread)
+    computed = pyqtSignal(object, object, int)
+
+    priority = Priority.EDIT
+    progressive = True
 
     def __init__(self, parent):
+        super().__init__()
 
         self.parent = parent
 
-        self.requestDict= {} # store resqustCompute key:processNodeId, value: processNode params
-
-        self.pool = QThreadPool.globalInstance()        # get global pool
+        self.scheduler = JobScheduler.instance()        # get scheduler
         self.processpipe = None                         # processpipe ref
 
-        self.readyToRun = True
-        self.waitingUpdate = False
+        self.lock = threading.Lock()
+        self.requestDict= {} # store resqustCompute key:processNodeId, value: processNode params
+        self.generation = 0
+        self.computeGeneration = 0
+        self.minGeneration = 0
+        self.running = False
+
+        # progressive preview
+        self.proxy = False
+        self.lastRequestTime = 0.0
+        self.settleTimer = QTimer(self)
+        self.settleTimer.setSingleShot(True)
+        self.settleTimer.setInterval(pref.preview['settleDelay'])
+        self.settleTimer.timeout.connect(self.refine)
+
+        # display conversion
+        self.getDisplaySize = None
+        self.displaySize = None
+
+        self.computed.connect(self.endCompute)
+
+    @property
+    def readyToRun(self):
+        """True when no computation is submitted or running."""
+        with self.lock: return not self.running
 
     def setProcessPipe(self,pp):
-        """set the current active processpipe.
+        """set the current active processpipe: pending request and results of the previous processpipe are dropped.
 
             Args:
                 pp (hrdCore.processing.ProcessPipe, Required)
@@ -74,43 +124,117 @@ class RequestCompute(object):
             Returns:
                 
         """
-        self.processpipe = pp
+        with self.lock:
+            self.processpipe = pp
+            self.requestDict = {}
+            self.computeGeneration = self.generation
+            self.minGeneration = self.generation + 1
+        self.settleTimer.stop()
     
     def requestCompute(self, id, params):
-        """send new parameters for a process-node and request a new processpipe computation.
+        """send new parameters for a process-node and request a new processpipe computation (GUI thread).
 
             Args:
                 id (int, Required): index of process-node in processpipe
                 params (dict, Required): parameters of process-node 
 
+            Returns:
+                (int): generation of the request
+        """
+        params = copy.deepcopy(params)
+
+        # drag: compute proxy then refine when edits settle
+        now = timer()
+        proxy = self.progressive and pref.preview['enabled'] and (1000*(now - self.lastRequestTime) < pref.preview['dragInterval'])
+        self.lastRequestTime = now
+        if proxy: self.settleTimer.start()
+        else: self.settleTimer.stop()
+
+        with self.lock:
+            self.requestDict[id] = params
+            return self.submit(proxy)
+
+    def refine(self):
+        """called when edits have settled: request computation of the input image (last computation used the proxy).
+
+            Args:
+
             Returns:
                 
         """
-        self.requestDict[id] = copy.deepcopy(params)
+        if pref.verbose: print(" [THREAD] >> RequestCompute.refine()")
+        with self.lock: self.submit(False)
+
+    def submit(self, proxy):
+        """new generation, start computation job if none is running (lock must be acquired)."""
+        self.generation += 1
+        self.proxy = proxy
+        if self.getDisplaySize != None: self.displaySize = self.getDisplaySize()
+        if not self.running:
+            self.running = True
+            self.scheduler.submit(RunCompute(self), self.priority)
+        return self.generation
+
+    def compute(self):
+        """computes requests until no request is pending (worker thread), images are sent to GUI thread by 'computed' signal.
 
+            Args:
 
-        if self.readyToRun:
-            # start processing processpipe
-            self.pool.start(RunCompute(self))
+            Returns:
+
+        """
+        while True:
+            # atomic hand-off of pending request
+            with self.lock:
+                if self.computeGeneration == self.generation or self.processpipe == None:
+                    self.running = False
+                    return
+                generation = self.computeGeneration = self.generation
+                requestDict, self.requestDict = self.requestDict, {}
+                processpipe, proxy = self.processpipe, self.proxy
+                display, displaySize = self.getDisplaySize != None, self.displaySize
+
+            for k in requestDict.keys(): processpipe.setParameters(k,requestDict[k])
+            imgTM = self.process(processpipe, proxy)
+            qImage = view.ImageWidgetView.toQImage(imgTM.colorData, displaySize) if display else None
+            self.computed.emit(imgTM, qImage, generation)
+
+    def process(self, processpipe, proxy):
+        """computes processpipe, returns tone mapped output image.
+
+            Args:
+                processpipe (hdrCore.processing.Processpipe, Required)
+                proxy (bool, Required): True if proxy input image is used
+
+            Returns:
+                (hdrCore.image.Image)
+        """
+        cpp = True
+        if cpp:
+            # shallow copy: coreCcompute sets a new color data, prepared input image is not modified
+            if proxy: img = copy.copy(processpipe.getProxyInputImage(pref.preview['proxySize']))
+            else: img  = copy.copy(processpipe.getInputImage())
+            imgRes = hdrCore.coreC.coreCcompute(img, processpipe)
+            processpipe.setOutput(imgRes, proxy=proxy)
         else:
-            # if a computation is already running
-            self.waitingUpdate = True
+            processpipe.compute()
+        return processpipe.getImage(toneMap=True)
 
-    def endCompute(self):
-        """called when process-node computation is finished.
-            Get processed image and send it to parent (guiQt.model.EditImageModel).
-            If there are new requestCompute, restart computation of processpipe
+    def endCompute(self, imgTM, qImage, generation):
+        """called on GUI thread when a computation is finished: send processed image to parent (guiQt.model.EditImageModel).
 
         Args:
+            imgTM (hdrCore.image.Image, Required): computed image
+            qImage (QImage, Required): computed image converted for display, None if no display conversion
+            generation (int, Required): generation of the computed request
 
         Retruns:
 
         """
-        imgTM = self.processpipe.getImage(toneMap=True)
-        self.parent.updateImage(imgTM)
-        if self.waitingUpdate:
-            self.pool.start(RunCompute(self))
-            self.waitingUpdate = False
+        with self.lock:
+            if generation < self.minGeneration: return
+        if qImage != None: self.parent.updateImage(imgTM, qImage)
+        else: self.parent.updateImage(imgTM)
 # -----------------------------------------------------------------------------
 # --- Class RunCompute --------------------------------------------------------
 # -----------------------------------------------------------------------------
@@ -118,7 +242,7 @@ class RunCompute(QRunnable):
     """defines the run method that executes on a dedicated thread: processpipe computation.
     
         Attributes:
-            parent (guiQt.thread.RequestCompute): parent called.endCompute() when processing is over.
+            parent (guiQt.thread.RequestCompute): parent, parent.compute() computes requests.
 
         Methods:
             run
@@ -129,28 +253,331 @@ class RunCompute(QRunnable):
 
     def run(self):
         """method called by the Qt Thread pool.
-            Calls parent.endCompute() when process is over.
 
             Args:
 
             Returns:
 
         """
-        self.parent.readyToRun = False
-        for k in self.parent.requestDict.keys(): self.parent.processpipe.setParameters(k,self.parent.requestDict[k])
-        cpp = True
-        if cpp:
-            img  = copy.deepcopy(self.parent.processpipe.getInputImage())
-            imgRes = hdrCore.coreC.coreCcompute(img, self.parent.processpipe)
-            self.parent.processpipe.setOutput(imgRes)
-            self.parent.readyToRun = True
-            self.parent.endCompute()
-        else:
-            start = timer()
-            self.parent.processpipe.compute()
-            dt = timer() - start
-            self.parent.readyToRun = True
-            self.parent.endCompute()
+        self.parent.compute()
+# -----------------------------------------------------------------------------
+# --- Class RequestRoiCompute -------------------------------------------------
+# -----------------------------------------------------------------------------
+class RequestRoiCompute(QObject):
+    """
+    manage computation of the zoomed (1:1) viewport of the edited image: region of interest of the full size image (see hdrCore.processing.ProcessPipe.computeRoi):
+        - the full size image is read from hdrCore.processing.DecodedImageCache (decoded when the image is selected),
+        - a single computation is in flight, requests received meanwhile replace the pending one (latest wins),
+        - the region is computed by a process-pipe that keeps its computed tiles while parameters do not change: panning only computes new tiles,
+        - computed regions are sent to the GUI thread by the 'computed' signal then to parent (parent.setRoiImage()).
+
+    Attributes:
+        parent (guiQt.controller.ImageWidgetController): reference to parent, used to callback parent when processing is over.
+        scheduler (guiQt.scheduler.JobScheduler): job scheduler.
+        lock (threading.Lock): protects pending, generation and running.
+        pending (tuple): last request not computed (snapshot, filename, center, size).
+        generation (int): generation of last request.
+        running (bool): True when a computation job is submitted or running.
+        processpipe (hdrCore.processing.ProcessPipe): process-pipe (no input image) used by computation job only.
+
+    Methods:
+        requestRoi
+        cancel
+        compute
+        endCompute
+    """
+    # signal: region image, output image shape (full size), generation (worker thread -> GUI thread)
+    computed = pyqtSignal(object, object, int)
+
+    def __init__(self, parent):
+        super().__init__()
+
+        self.parent = parent
+        self.scheduler = JobScheduler.instance()
+
+        self.lock = threading.Lock()
+        self.pending = None
+        self.generation = 0
+        self.running = False
+        self.processpipe = None
+
+        self.computed.connect(self.endCompute)
+
+    def requestRoi(self, processpipe, center, size):
+        """request the computation of the region of interest (GUI thread).
+
+            Args:
+                processpipe (hdrCore.processing.ProcessPipe, Required): edited process-pipe (parameters are copied, see snapshot)
+                center ((float,float), Required): center of region (x, y) relative to output image size ([0,1])
+                size ((int,int), Required): size of region (width, height) in pixels
+
+            Returns:
+                (int): generation of the request
+        """
+        filename = processpipe.originalImage.path+'/'+processpipe.originalImage.name
+        with self.lock:
+            self.generation += 1
+            self.pending = (processpipe.snapshot(), filename, center, size)
+            if not self.running:
+                self.running = True
+                self.scheduler.submit(RunRoiCompute(self), Priority.EDIT)
+            return self.generation
+
+    def cancel(self):
+        """drop pending request and result of computation in flight."""
+        with self.lock:
+            self.generation += 1
+            self.pending = None
+
+    def compute(self):
+        """computes requests until no request is pending (worker thread).
+
+            Args:
+
+            Returns:
+
+        """
+        ended = False
+        try:
+            while True:
+                with self.lock:
+                    if self.pending == None:
+                        self.running = False
+                        ended = True
+                        return
+                    (snapshot, filename, center, size), self.pending = self.pending, None
+                    generation = self.generation
+
+                try:
+                    # update parameters of process nodes that have changed (computed tiles are kept if only geometry changed)
+                    if self.processpipe == None or len(self.processpipe.processNodes) != len(snapshot.nodes):
+                        self.processpipe = hdrCore.processing.ProcessPipe.fromSnapshot(snapshot)
+                    else:
+                        for i, (name, process, params) in enumerate(snapshot.nodes):
+                            if hdrCore.processing.ProcessPipeSnapshot.freeze(self.processpipe.processNodes[i].params) != params:
+                                self.processpipe.setParameters(i, hdrCore.processing.ProcessPipeSnapshot.thaw(params))
+
+                    source = hdrCore.processing.DecodedImageCache.read(filename, linear=True)
+
+                    # region of interest (output image coordinates at source resolution)
+                    shape = self.processpipe.getOutputMapping(source)[0]
+                    width, height = min(size[0], shape[1]), min(size[1], shape[0])
+                    x = min(max(0, int(center[0]*shape[1] - width/2)), shape[1] - width)
+                    y = min(max(0, int(center[1]*shape[0] - height/2)), shape[0] - height)
+                    roi = self.processpipe.compute(roi=(x, y, width, height), source=source)
+
+                    # tone mapping (see ProcessPipe.getImage)
+                    if roi.linear:
+                        roi.colorData = colour.cctf_encoding(roi.colorData, function='sRGB')
+                        roi.linear = False
+                    self.computed.emit(roi, shape, generation)
+                except Exception as e:
+                    # a failed request (read or computation) does not stop next requests
+                    print(" [ERROR] >> RequestRoiCompute.compute(",filename,"): failed", e)
+                    self.processpipe = None         # parameters may be partially set: rebuilt by next request
+        finally:
+            # job ends on an unexpected error: next request starts a new job
+            if not ended:
+                with self.lock: self.running = False
+
+    def endCompute(self, roi, shape, generation):
+        """called on GUI thread when a computation is finished: send region to parent if it is the last request.
+
+        Args:
+            roi (hdrCore.image.Image, Required): computed region (tone mapped)
+            shape ((int,int), Required): output image shape (full size)
+            generation (int, Required): generation of the computed request
+
+        Retruns:
+
+        """
+        with self.lock:
+            if generation != self.generation: return
+        self.parent.setRoiImage(roi, shape)
+# -----------------------------------------------------------------------------
+# --- Class RunRoiCompute -----------------------------------------------------
+# -----------------------------------------------------------------------------
+class RunRoiCompute(QRunnable):
+    """defines the run method that executes on a dedicated thread: region of interest computation.
+
+        Attributes:
+            parent (guiQt.thread.RequestRoiCompute): parent, parent.compute() computes requests.
+
+        Methods:
+            run
+    """
+    def __init__(self,parent):
+        super().__init__()
+        self.parent = parent
+
+    def run(self):
+        """method called by the Qt Thread pool."""
+        self.parent.compute()
+# -----------------------------------------------------------------------------
+# --- Class RequestHDRPreview -------------------------------------------------
+# -----------------------------------------------------------------------------
+class RequestHDRPreview(QObject):
+    """
+    manage the live HDR preview (auto preview HDR): edited image computed at display resolution by a background job:
+        - request() (GUI thread) keeps the last requested state only (image filename, processpipe snapshot): intermediate states are skipped,
+        - a single computation is in flight, computations start at most pref.hdrPreview['maxFps'] times per second,
+        - source image: full size decoded image (see hdrCore.processing.DecodedImageCache) resized to the display shape then linearized,
+          once per image and display shape,
+        - computed images (clipped) are sent to the GUI thread by the 'computed' signal then to parent (parent.displayPreview()),
+          that pastes them in the reused display canvas.
+
+    Attributes:
+        parent (guiQt.controller.HDRviewerController): reference to parent, used to display computed images.
+        scheduler (guiQt.scheduler.JobScheduler): job scheduler.
+        lock (threading.Lock): protects pending, running and generation.
+        pending ((str, hdrCore.processing.ProcessPipeSnapshot, (int,int))): last requested state (filename, snapshot, display shape), None if computed.
+        running (bool): True when a computation job is submitted or running.
+        generation (int): results of previous generations are dropped (see cancel).
+        lastStart (float): start time of last computation.
+        timer (QTimer): starts the next computation when the frame interval is over.
+        source ((str, (int,int), hdrCore.image.Image, bool)): filename, display shape, source image, True if output is sRGB encoded (job only).
+
+    Class attributes:
+        priority (guiQt.scheduler.Priority): priority of computation jobs (below editing).
+
+    Methods:
+        request
+        cancel
+        schedule
+        compute
+        getSource
+        endCompute
+    """
+    # signal: computed image (None if no image), generation (worker thread -> GUI thread)
+    computed = pyqtSignal(object, int)
+
+    priority = Priority.PREFETCH
+
+    def __init__(self, parent):
+        super().__init__()
+
+        self.parent = parent
+        self.scheduler = JobScheduler.instance()
+
+        self.lock = threading.Lock()
+        self.pending = None
+        self.running = False
+        self.generation = 0
+        self.lastStart = 0.0
+        self.source = None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.schedule)
+
+        self.computed.connect(self.endCompute)
+
+    def request(self, processpipe):
+        """request the preview of processpipe (GUI thread), only the last request is computed.
+
+            Args:
+                processpipe (hdrCore.processing.ProcessPipe, Required): edited processpipe
+
+            Returns:
+
+        """
+        original = processpipe.originalImage
+        with self.lock: self.pending = (original.path+'/'+original.name, processpipe.snapshot(), tuple(pref.getDisplayShape()))
+        self.schedule()
+
+    def cancel(self):
+        """drop pending request and result of running computation (GUI thread)."""
+        self.timer.stop()
+        with self.lock:
+            self.pending = None
+            self.generation += 1
+
+    def schedule(self):
+        """start computation of pending request if none is running and frame interval is over (GUI thread)."""
+        with self.lock:
+            if self.running or self.pending == None or self.timer.isActive(): return
+            delay = self.lastStart + 1.0/pref.hdrPreview['maxFps'] - timer()
+            if delay <= 0:
+                self.running = True
+                self.lastStart = timer()
+        if delay > 0: self.timer.start(int(delay*1000)+1)
+        else: self.scheduler.submit(RunHDRPreview(self), RequestHDRPreview.priority, key='hdrPreview')
+
+    def compute(self):
+        """compute last requested state (worker thread), pending request is taken when the job starts."""
+        with self.lock: state, self.pending, generation = self.pending, None, self.generation
+        img = None
+        try:
+            if state != None:
+                filename, snapshot, shape = state
+                source, encode = self.getSource(filename, shape)
+                img = hdrCore.coreC.coreCcompute(copy.copy(source), hdrCore.processing.ProcessPipe.fromSnapshot(snapshot))
+                # as ProcessPipe.getImage(toneMap=False)
+                if encode: img.colorData = colour.cctf_encoding(img.colorData, function='sRGB')
+                img = img.process(hdrCore.processing.clip())
+        except Exception as e:
+            print(" [ERROR] >> RequestHDRPreview.compute(",state[0] if state else None,"):", e)
+            img = None
+        self.computed.emit(img, generation)
+
+    def getSource(self, filename, shape):
+        """return source image of filename at display shape (linear) and True if output must be sRGB encoded (worker thread).
+
+            Args:
+                filename (str, Required): image filename
+                shape ((int,int), Required): display shape (height, width)
+
+            Returns:
+                (hdrCore.image.Image, bool)
+        """
+        if self.source and self.source[:2] == (filename, shape): return self.source[2], self.source[3]
+
+        img = hdrCore.processing.DecodedImageCache.read(filename)
+        encode = not img.linear
+        h, w = img.colorData.shape[0], img.colorData.shape[1]
+        size = (None, shape[1]) if h*shape[1] <= w*shape[0] else (shape[0], None)
+        img = img.process(hdrCore.processing.resize(), size=size)
+        if not img.linear:
+            img.colorData = np.float32(colour.cctf_decoding(img.colorData, function='sRGB'))
+            img.linear = True
+
+        self.source = (filename, shape, img, encode)
+        return img, encode
+
+    def endCompute(self, img, generation):
+        """called on GUI thread when a computation is finished: display computed image, schedule pending request.
+
+            Args:
+                img (hdrCore.image.Image, Required): computed image, None if no image
+                generation (int, Required): generation of the computed request
+
+            Returns:
+
+        """
+        with self.lock:
+            self.running = False
+            current = generation == self.generation
+        if img != None and current: self.parent.displayPreview(img)
+        self.schedule()
+# -----------------------------------------------------------------------------
+# --- Class RunHDRPreview -----------------------------------------------------
+# -----------------------------------------------------------------------------
+class RunHDRPreview(QRunnable):
+    """defines the run method that executes on a dedicated thread: live HDR preview computation.
+
+        Attributes:
+            parent (guiQt.thread.RequestHDRPreview): parent, parent.compute() computes requests.
+
+        Methods:
+            run
+    """
+    def __init__(self,parent):
+        super().__init__()
+        self.parent = parent
+
+    def run(self):
+        """method called by the Qt Thread pool."""
+        self.parent.compute()
 # -----------------------------------------------------------------------------
 # --- Class RequestLoadImage --------------------------------------------------
 # -----------------------------------------------------------------------------
@@ -159,9 +586,14 @@ class RequestLoadImage(object):
     manage parallel (multithreading) computation of loading images:
         - uses a new thread to load each image.
         - calls parent with process-pipe associated to loaded image
+        - each instance starts a new generation of the 'gallery' group: images of the previous page that are still queued are cancelled.
+        - loaded images are converted for display (QImage at parent.tileSize) by the loading thread, GUI thread only creates pixmaps.
     Attributes:
         parent (guiQt.model.ImageGalleryModel): reference to parent, used to callback parent when processing is over.
-        pool (QThreadPool): Qt thread pool.
+        tileSize (tuple[int,int]): size in device pixels of gallery images (None: no reduction).
+        scheduler (guiQt.scheduler.JobScheduler): job scheduler.
+        priority (guiQt.scheduler.Priority): priority of loading requests (VISIBLE: current page, PREFETCH: other pages).
+        generation (int): generation of the 'gallery' group.
         requestsDone (Dict): key is index of image in page 
             requestsDone[requestsDone]= True when image is loaded
 
@@ -171,10 +603,15 @@ class RequestLoadImage(object):
 
     """
 
-    def __init__(self, parent):
+    group = 'gallery'
+
+    def __init__(self, parent, priority=Priority.VISIBLE):
 
         self.parent = parent
-        self.pool = QThreadPool.globalInstance()        # get a global pool
+        self.tileSize = parent.tileSize
+        self.scheduler = JobScheduler.instance()        # get scheduler
+        self.priority = priority
+        self.generation = self.scheduler.newGeneration(RequestLoadImage.group)
         self.requestsDone = {}
 
     def requestLoad(self, minIdxInPage, imgIdxInPage, filename):
@@ -188,12 +625,13 @@ class RequestLoadImage(object):
             
         """
         self.requestsDone[minIdxInPage+ imgIdxInPage] = False
-        self.pool.start(RunLoadImage(self,minIdxInPage, imgIdxInPage,filename))
+        self.scheduler.submit(RunLoadImage(self,minIdxInPage, imgIdxInPage,filename), self.priority, key=filename, group=RequestLoadImage.group)
 
-    def endLoadImage(self,error,idx0, idx,processPipe, filename):
+    def endLoadImage(self,error,idx0, idx,processPipe, filename, qImage=None):
         """called when loading is over or failed (IOError, ValueError).
             Set process-pipe into parent (guiQt.model.ImageGalleryModel) then update view.
             If loading failed (IOError, ValueError) recall self.requestLoad()
+            The view is not updated if the page has changed since the request (generation is over).
 
         Args:
             error           (bool, Required): True if loading failed (take into account ValueError).
@@ -201,14 +639,17 @@ class RequestLoadImage(object):
             idx             (int, Required): index of image/processpipe in the current page.
             processPipe     (hrdCore.processing.ProcessPipe, Required):  process-pipe associated to loaded image.
             filename        (str, Required): filename of image
+            qImage          (QImage, Optional): image of process-pipe converted for display at tileSize
 
         Returns:
         """
+        current = self.scheduler.isCurrent(RequestLoadImage.group, self.generation)
         if not error:
             self.requestsDone[idx0 + idx] = True
             self.parent.processPipes[idx0 + idx]= processPipe
-            self.parent.controller.view.updateImage(idx,processPipe, filename)
-        else:
+            if qImage != None and self.tileSize == self.parent.tileSize: self.parent.tiles[idx0 + idx] = qImage
+            if current: self.parent.controller.view.updateImage(idx,processPipe, filename, qImage)
+        elif current:
             self.requestLoad(idx0, idx, filename)
 # -----------------------------------------------------------------------------
 # --- Class RunLoadImage ------------------------------------------------------
@@ -233,14 +674,57 @@ class RunLoadImage(QRunnable):
         Returns:
         """
         try:
-            image_ = hdrCore.image.Image.read(self.filename, thumb=True)
+            # raw file: embedded preview is allowed for gallery display (editor input is decoded on selection, see ImageGalleryController.selectImage)
+            image_ = hdrCore.image.Image.read(self.filename, thumb=True, embedded=True)
             processPipe = model.EditImageModel.buildProcessPipe()
             processPipe.setImage(image_)                      
             processPipe.compute()
-            self.parent.endLoadImage(False, self.minIdxInPage, self.imgIdxInPage, processPipe, self.filename)
+            # display conversion at the size of gallery images: not on the GUI thread
+            qImage = view.ImageWidgetView.toQImage(processPipe.getImage().colorData, self.parent.tileSize)
+            self.parent.endLoadImage(False, self.minIdxInPage, self.imgIdxInPage, processPipe, self.filename, qImage)
         except(IOError, ValueError) as e:
             self.parent.endLoadImage(True, self.minIdxInPage, self.imgIdxInPage, None, self.filename)
 # -----------------------------------------------------------------------------
+# --- Class RunDecodeFullSize -------------------------------------------------
+# -----------------------------------------------------------------------------
+class RunDecodeFullSize(QRunnable):
+    """
+    speculative decoding of the full size image of the selected image into hdrCore.processing.DecodedImageCache:
+    display, compare and export of the selected image then start without reading the image file.
+
+    Attributes:
+        filename (str): image filename
+        linear (bool): True to decode to linear (as process-pipe input)
+
+    Static methods:
+        request
+    """
+
+    group = 'fullsize'
+
+    def __init__(self, filename, linear=True):
+        super().__init__()
+        self.filename = filename
+        self.linear = linear
+
+    @staticmethod
+    def request(filename):
+        """submits decoding of filename (PREFETCH priority), decoding of the previously selected image is cancelled if not started.
+
+        Args:
+            filename (str, Required): image filename
+        """
+        scheduler = JobScheduler.instance()
+        scheduler.newGeneration(RunDecodeFullSize.group)
+        scheduler.submit(RunDecodeFullSize(filename), Priority.PREFETCH, key=RunDecodeFullSize.group+':'+filename, group=RunDecodeFullSize.group)
+
+    def run(self):
+        """method called by the Qt Thread pool."""
+        try:
+            hdrCore.processing.DecodedImageCache.warm(self.filename, self.linear)
+        except(IOError, ValueError) as e:
+            if pref.verbose: print(" [THREAD] >> RunDecodeFullSize.run(",self.filename,"): failed", e)
+# -----------------------------------------------------------------------------
 # --- Class pCompute ----------------------------------------------------------
 # -----------------------------------------------------------------------------
 class pCompute(object):
@@ -262,7 +746,7 @@ class pCompute(object):
         endCompute
     """
 
-    def __init__(self, callBack, processpipe,nbWidth,nbHeight, toneMap=True, progress=None, meta=None):
+    def __init__(self, callBack, processpipe,nbWidth,nbHeight, toneMap=True, progress=None, meta=None, priority=Priority.BATCH):
         self.callBack = callBack
         self.progress =progress
         self.nbSplits = nbWidth*nbHeight
@@ -272,25 +756,28 @@ class pCompute(object):
         # recover and split image
         input =  processpipe.getInputImage()
 
-        # store last processNode (geometry) and remove it from processpipe
-        if isinstance(processpipe.processNodes[-1].process,hdrCore.processing.geometry):
-            self.geometryNode = copy.deepcopy(processpipe.processNodes[-1]) 
+        # snapshot of processpipe: parameters only, processpipe is not modified
+        snapshot = processpipe.snapshot()
+
+        # store last processNode (geometry) and remove it from snapshot
+        if issubclass(snapshot.nodes[-1][1],hdrCore.processing.geometry):
+            name, process, params = snapshot.nodes[-1]
+            self.geometryNode = hdrCore.processing.ProcessPipe.ProcessNode(process(), paramDict=hdrCore.processing.ProcessPipeSnapshot.thaw(params), name=name)
 
             # remove geometry node (the last one) 
-            processpipe.processNodes = processpipe.processNodes[:-1]
+            snapshot = hdrCore.processing.ProcessPipeSnapshot(snapshot.nodes[:-1])
        
         # split image and store splited images
         self.splits = input.split(nbWidth,nbHeight)
 
-        self.pool = QThreadPool.globalInstance() 
+        self.scheduler = JobScheduler.instance()
 
-        # duplicate processpipe, set image split and start
+        # build processpipe from snapshot, set image split and start
         for idxY,line in enumerate(self.splits):
             for idxX,split in enumerate(line):
-                pp = copy.deepcopy(processpipe)
-                pp.setImage(split)
+                pp = hdrCore.processing.ProcessPipe.fromSnapshot(snapshot, split)
                 # start compute
-                self.pool.start(pRun(self,pp,toneMap,idxX,idxY))
+                self.scheduler.submit(pRun(self,pp,toneMap,idxX,idxY), priority)
 
     def endCompute(self,idx,idy, split):
         """
@@ -350,15 +837,15 @@ class cCompute(object):
     """xxx
     """
 
-    def __init__(self, callBack, processpipe, toneMap=True, progress=None):
+    def __init__(self, callBack, processpipe, toneMap=True, progress=None, priority=Priority.BATCH):
         self.callBack = callBack
         self.progress =progress
 
         # recover image
         input =  processpipe.getInputImage()
 
-        self.pool = QThreadPool.globalInstance() 
-        self.pool.start(cRun(self,processpipe,toneMap))
+        self.scheduler = JobScheduler.instance()
+        self.scheduler.submit(cRun(self,processpipe,toneMap), priority)
 
     def endCompute(self, img):
         """
@@ -393,7 +880,7 @@ class cRun(QRunnable):
         Returns:
         
         """
-        img  = copy.deepcopy(self.processpipe.getInputImage())
+        img  = copy.copy(self.processpipe.getInputImage())
         imgRes = hdrCore.coreC.coreCcompute(img, self.processpipe)
         self.processpipe.setOutput(imgRes)
 
@@ -405,114 +892,30 @@ class cRun(QRunnable):
 # -----------------------------------------------------------------------------
 # --- Class RequestAestheticsCompute ----------------------------------------------------
 # -----------------------------------------------------------------------------
-class RequestAestheticsCompute(object):
+class RequestAestheticsCompute(RequestCompute):
     """
-    manage parallel (multithreading) computation of processpipe.compute() when editing image (not used for display HDR or export HDR):
-        - uses a single/specific thread to compute process-pipe,
-        - store compute request when user changes editing values, restart process-pipe computing when the previous one is finished.
-
-    Attributes:
-        parent (guiQt.model.EditImageModel): reference to parent, used to callback parent when processing is over.
-        requestDict (dict): dict that stores editing values.
-        pool (QThreadPool): Qt thread pool.
-        processpipe (hdrCore.processing.Processpipe): active processpipe.
-        readyToRun (bool): True when no processing is ongoing, else False.
-        waitingUpdate (bool): True if requestCompute has been called during a processing.
+    manage parallel (multithreading) computation of processpipe.compute() for aesthetics (see guiQt.thread.RequestCompute):
+        - python computation of processpipe (processpipe.compute()), no progressive preview,
+        - computation jobs are submitted with Priority.BATCH.
 
     Methods:
-        setProcessPipe
-        requestCompute
-        endCompute
+        process
     """
 
-    def __init__(self, parent):
-
-        self.parent = parent
-
-        self.requestDict= {} # store resqustCompute key:processNodeId, value: processNode params
-
-        self.pool = QThreadPool.globalInstance()        # get global pool
-        self.processpipe = None                         # processpipe ref
-
-        self.readyToRun = True
-        self.waitingUpdate = False
-
-    def setProcessPipe(self,pp):
-        """set the current active processpipe.
-
-            Args:
-                pp (hrdCore.processing.ProcessPipe, Required)
-
-            Returns:
-                
-        """
-        self.processpipe = pp
-    
-    def requestCompute(self, id, params):
-        """send new parameters for a process-node and request a new processpipe computation.
-
-            Args:
-                id (int, Required): index of process-node in processpipe
-                params (dict, Required): parameters of process-node 
-
-            Returns:
-                
-        """
-        self.requestDict[id] = copy.deepcopy(params)
-
-        if self.readyToRun:
-            # start processing processpipe
-            self.pool.start(RunAestheticsCompute(self))
-        else:
-            # if a computation is already running
-            self.waitingUpdate = True
-
-    def endCompute(self):
-        """called when process-node computation is finished.
-            Get processed image and send it to parent (guiQt.model.EditImageModel).
-            If there are new requestCompute, restart computation of processpipe
-
-        Args:
-
-        Retruns:
-
-        """
-        imgTM = self.processpipe.getImage(toneMap=True)
-        self.parent.updateImage(imgTM)
-        if self.waitingUpdate:
-            self.pool.start(RunAestheticsCompute(self))
-            self.waitingUpdate = False
-# -----------------------------------------------------------------------------
-# --- Class RunCompute --------------------------------------------------------
-# -----------------------------------------------------------------------------
-class RunAestheticsCompute(QRunnable):
-    """defines the run method that executes on a dedicated thread: processpipe computation.
-    
-        Attributes:
-            parent (guiQt.thread.RequestCompute): parent called.endCompute() when processing is over.
+    priority = Priority.BATCH
+    progressive = False
 
-        Methods:
-            run
-    """
-    def __init__(self,parent):
-        super().__init__()
-        self.parent = parent
-
-    def run(self):
-        """method called by the Qt Thread pool.
-            Calls parent.endCompute() when process is over.
+    def process(self, processpipe, proxy):
+        """computes processpipe (python), returns tone mapped output image.
 
             Args:
+                processpipe (hdrCore.processing.Processpipe, Required)
+                proxy (bool, Required): not used
 
             Returns:
-
+                (hdrCore.image.Image)
         """
-        self.parent.readyToRun = False
-        for k in self.parent.requestDict.keys(): self.parent.processpipe.setParameters(k,self.parent.requestDict[k])
-        start = timer()
-        self.parent.processpipe.compute()
-        dt = timer() - start
-        self.parent.readyToRun = True
-        self.parent.endCompute()
+        processpipe.compute()
+        return processpipe.getImage(toneMap=True)
 # -----------------------------------------------------------------------------
 # -----------------------------------------------------------------------------
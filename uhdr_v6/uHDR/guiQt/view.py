@@ -54,17 +54,39 @@ import preferences.preferences as pref
 # --- class ImageWidgetView(QWidget) -------------------------------------------------------
 # ------------------------------------------------------------------------------------------
 class ImageWidgetView(QWidget):
-    """description of class"""
+    """image widget: display of float color data ([0,1], RGB).
+        display conversion (toQImage, any thread): color data is reduced (integer factor box filter) to the device pixel size of the widget,
+        then converted by a float -> 8 bits look up table (optional ordered dithering) straight into the memory of a QImage, color data is never modified.
+    """
+    # float -> 8 bits look up table: 16 input levels per 8 bits level
+    lutSize = 4096
+    lut = (np.arange(lutSize)*256//lutSize).astype(np.uint8)
+    # ordered dithering: offsets in [0,16[ input levels
+    bayer = np.asarray([[ 0, 8, 2,10],
+                        [12, 4,14, 6],
+                        [ 3,11, 1, 9],
+                        [15, 7,13, 5]], dtype=np.float32)
 
     def __init__(self,controller,colorData = None):
         super().__init__()
         self.controller = controller
         self.label = QLabel(self)   # create a QtLabel for pixmap
+        # color data displayed (not copied, None if pixmap is set) and its reduction factor
+        self.colorData = None
+        self.reduction = 1
         if not isinstance(colorData, np.ndarray): colorData = ImageWidgetView.emptyImageColorData()
         # self.colorData = colorData  # image content attributes           
         self.setPixmap(colorData)  
 
+        # zoom: double click, drag (see controller.ImageWidgetController.enableZoom)
+        self.zoomable = False
+        self.dragPosition = None
+
     def resize(self):
+        # widget larger than reduced color data: convert again
+        if isinstance(self.colorData, np.ndarray) and self.reduction > ImageWidgetView.reductionFactor(self.colorData.shape, self.deviceSize()):
+            self.setPixmap(self.colorData)
+            return
         self.label.resize(self.size())
         self.label.setPixmap(self.imagePixmap.scaled(self.size(),Qt.KeepAspectRatio))
 
@@ -72,26 +94,107 @@ class ImageWidgetView(QWidget):
         self.resize()
         super().resizeEvent(event)
 
+    def deviceSize(self):
+        """ (width, height) of widget in device pixels, None if widget is not visible (size not set by layout) """
+        if not self.isVisible(): return None
+        ratio = self.devicePixelRatioF()
+        return (int(self.width()*ratio), int(self.height()*ratio))
+
     def setPixmap(self,colorData):
-        if not isinstance(colorData, np.ndarray): 
-            colorData = ImageWidgetView.emptyImageColorData()
-        # self.colorData = colorData
-        height, width, channel = colorData.shape   # compute pixmap
-        bytesPerLine = channel * width
-        # clip
-        colorData[colorData>1.0] = 1.0
-        colorData[colorData<0.0] = 0.0
-
-        qImg = QImage((colorData*255).astype(np.uint8), width, height, bytesPerLine, QImage.Format_RGB888) # QImage
-        self.imagePixmap = QPixmap.fromImage(qImg)
+        if not isinstance(colorData, np.ndarray): colorData = ImageWidgetView.emptyImageColorData()
+        size = self.deviceSize()
+
+        self.colorData = colorData
+        self.reduction = ImageWidgetView.reductionFactor(colorData.shape, size)
+        self.imagePixmap = QPixmap.fromImage(ImageWidgetView.toQImage(colorData, size))
         self.resize()
 
         return self.imagePixmap
 
+    @staticmethod
+    def toQPixmap(colorData):
+        return QPixmap.fromImage(ImageWidgetView.toQImage(colorData))
+
+    @staticmethod
+    def reductionFactor(shape, size):
+        """ largest integer factor that keeps image (shape) at least as large as its display (keep aspect ratio) in size (width, height) """
+        if size == None: return 1
+        height, width = shape[0], shape[1]
+        return max(1, int(max(width/max(1,size[0]), height/max(1,size[1]))))
+
+    @staticmethod
+    def toQImage(colorData, size=None, dither=False):
+        """convert color data ([0,1], RGB) to QImage (RGB888): any thread, colorData is not modified.
+
+        Args:
+            colorData (numpy.ndarray, Required): color data, empty image if None
+            size ((int,int), Optional): display size (width, height) in device pixels, color data is reduced by an integer factor to fit it
+            dither (bool, Optional): ordered dithering
+
+        Returns:
+            (QImage)
+        """
+        if not isinstance(colorData, np.ndarray): colorData = ImageWidgetView.emptyImageColorData()
+
+        # reduction: box filter
+        factor = ImageWidgetView.reductionFactor(colorData.shape, size)
+        if factor > 1:
+            height, width = (colorData.shape[0]//factor)*factor, (colorData.shape[1]//factor)*factor
+            colorData = colorData[:height,:width,:].reshape(height//factor, factor, width//factor, factor, -1).mean(axis=(1,3))
+
+        height, width, _ = colorData.shape
+
+        # look up table index (new array: colorData is not modified)
+        index = np.empty(colorData.shape, dtype=np.intp)
+        if dither:  np.add(colorData*(ImageWidgetView.lutSize-1), np.tile(ImageWidgetView.bayer, (height//4+1, width//4+1))[:height,:width,np.newaxis], out=index, casting='unsafe')
+        else:       np.multiply(colorData, ImageWidgetView.lutSize-1, out=index, casting='unsafe')
+
+        # look up (index out of table: color data out of [0,1], clipped) written in QImage memory (rows are aligned on 32 bits)
+        qImage = QImage(width, height, QImage.Format_RGB888)
+        bits = qImage.bits()
+        bits.setsize(qImage.sizeInBytes())
+        pixels = np.ndarray((height, width, 3), dtype=np.uint8, buffer=bits, strides=(qImage.bytesPerLine(), 3, 1))
+        np.take(ImageWidgetView.lut, index, out=pixels, mode='clip')
+
+        return qImage
+
+    def setQImage(self, qImage):
+        """ set image converted on a worker thread (see toQImage) """
+        self.setQPixmap(QPixmap.fromImage(qImage))
+        return self.imagePixmap
+
     def setQPixmap(self, qPixmap):
+        self.colorData = None
+        self.reduction = 1
         self.imagePixmap = qPixmap
         self.resize()
 
+    def imagePosition(self, pos):
+        """ position (x,y) relative to displayed image size of widget position pos """
+        size = self.imagePixmap.size().scaled(self.size(),Qt.KeepAspectRatio)
+        x = pos.x()/max(1,size.width())
+        y = (pos.y() - (self.height() - size.height())/2)/max(1,size.height())
+        return min(max(0.0,x),1.0), min(max(0.0,y),1.0)
+
+    def mouseDoubleClickEvent(self, event):
+        if self.zoomable: self.controller.toggleZoom(*self.imagePosition(event.pos()))
+        super().mouseDoubleClickEvent(event)
+
+    def mousePressEvent(self, event):
+        if self.zoomable: self.dragPosition = event.pos()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self.zoomable and self.dragPosition != None:
+            delta = event.pos() - self.dragPosition
+            self.dragPosition = event.pos()
+            self.controller.pan(delta.x(), delta.y())
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self.dragPosition = None
+        super().mouseReleaseEvent(event)
+
     def emptyImageColorData(): return np.ones((90,160,3))*(220/255) 
 # ------------------------------------------------------------------------------------------
 # --- class FigureWidget(FigureCanvas ------------------------------------------------------
@@ -152,6 +255,7 @@ class ImageGalleryView(QSplitter):
         self.pageNumber =0
 
         self.imagesControllers = []
+        self.imagesControllersPool = []     # all image widget controllers created, recycled on gallery mode change
 
         self.images = QFrame()
         self.images.setFrameShape(QFrame.StyledPanel)
@@ -231,18 +335,28 @@ class ImageGalleryView(QSplitter):
                 index +=1                                                                                                                                                                                                           
         self.pageNumberLabel.setText(str(self.pageNumber)+"/"+str(maxPage-1))
 
-    def updateImage(self, idx, processPipe, filename):
+    def updateImage(self, idx, processPipe, filename, qImage=None):
+        """ qImage: image converted for display by loader thread (see guiQt.thread.RunLoadImage) """
         if pref.verbose: print(" [VIEW] >> ImageGalleryView.updateImage(",")")
         imageWidgetController = self.imagesControllers[idx]                                 
-        imageWidgetController.setImage(processPipe.getImage())
+        imageWidgetController.setImage(processPipe.getImage(), qImage)
         self.controller.parent.statusBar().showMessage("loading of image "+filename+" done!")
 
+    def tileSize(self):
+        """ (width, height) of gallery images in device pixels, None if gallery is not visible """
+        if not self.images.isVisible(): return None
+        ratio = self.images.devicePixelRatioF()
+        rect = self.images.contentsRect()
+        return (max(1,int(rect.width()*ratio/controller.GalleryMode.nbCol(self.shapeMode))), 
+                max(1,int(rect.height()*ratio/controller.GalleryMode.nbRow(self.shapeMode))))
+
     def resetGridLayoutWidgets(self):
         if pref.verbose: print(" [VIEW] >> ImageGalleryView.resetGridLayoutWidgets(",")")
 
+        # image widgets are recycled (see buildGridLayoutWidgets), not deleted
         for w in self.imagesControllers:
             self.imagesLayout.removeWidget(w.view)
-            w.view.deleteLater()
+            w.view.hide()
         self.imagesControllers = []
 
     def buildGridLayoutWidgets(self):
@@ -251,9 +365,12 @@ class ImageGalleryView(QSplitter):
         imageIndex = 0
         for i in range(controller.GalleryMode.nbRow(self.shapeMode)): 
             for j in range(controller.GalleryMode.nbCol(self.shapeMode)):
-                iwc = controller.ImageWidgetController(id=imageIndex)
+                # image widget of pool (created if pool is too small): id is index in grid
+                if imageIndex == len(self.imagesControllersPool): self.imagesControllersPool.append(controller.ImageWidgetController(id=imageIndex))
+                iwc = self.imagesControllersPool[imageIndex]
                 self.imagesControllers.append(iwc)
                 self.imagesLayout.addWidget(iwc.view,i,j)
+                iwc.view.show()
                 imageIndex +=1
 
     def wheelEvent(self, event):
@@ -615,6 +732,7 @@ class EditImageView(QSplitter):
         self.controller = _controller
 
         self.imageWidgetController = controller.ImageWidgetController()
+        self.imageWidgetController.enableZoom(lambda: self.controller.getProcessPipe())
 
         self.layout = QVBoxLayout()
 
@@ -703,9 +821,9 @@ class EditImageView(QSplitter):
         self.addWidget(self.scroll)
         self.setSizes([60,40])
 
-    def setImage(self,image):
+    def setImage(self,image,qImage=None):
         if pref.verbose: print(" [VIEW] >> EditImageView.setImage(",image.name,")")
-        return self.imageWidgetController.setImage(image)
+        return self.imageWidgetController.setImage(image,qImage)
 
     def autoExposure(self):
         if pref.verbose: print(" [CB] >> EditImageView.autoExposure(",")")
@@ -1187,6 +1305,43 @@ class HDRviewerView(QFrame):
 
     def auto(self): self.controller.callBackAuto(self.autoCheckBox.isChecked())
 # ------------------------------------------------------------------------------------------
+# --- class LchGradients -------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+class LchGradients(object):
+    """cache (least recently used) of gradient pixmaps of Lch color selectors: hue, chroma and lightness bars.
+        key: Lch ranges, size and axes of gradient (see hdrCore.image.Image.buildLchColorData), GUI thread only.
+
+    Static methods:
+        pixmap
+    """
+    maxCount = 64
+    pixmaps = {}
+
+    @staticmethod
+    def pixmap(L,c,h,size,width,height):
+        """return pixmap of gradient, built (sRGB, clipped) if not in cache.
+
+        Args:
+            L, c, h (tuple(float,float), Required): lightness, chroma and hue ranges
+            size (tuple(int,int), Required): (height, width) of gradient
+            width, height (str, Required): channel ('L', 'c' or 'h') along x and along y
+
+        Returns:
+            (QPixmap)
+        """
+        key = (tuple(L), tuple(c), tuple(h), tuple(size), width, height)
+
+        pixmap = LchGradients.pixmaps.pop(key, None)
+        if pixmap == None:
+            colorDataLch = hdrCore.image.Image.buildLchColorData(L, c, h, size, width=width, height=height)
+            pixmap = ImageWidgetView.toQPixmap(hdrCore.processing.Lch_to_sRGB(colorDataLch,apply_cctf_encoding=True, clip=True))
+
+        # most recently used last
+        LchGradients.pixmaps[key] = pixmap
+        while len(LchGradients.pixmaps) > LchGradients.maxCount: del LchGradients.pixmaps[next(iter(LchGradients.pixmaps))]
+
+        return pixmap
+# ------------------------------------------------------------------------------------------
 # --- class LchColorSelectorView(QFrame) ---------------------------------------------------
 # ------------------------------------------------------------------------------------------
 class LchColorSelectorView(QFrame):
@@ -1199,16 +1354,13 @@ class LchColorSelectorView(QFrame):
 
         self.labelSelector = QLabel("Hue Chroma Lighness color selector")
         # procedural image: Hue bar
-        hueBarLch = hdrCore.image.Image.buildLchColorData((75,75), (100,100), (0,360), (20,720), width='h', height='c')
-        hueBarRGB = hdrCore.processing.Lch_to_sRGB(hueBarLch,apply_cctf_encoding=True, clip=True)
+        hueBar = LchGradients.pixmap((75,75), (100,100), (0,360), (20,720), width='h', height='c')
         self.imageHueController = controller.ImageWidgetController()
         self.imageHueController.view.setMinimumSize(2, 72)
-        self.imageHueController.setImage(hueBarRGB)
-        hueBar2Lch = hdrCore.image.Image.buildLchColorData((75,75), (100,100), (0,360), (20,720), width='h', height='c')
-        hueBar2RGB = hdrCore.processing.Lch_to_sRGB(hueBar2Lch,apply_cctf_encoding=True, clip=True)
+        self.imageHueController.setQPixmap(hueBar)
         self.imageHueRangeController = controller.ImageWidgetController()
         self.imageHueRangeController.view.setMinimumSize(2, 72)
-        self.imageHueRangeController.setImage(hueBarRGB)
+        self.imageHueRangeController.setQPixmap(hueBar)
         # slider min
         self.sliderHueMin = QSlider(Qt.Horizontal)
         self.sliderHueMin.setRange(0,360)
@@ -1221,11 +1373,10 @@ class LchColorSelectorView(QFrame):
         self.sliderHueMax.setSingleStep(1)
 
         # procedural image: Saturation bar
-        saturationBarLch = hdrCore.image.Image.buildLchColorData((75,75), (0,100), (180,180), (20,720), width='c', height='L')
-        saturationBarRGB = hdrCore.processing.Lch_to_sRGB(saturationBarLch,apply_cctf_encoding=True, clip=True)
+        saturationBar = LchGradients.pixmap((75,75), (0,100), (180,180), (20,720), width='c', height='L')
         self.imageSaturationController = controller.ImageWidgetController()
         self.imageSaturationController.view.setMinimumSize(2, 72)
-        self.imageSaturationController.setImage(saturationBarRGB)
+        self.imageSaturationController.setQPixmap(saturationBar)
         # slider min
         self.sliderChromaMin = QSlider(Qt.Horizontal)
         self.sliderChromaMin.setRange(0,100)
@@ -1238,11 +1389,10 @@ class LchColorSelectorView(QFrame):
         self.sliderChromaMax.setSingleStep(1)
 
         # procedural image:lightness bar
-        lightnessBarLch = hdrCore.image.Image.buildLchColorData((0,100), (0,0), (180,180), (20,720), width='L', height='c')
-        lightnessBarRGB = hdrCore.processing.Lch_to_sRGB(lightnessBarLch,apply_cctf_encoding=True, clip=True)
+        lightnessBar = LchGradients.pixmap((0,100), (0,0), (180,180), (20,720), width='L', height='c')
         self.imageLightnessController = controller.ImageWidgetController()
         self.imageLightnessController.view.setMinimumSize(2, 72)
-        self.imageLightnessController.setImage(lightnessBarRGB)
+        self.imageLightnessController.setQPixmap(lightnessBar)
         # slider min
         self.sliderLightMin = QSlider(Qt.Horizontal)
         self.sliderLightMin.setRange(0,300)
@@ -1378,12 +1528,8 @@ class LchColorSelectorView(QFrame):
         hmax = self.sliderHueMax.value()
 
         # redraw hue range and chroma bar
-        hueRangeBarLch = hdrCore.image.Image.buildLchColorData((75,75), (100,100), (hmin,hmax), (20,720), width='h', height='c')
-        hueRangeBarRGB = hdrCore.processing.Lch_to_sRGB(hueRangeBarLch,apply_cctf_encoding=True, clip=True)
-        self.imageHueRangeController.setImage(hueRangeBarRGB)
-        saturationBarLch = hdrCore.image.Image.buildLchColorData((75,75), (0,100), (hmin,hmax), (20,720), width='c', height='L')
-        saturationBarRGB = hdrCore.processing.Lch_to_sRGB(saturationBarLch,apply_cctf_encoding=True, clip=True)
-        self.imageSaturationController.setImage(saturationBarRGB)
+        self.imageHueRangeController.setQPixmap(LchGradients.pixmap((75,75), (100,100), (hmin,hmax), (20,720), width='h', height='c'))
+        self.imageSaturationController.setQPixmap(LchGradients.pixmap((75,75), (0,100), (hmin,hmax), (20,720), width='c', height='L'))
 
         # call controller
         self.controller.sliderHueChange(hmin,hmax)
@@ -24,9 +24,10 @@ package hdrCoreconsists of the core classes for HDR imaging.
 # -----------------------------------------------------------------------------
 # --- Import ------------------------------------------------------------------
 # -----------------------------------------------------------------------------
-import enum, rawpy, colour, imageio, copy, os, functools, skimage.transform
+import enum, rawpy, colour, imageio, copy, os, functools, io
+import PIL.Image
 import numpy as np
-from . import utils, processing, metadata
+from . import utils, processing, metadata, resample
 import preferences.preferences as pref
 
 imageio.plugins.freeimage.download()
@@ -201,6 +202,18 @@ class Image(object):
         """
         return self.type == imageType.HDR
 
+    def isEmbeddedPreview(self):
+        """isEmbeddedPreview: return True if colour data is the embedded JPEG preview of a raw file (see Image.read)
+            camera tone curve and white balance are applied: for gallery display only, not as editor input.
+
+        Args:
+
+        Returns:
+            (boolean)
+                True if the image is the embedded preview of a raw file, False otherwise
+        """
+        return self.type == imageType.ARW and not self.linear
+
     def process(self, process, **kwargs):
         """
         compute a process according to the Processing object parameter.
@@ -216,7 +229,7 @@ class Image(object):
         return process.compute(self,**kwargs)
 
     @staticmethod
-    def read(filename, thumb = False):
+    def read(filename, thumb = False, embedded = False):
         """
         Method to read image from its filename. blablabla TODO à compléter.
         
@@ -225,6 +238,9 @@ class Image(object):
                 Filename of the file to read.
             thumb: boolean
                 This flag indicates us if soft have to read the thumbnail or the original file for what the thumbnail will be created.
+            embedded: boolean
+                thumbnail of raw file may be the embedded JPEG preview of the camera (gallery display only, see Image.isEmbeddedPreview),
+                default: half size decoding (same processing as full size decoding).
                 
         Returns:
             image.Image
@@ -238,12 +254,18 @@ class Image(object):
         TODO - Exemple à modifier
         """
 
-        imgDouble, imgDoubleFull = None, None
+        imgDouble, fullSize = None, None
         # image name
         path, name, ext = utils.filenamesplit(filename)
 
+        # thumbnail of jpg and raw file: reduced resolution decoding (size of process-pipe input)
+        if thumb and ext in ["arw", "jpg"]:
+            imgDouble, fullSize, linear = Image.readPreview(filename, processing.ProcessPipe.maxSize, embedded)
+            scalingFactor = 1.0
+            type = imageType.ARW if ext == "arw" else imageType.SDR
+
         # load raw file using rawpy
-        if ext=="arw":
+        elif ext=="arw":
             outBit = 16
             raw = rawpy.imread(filename)
             ppParams = rawpy.Params(demosaic_algorithm=None, half_size=False, 
@@ -286,12 +308,12 @@ class Image(object):
                     # read image and create thumbnail
                     imgDouble = colour.read_image(filename, bit_depth='float32', method='Imageio') # <--- read input file
 
-                    # resize to thumbnail size
+                    # resize to thumbnail size: area averaging (integer box reduction first)
                     iY, iX, _ = imgDouble.shape
                     maxX = processing.ProcessPipe.maxSize
                     factor = maxX/iX
-                    imgDoubleFull = copy.deepcopy(imgDouble)
-                    imgThumbnail =  skimage.transform.resize(imgDouble, (int(iY * factor),maxX ))
+                    fullSize = (iX, iY)
+                    imgThumbnail =  resample.resize(imgDouble, (int(iY * factor),maxX ))
                     # save thumbnail
                     colour.write_image(imgThumbnail,searchStr, method='Imageio')
 
@@ -312,8 +334,8 @@ class Image(object):
         # update path
         res.metadata.metadata['path'] = copy.deepcopy(path)
         # update size
-        if thumb and isinstance(imgDoubleFull, np.ndarray):
-            h,w, c = imgDoubleFull.shape
+        if thumb and fullSize != None:
+            w, h = fullSize
             res.metadata.metadata['exif']['Image Width']    = w
             res.metadata.metadata['exif']['Image Height']   = h
 
@@ -333,6 +355,52 @@ class Image(object):
 
         return res
 
+    @staticmethod
+    def readPreview(filename, maxSize, embedded = False):
+        """
+        Decode image at reduced resolution: largest side is at least maxSize (when image is larger), used for thumbnails.
+            - jpg: downscale in DCT domain while decoding (PIL draft mode: 1/2, 1/4 or 1/8 scale),
+            - arw: embedded JPEG preview if allowed and large enough, else half size demosaicing (16 bits).
+
+        Args:
+            filename: str
+                Filename of the file to read (jpg or arw).
+            maxSize: int
+                Minimal size of largest side.
+            embedded: boolean
+                arw: allow embedded JPEG preview (camera tone curve and white balance: gallery display only).
+
+        Returns:
+            (numpy.ndarray, (int,int), bool)
+                color data (float32, [0,1]), (width, height) of full size image and linear flag
+                (False for jpg and embedded JPEG preview: sRGB encoded, linearized by the process-pipe).
+        """
+        path, name, ext = utils.filenamesplit(filename)
+
+        def decodeJPEG(source):
+            with PIL.Image.open(source) as pilImage:
+                width, height = pilImage.size
+                scale = min(1.0, maxSize/max(width, height))
+                pilImage.draft('RGB', (max(1, int(width*scale)), max(1, int(height*scale))))
+                return np.asarray(pilImage.convert('RGB'), dtype=np.float32)/np.float32(255), (width, height)
+
+        if ext == "jpg": return decodeJPEG(filename) + (False,)
+
+        # arw
+        with rawpy.imread(filename) as raw:
+            fullSize = (raw.sizes.width, raw.sizes.height)
+            if embedded:
+                try:
+                    thumb = raw.extract_thumb()
+                    if thumb.format == rawpy.ThumbFormat.JPEG:
+                        imgPreview, previewSize = decodeJPEG(io.BytesIO(thumb.data))
+                        if max(previewSize) >= min(maxSize, max(fullSize)): return imgPreview, fullSize, False
+                except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError): pass
+
+            imgPreview = raw.postprocess(half_size=True, use_camera_wb=True, output_color=rawpy.ColorSpace.sRGB, output_bps=16,
+                                         no_auto_bright=False, adjust_maximum_thr=0.75, highlight_mode=rawpy.HighlightMode.Clip)
+            return imgPreview.astype(np.float32)/np.float32(pow(2,16)-1), fullSize, True
+
     def write(self,filename):
         """
         Method to write the image in a file.
@@ -483,26 +551,18 @@ class Image(object):
 
     @staticmethod
     def buildLchColorData(L,c,h,size,width,height):
-        """
-        TODO - Documentation de la méthode buildLchColorData
+        """build gradient image (Lch color data): channel 'width' varies along x, channel 'height' along y, the third channel is the middle of its range.
 
         Args:
-            L: TODO
-                TODO
-            c: TODO
-                TODO
-            h: TODO
-                TODO
-            size: TODO
-                TODO
-            width: TODO
-                TODO
-            height: TODO
-                TODO
+            L (tuple(float,float), Required): lightness range
+            c (tuple(float,float), Required): chroma range
+            h (tuple(float,float), Required): hue range, wraps around 360 when h[0] > h[1]
+            size (tuple(int,int), Required): (height, width) of gradient image
+            width (str, Required): channel ('L', 'c' or 'h') along x
+            height (str, Required): channel ('L', 'c' or 'h') along y
                 
         Returns:
-            TODO
-                TODO
+            (numpy.ndarray): Lch color data
         """
 
         colorData = np.zeros((size[0], size[1],3))
@@ -510,104 +570,25 @@ class Image(object):
         cmin, cmax = c if c[0] < c[1] else (c[1], c[0])
         hmin, hmax = h
 
-        xmin, xmax = 0, size[1]
-        ymin, ymax = 0, size[0]
-
-        if width=='L':
-            if height=='c':
-                #     +-------------------------------+
-                #  c  |                               |
-                #     +-------------------------------+
-                #                Lightness
-                for x in range(xmin,xmax):
-                    for y in range(ymin,ymax):
-                        u, v = x/(xmax-1), y/(ymax-1)
-                        Lu = Lmin*(1-u)+Lmax*u
-                        cv = cmin*(1-v) + cmax*v
-                        hh = (hmin+hmax)/2
-                        colorData[y,x,:] = [Lu,cv,hh]
-            elif height=='h':
-                #     +-------------------------------+
-                #  h  |                               |
-                #     +-------------------------------+
-                #                Lightness
-                for x in range(xmin,xmax):
-                    for y in range(ymin,ymax):
-                        u, v = x/(xmax-1), y/(ymax-1)
-                        Lu = Lmin*(1-u)+Lmax*u
-                        if hmin <= hmax:
-                            hv = hmin*(1-v) + hmax*v
-                        else:
-                            # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
-                            hv = (hmin-360)*(1-v) + hmax*v
-                            if hv < 0: hv = 360 +hv
-                        cc = (cmin+cmax)/2
-                        colorData[y,x,:] = [Lu,cc,hv]
-        elif width=='c':
-            if height=='L':
-                #     +-------------------------------+
-                #  L  |                               |
-                #     +-------------------------------+
-                #                chroma
-                for x in range(xmin,xmax):
-                    for y in range(ymin,ymax):
-                        u, v = x/(xmax-1), y/(ymax-1)
-                        cu = cmin*(1-u) + cmax*u
-                        Lv = Lmin*(1-v)+Lmax*v
-                        hh = (hmin+hmax)/2
-                        colorData[y,x,:] = [Lv,cu,hh]
-            elif height=='h':
-                #     +-------------------------------+
-                #  h  |                               |
-                #     +-------------------------------+
-                #                chroma
-                for x in range(xmin,xmax):
-                    for y in range(ymin,ymax):
-                        u, v = x/(xmax-1), y/(ymax-1)
-                        cu = cmin*(1-u) + cmax*u
-                        if hmin <= hmax:
-                            hv = hmin*(1-v) + hmax*v
-                        else:
-                            # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
-                            hv = (hmin-360)*(1-v) + hmax*v
-                            if hv < 0: hv = 360 +hv
-                        LL = (Lmin+Lmax)/2
-                        colorData[y,x,:] = [LL,cu,hv]
-        elif width == 'h':
-            if height=='L':
-                #     +-------------------------------+
-                #  L  |                               |
-                #     +-------------------------------+
-                #                hue
-                for x in range(xmin,xmax):
-                    for y in range(ymin,ymax):
-                        u, v = x/(xmax-1), y/(ymax-1)
-                        if hmin <= hmax:
-                            hu = hmin*(1-u) + hmax*u
-                        else:
-                            # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
-                            hu = (hmin-360)*(1-u) + hmax*u
-                            if hu < 0: hv = 360 +hu
-                        Lv = Lmin*(1-v)+Lmax*v
-                        cc = (cmin+cmax)/2
-                        colorData[y,x,:] = [Lv,cc,hu]
-            elif height=='c':
-                #     +-------------------------------+
-                #  c  |                               |
-                #     +-------------------------------+
-                #                hue
-                for x in range(xmin,xmax):
-                    for y in range(ymin,ymax):
-                        u, v = x/(xmax-1), y/(ymax-1)
-                        if hmin <= hmax:
-                            hu = hmin*(1-u) + hmax*u
-                        else:
-                            # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
-                            hu = (hmin-360)*(1-u) + hmax*u
-                            if hu < 0: hv = 360 +hu
-                        cv = cmin*(1-v)+cmax*v
-                        LL = (Lmin+Lmax)/2
-                        colorData[y,x,:] = [LL,cv,hu]
+        channels = ('L','c','h')
+        if width not in channels or height not in channels or width == height: return colorData
+
+        def hueRange(t):
+            if hmin <= hmax: return hmin*(1-t) + hmax*t
+            # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
+            hue = (hmin-360)*(1-t) + hmax*t
+            return np.where(hue < 0, 360+hue, hue)
+
+        ranges = {'L': lambda t: Lmin*(1-t) + Lmax*t, 'c': lambda t: cmin*(1-t) + cmax*t, 'h': hueRange}
+        middles = {'L': (Lmin+Lmax)/2, 'c': (cmin+cmax)/2, 'h': (hmin+hmax)/2}
+
+        u = np.arange(size[1])/(size[1]-1)  # x/(xmax-1)
+        v = np.arange(size[0])/(size[0]-1)  # y/(ymax-1)
+
+        for i, channel in enumerate(channels):
+            if channel == width:        colorData[:,:,i] = ranges[channel](u)[np.newaxis,:]
+            elif channel == height:     colorData[:,:,i] = ranges[channel](v)[:,np.newaxis]
+            else:                       colorData[:,:,i] = middles[channel]
 
         return colorData
 
@@ -25,7 +25,7 @@ package hdrCore consists of the core classes for HDR imaging.
 # -----------------------------------------------------------------------------
 # --- Import ------------------------------------------------------------------
 # -----------------------------------------------------------------------------
-import enum, rawpy, colour, imageio, json, os, subprocess, ast, copy
+import enum, rawpy, colour, imageio, json, os, subprocess, ast, copy, re, shutil, struct, math
 import numpy as np
 from . import utils, processing, image
 import preferences.preferences as pref
@@ -69,6 +69,21 @@ class metadata:
     # colorspace used if unknown oe undefined color space
     defaultColorSpaceName = 'sRGB'
 
+    # exif read by readExifBatch: key normalized filename, value exif dict (consumed by readExif)
+    exifCache = {}
+
+    # exif tags read from jpeg header (IFD0 and Exif IFD): tag -> exiftool description
+    jpegTags = {
+        0x010F: 'Make',
+        0x0110: 'Camera Model Name',
+        0x0131: 'Software',
+        0x829A: 'Exposure Time',
+        0x829D: 'F Number',
+        0x8827: 'ISO',
+        0x920A: 'Focal Length',
+        0xA001: 'Color Space',
+        0xA434: 'Lens Model'}
+
     def __init__(self,_image):
         """
         TODO - Documentation de la méthode __init__
@@ -202,6 +217,8 @@ class metadata:
                 TODO
         """
         exifDict = dict()
+        key = os.path.normcase(os.path.abspath(filename))
+        if key in metadata.exifCache: return metadata.exifCache.pop(key)
         if os.path.isfile(filename): # check if filename exists
             if os.path.isfile('exiftool.exe'):# reading metadata with exiftool
                 try:
@@ -217,13 +234,192 @@ class metadata:
                     tag,val = each.split(':',1)# tags and values are separated by a semi colon
                     exifDict[tag.strip()] = val.strip()
             else: 
-                print("ERROR[metadata.readExif(",filename,"): consider installing exiftool for better exif metadata, degraded mode with imageio!]")
-                img = imageio.imread(filename)
-                exifDict = img.meta['EXIF_MAIN'] if 'EXIF_MAIN' in img.meta else {}
+                print("ERROR[metadata.readExif(",filename,"): consider installing exiftool for better exif metadata, degraded mode reading image header!]")
+                exifDict = metadata.readHeader(filename)
         else: print("ERROR[metadata.readExif(",filename,"): file not found]")
 
         return exifDict
     # ---------------------------------------------------------------------------
+    @staticmethod
+    def readExifBatch(filenames):
+        """
+        Read exif of all images that have no metadata file (.json) with a single exiftool call (json output),
+        exif are stored in metadata.exifCache and consumed by readExif when image is read.
+        Files not processed by exiftool (or exiftool not found) are read by readHeader (no pixel decoding).
+
+        Args:
+            filenames: list[str]
+                Image filenames (with path).
+        """
+        filenames = [f for f in filenames if not os.path.isfile('.'.join(f.split('.')[:-1])+'.json')]
+        if not filenames: return
+        if pref.verbose: print(" [META] >> metadata.readExifBatch(",len(filenames),"files)")
+
+        exifDicts = {}
+        tool = 'exiftool.exe' if os.path.isfile('exiftool.exe') else shutil.which('exiftool')
+        if tool:
+            try:
+                # filenames are sent on stdin (-@ -): no command line length limit
+                output = subprocess.run([tool, '-json', '-charset', 'filename=utf8', '-@', '-'],
+                    input='\n'.join(filenames), capture_output=True, text=True, encoding='utf-8').stdout
+                for entry in json.loads(output) if output else []:
+                    key = os.path.normcase(os.path.abspath(entry.get('SourceFile','')))
+                    exifDicts[key] = {metadata.tagDescription(tag): str(val) for tag, val in entry.items()}
+            except (OSError, ValueError) as e:
+                print("ERROR[metadata.readExifBatch(): ",e,"]")
+        else: print("ERROR[metadata.readExifBatch(): consider installing exiftool for better exif metadata, degraded mode reading image headers!]")
+
+        for filename in filenames:
+            key = os.path.normcase(os.path.abspath(filename))
+            metadata.exifCache[key] = exifDicts[key] if key in exifDicts else metadata.readHeader(filename)
+    # ---------------------------------------------------------------------------
+    @staticmethod
+    def tagDescription(tag):
+        """
+        Convert exiftool json tag name to exiftool text description: 'BitsPerSample' -> 'Bits Per Sample', 'FNumber' -> 'F Number'.
+
+        Args:
+            tag: str
+                Tag name.
+
+        Returns:
+            str
+        """
+        if tag == 'Model': return 'Camera Model Name'
+        return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])', ' ', tag)
+    # ---------------------------------------------------------------------------
+    @staticmethod
+    def readHeader(filename):
+        """
+        Return exif (Dict) read from image header (jpeg: SOF and APP1 exif, radiance: header), pixels are not decoded.
+
+        Args:
+            filename: str
+                Name of the image file.
+
+        Returns:
+            Dict
+        """
+        exifDict = {'File Name': os.path.basename(filename)}
+        ext = filename.split('.')[-1].lower()
+        try:
+            with open(filename, 'rb') as f:
+                if ext in ('jpg', 'jpeg'):  exifDict.update(metadata.readJpegHeader(f))
+                elif ext == 'hdr':          exifDict.update(metadata.readRadianceHeader(f))
+        except (OSError, ValueError, struct.error) as e:
+            print("ERROR[metadata.readHeader(",filename,"):",e,"]")
+        return exifDict
+    # ---------------------------------------------------------------------------
+    @staticmethod
+    def readJpegHeader(f):
+        """
+        Read jpeg markers until start of scan: size and bits per sample (SOF), exif (APP1).
+
+        Args:
+            f: file opened in binary mode
+
+        Returns:
+            Dict
+        """
+        exifDict = {}
+        if f.read(2) != b'\xff\xd8': raise ValueError('not a jpeg file')
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF: break
+            m = marker[1]
+            if m == 0xFF:                       f.seek(-1, 1) ; continue # fill byte
+            if m == 0x01 or 0xD0 <= m <= 0xD8:  continue # no payload
+            if m in (0xD9, 0xDA):               break # end of image, start of scan
+            length = struct.unpack('>H', f.read(2))[0]
+            data = f.read(length - 2)
+            if m == 0xE1 and data[:6] == b'Exif\x00\x00':
+                exifDict.update(metadata.readTiff(data[6:]))
+            elif 0xC0 <= m <= 0xCF and m not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', data[1:5])
+                exifDict['Bits Per Sample'] = str(data[0])
+                exifDict['Image Width'] = str(width)
+                exifDict['Image Height'] = str(height)
+                break
+        return exifDict
+    # ---------------------------------------------------------------------------
+    @staticmethod
+    def readTiff(data):
+        """
+        Read IFD0 and Exif IFD of the tiff structure of APP1 exif segment.
+
+        Args:
+            data: bytes
+                APP1 payload after 'Exif\\0\\0'.
+
+        Returns:
+            Dict
+        """
+        endian = '<' if data[:2] == b'II' else '>'
+        typeSize = {1:1, 2:1, 3:2, 4:4, 5:8, 7:1, 9:4, 10:8}
+
+        def readIfd(offset):
+            tags = {}
+            nb = struct.unpack(endian+'H', data[offset:offset+2])[0]
+            for i in range(nb):
+                entry = offset + 2 + 12*i
+                tag, type, count = struct.unpack(endian+'HHI', data[entry:entry+8])
+                if type not in typeSize: continue
+                size = typeSize[type]*count
+                valueOffset = entry + 8 if size <= 4 else struct.unpack(endian+'I', data[entry+8:entry+12])[0]
+                value = data[valueOffset:valueOffset+size]
+                if type == 2:           tags[tag] = value.split(b'\x00')[0].decode('latin-1').strip()
+                elif type == 3:         tags[tag] = struct.unpack(endian+'H', value[:2])[0]
+                elif type in (4, 9):    tags[tag] = struct.unpack(endian+('I' if type == 4 else 'i'), value[:4])[0]
+                elif type in (5, 10):   tags[tag] = struct.unpack(endian+('II' if type == 5 else 'ii'), value[:8])
+            return tags
+
+        tags = readIfd(struct.unpack(endian+'I', data[4:8])[0])
+        if 0x8769 in tags: tags.update(readIfd(tags[0x8769]))
+
+        exifDict = {}
+        for tag, description in metadata.jpegTags.items():
+            if tag not in tags: continue
+            value = tags[tag]
+            if tag == 0x829A: # exposure time: 1/200
+                num, den = value
+                if num == 0 or den == 0: continue
+                gcd = math.gcd(num, den)
+                value = str(num//gcd)+'/'+str(den//gcd)
+            elif tag == 0x829D: # f number: 5.6
+                if value[1] == 0: continue
+                value = f'{value[0]/value[1]:.1f}'
+            elif tag == 0x920A: # focal length: 50.0 mm
+                if value[1] == 0: continue
+                value = f'{value[0]/value[1]:.1f} mm'
+            elif tag == 0xA001: # color space
+                value = 'sRGB' if value == 1 else 'Uncalibrated'
+            exifDict[description] = str(value)
+        return exifDict
+    # ---------------------------------------------------------------------------
+    @staticmethod
+    def readRadianceHeader(f):
+        """
+        Read radiance (.hdr) text header and resolution line.
+
+        Args:
+            f: file opened in binary mode
+
+        Returns:
+            Dict
+        """
+        exifDict = {}
+        if not f.readline(1024).startswith(b'#?'): raise ValueError('not a radiance file')
+        for i in range(128):
+            line = f.readline(1024).strip()
+            if not line: break
+            if line.startswith(b'SOFTWARE='): exifDict['Software'] = line[9:].decode('latin-1')
+        resolution = f.readline(1024).split()
+        if len(resolution) == 4:
+            dims = {resolution[0][1:]: resolution[1], resolution[2][1:]: resolution[3]}
+            exifDict['Image Width'] = dims[b'X'].decode()
+            exifDict['Image Height'] = dims[b'Y'].decode()
+        return exifDict
+    # ---------------------------------------------------------------------------
     def recoverData(self,exif):
         """
         TODO - Documentation de la méthode recoverData
@@ -53,6 +53,12 @@ HDRdisplay = None
 # image size when editing image: 
 #   small size = quick computation, no memory issues
 maxWorking = 1200
+# progressive preview when editing: proxy size (px), interval (ms) between edits below which a proxy is computed, delay (ms) before refinement
+preview = {'enabled': True, 'proxySize': 300, 'dragInterval': 100, 'settleDelay': 150}
+# full size decoded images cache (display, compare, export): memory budget (MB), delay (s) before release, decoding when an image is selected
+fullSizeCache = {'budget': 1024, 'maxAge': 120, 'warmOnSelect': True}
+# live HDR preview (auto preview HDR) at display resolution: maximum frame rate (frames per second)
+hdrPreview = {'maxFps': 4}
 # last image directory path
 imagePath ="."
 # keep all metadata
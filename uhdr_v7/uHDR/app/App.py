@@ -19,14 +19,18 @@
 from __future__ import annotations
 
 from numpy import ndarray, copy
+from copy import deepcopy
 from app.Jexif import Jexif
 
 from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtGui import QImage
 import preferences.Prefs
 from guiQt.MainWindow import MainWindow
 from app.ImageFIles import ImageFiles
 from app.Tags import Tags
 from app.SelectionMap import SelectionMap
+from app.RenderService import RenderService
+from app.JobScheduler import Priority
 from hdrCore import coreC, utils, processing
 from core.image import Image  # Assurez-vous d'importer la classe Image appropriée
 from core.colourSpace import ColorSpace  # Import ColorSpace as well
@@ -51,18 +55,21 @@ class App:
         ## image file management
         self.imagesManagement : ImageFiles = ImageFiles()
         self.imagesManagement.imageLoaded.connect(self.CBimageLoaded)
+        self.imagesManagement.filesChanged.connect(self.CBfilesChanged)
+        self.imagesManagement.importPipeline.progress.connect(self.CBimportProgress)
         self.imagesManagement.setPrefs()
         self.imagesManagement.checkExtra()
         nbImages : int = self.imagesManagement.setDirectory(preferences.Prefs.Prefs.currentDir)
 
         # read image tags in directory
-        allTagsInDir : dict[str, dict[str,bool]] =  Tags.aggregateTagsFiles(preferences.Prefs.Prefs.currentDir,preferences.Prefs.Prefs.extraPath)
+        allTagsInDir : dict[str, dict[str,bool]] =  self.imagesManagement.catalog.aggregateTags()
         
         # merge with default tags from preferences
         self.tags : Tags = Tags(Tags.aggregateTagsData([preferences.Prefs.Prefs.tags, allTagsInDir]))
         
         ## selection
         self.selectionMap :  SelectionMap = SelectionMap(self.imagesManagement.getImagesFilesnames())
+        self.setSelectionData()
 
         ## current selected image
         self.selectedImageIdx : int | None = None
@@ -73,6 +80,13 @@ class App:
         self.saveMeta: dict | None = None
         self.disabledContent: list = [{'exposure': True},{'contrast': True},{'lightness': True},[True,True,True,True,True]]
 
+        ## edited image rendering (worker thread)
+        self.processPipeImageName : str | None = None     # image set to processPipe
+        self.renderSource : Image | None = None           # prepared input image of processPipe
+        self.renderService : RenderService = RenderService()
+        self.renderService.rendered.connect(self.updateImage)
+        self.renderService.failed.connect(self.renderFailed)
+
         ## to store original images
         self.originalImages: dict[str, Image] = {}
 
@@ -92,6 +106,8 @@ class App:
         self.mainWindow.tagChanged.connect(self.CBtagChanged)
         self.mainWindow.scoreChanged.connect(self.CBscoreChanged)
         self.mainWindow.scoreSelectionChanged.connect(self.CBscoreSelectionChanged)
+        self.mainWindow.tagSelectionChanged.connect(self.CBtagSelectionChanged)
+        self.mainWindow.nameSelectionChanged.connect(self.CBnameSelectionChanged)
 
         self.mainWindow.exposureChanged.connect(self.onExposureChanged)
         self.mainWindow.contrastScalingChanged.connect(self.onContrastScalingChanged)
@@ -137,10 +153,9 @@ class App:
     ## ----------------------------------------------------------------
     def update(self: App) -> None:
         """call to update gallery after selection changed or directory changed."""
-        # number of image in current pages 
-        minIdx, maxIdx = self.getImageRangeIndex()
+        # number of selected images (first row displayed is clamped), then images displayed
         self.mainWindow.setNumberImages(self.selectionMap.getSelectedImageNumber()) 
-        self.mainWindow.setNumberImages(maxIdx - minIdx) 
+        minIdx, maxIdx = self.getImageRangeIndex()
         self.CBrequestImages(minIdx, maxIdx)
 
     ## -----------------------------------------------------------------------------------------------------
@@ -159,6 +174,7 @@ class App:
 
         self.imagesManagement.setDirectory(path)
         self.selectionMap.setImageNames(self.imagesManagement.getImagesFilesnames())
+        self.setSelectionData()
         self.selectionMap.selectAll()
 
         # reset gallery 
@@ -166,6 +182,33 @@ class App:
         self.mainWindow.setNumberImages(self.imagesManagement.getNbImages())
         self.mainWindow.firstPage()
 
+    #### image files added, removed or modified in directory
+    #### -----------------------------------------------------------------
+    def CBfilesChanged(self: App, added: list[str], removed: list[str], modified: list[str]) -> None:
+        """callback: called when image files of directory changed (image files are updated): selection and gallery are updated in place."""
+        if debug: print(f'App.CBfilesChanged(added:{len(added)}, removed:{len(removed)}, modified:{len(modified)})')
+
+        selectedName : str|None = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx) if self.selectedImageIdx != None else None
+
+        for filename in removed + modified: self.originalImages.pop(filename, None)
+
+        self.selectionMap.updateImageNames(self.imagesManagement.getImagesFilesnames(),
+                                           {f: self.imagesManagement.getImageScore(f) for f in added},
+                                           {f: self.imagesManagement.getImageTags(f).tags for f in added})
+
+        # selected image: new selected index (None if removed or not selected)
+        if selectedName != None:
+            self.selectedImageIdx = self.selectionMap.imageNameToSelectedIndex(selectedName) if selectedName not in removed else None
+            self.mainWindow.imageGallery.selectedImage = self.selectedImageIdx
+
+        self.update()
+
+    #### import progress
+    #### -----------------------------------------------------------------
+    def CBimportProgress(self: App, done: int, total: int) -> None:
+        """callback: background import of directory progress."""
+        self.mainWindow.statusBar().showMessage(f'import: {done}/{total} images' if done < total else f'import done: {total} images', 0 if done < total else 3000)
+
     #### request image: zoom or page changed
     #### -----------------------------------------------------------------
     def CBrequestImages(self: App, minIdx: int , maxIdx:int ) -> None:
@@ -173,6 +216,11 @@ class App:
 
         imagesFilenames : list[str] = self.imagesManagement.getImagesFilesnames()
 
+        # cancel loading of images of the previous page still queued
+        self.imagesManagement.newRequestGeneration()
+        # gallery images are converted for display by the loader at the size of gallery images
+        self.imagesManagement.setTileSize(self.mainWindow.galleryTileSize())
+
         for sIdx in range(minIdx, maxIdx+1):
 
             gIdx : int|None = self.selectionMap.selectedlIndexToGlobalIndex(sIdx) 
@@ -180,6 +228,13 @@ class App:
             if gIdx != None: self.imagesManagement.requestLoad(imagesFilenames[gIdx])
             else: self.mainWindow.setGalleryImage(sIdx, None)
 
+        # prefetch images of the rows after the gallery (scrolling)
+        for sIdx in range(maxIdx+1, 2*maxIdx-minIdx+2):
+
+            gIdx : int|None = self.selectionMap.selectedlIndexToGlobalIndex(sIdx)
+
+            if gIdx != None: self.imagesManagement.requestLoad(imagesFilenames[gIdx], priority=Priority.PREFETCH)
+
 
     #### image loaded
     #### -----------------------------------------------------------------
@@ -189,7 +244,9 @@ class App:
         image : ndarray = self.imagesManagement.images[filename]
         imageIdx = self.selectionMap.imageNameToSelectedIndex(filename)         
 
-        if imageIdx != None: self.mainWindow.setGalleryImage(imageIdx, image)
+        if imageIdx != None:
+            tile : QImage|None = self.imagesManagement.getTile(filename)
+            self.mainWindow.setGalleryImage(imageIdx, tile if tile != None else image)
         
         # Save original image
         self.originalImages[filename] = Image(copy(image), ColorSpace.sRGB, isHdr=False, name=filename)
@@ -199,6 +256,9 @@ class App:
     #### -----------------------------------------------------------------
     def CBimageSelected(self: App, index):
 
+        # drop rendering of previous image, write its edits
+        self.renderService.cancel()
+        self.imagesManagement.journal.flush()
         
         self.selectedImageIdx = index # index in selection
 
@@ -217,6 +277,7 @@ class App:
             imageFilename : str =  self.imagesManagement.getImagesFilesnames()[gIdx] 
             imagePath : str =  self.imagesManagement.imagePath 
             self.processPipe = self.buildProcessPipe()
+            self.processPipeImageName = None
             #### if debug : print(f'App.CBimageSelected({index}) > path:{imagePath}')
             self.metaImage = self.imagesManagement.getProcesspipe(imageFilename)
             self.originalMeta = self.imagesManagement.getProcesspipe(imageFilename)
@@ -247,7 +308,9 @@ class App:
         if self.selectedImageIdx != None:
             imageName : str|None = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if debug : print(f'\t\t imageName:{imageName}')
-            if imageName != None : self.imagesManagement.updateImageTag(imageName, key[0], key[1], value)
+            if imageName != None : 
+                self.imagesManagement.updateImageTag(imageName, key[0], key[1], value)
+                self.selectionMap.setTag(imageName, key, value)
     
     #### score changed
     #### -----------------------------------------------------------------
@@ -257,7 +320,9 @@ class App:
         if self.selectedImageIdx != None:
             imageName : str|None = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
 
-            if imageName != None : self.imagesManagement.updateImageScore(imageName, value)
+            if imageName != None : 
+                self.imagesManagement.updateImageScore(imageName, value)
+                self.selectionMap.setScore(imageName, value)
 
 
     ### score selection changed
@@ -266,16 +331,33 @@ class App:
         """called when selection changed."""
 
 
-        # get {'image name': score}
-        imageScores : dict[str, int] = self.imagesManagement.imageScore
         # selected score
         selectedScores : list[int] = []
         for i, selected in enumerate(listSelectedScore) :  
             if selected : selectedScores.append(i)
-        # send info to selectionMap
-        self.selectionMap.selectByScore(imageScores, selectedScores)
+        # send info to selectionMap (scores of images are already in selectionMap)
+        self.selectionMap.selectByScore(selectedScores)
+        self.update()
+
+    ### tag selection changed
+    ### ------------------------------------------------------------------
+    def CBtagSelectionChanged(self: App, tagsSelected : list[tuple[str,str]]) -> None:
+        """called when tag selection changed: images with all selected tags (tags of images are already in selectionMap)."""
+        self.selectionMap.selectByTags(tagsSelected)
+        self.update()
+
+    ### name selection changed
+    ### ------------------------------------------------------------------
+    def CBnameSelectionChanged(self: App, pattern : str) -> None:
+        """called when name selection changed: images which name matches glob pattern, no filter if empty."""
+        self.selectionMap.selectByName(pattern if pattern else None)
         self.update()
 
+    def setSelectionData(self: App) -> None:
+        """send scores and tags of images (directory) to selectionMap."""
+        self.selectionMap.setScores(self.imagesManagement.imageScore)
+        self.selectionMap.setTags({name: tags.tags for name, tags in self.imagesManagement.imageTags.items()})
+
     def getImageInstance(self, imageName: str) -> Image | None:
         """
         Get an Image instance from image name.
@@ -291,22 +373,60 @@ class App:
             return img
         return None
 
-    def updateImage(self, imageName: str, new_image: Image) -> None:
+    def updateImage(self, imageName: str, new_image: Image, qImage: QImage|None = None) -> None:
         """
         Update the image in ImageFiles and refresh the GUI.
         
         Args:
             imageName (str, required)
             new_image (Image, required)
+            qImage (QImage, optional): new_image converted for display in editor (worker thread)
         """
         imageIdx = self.selectionMap.imageNameToSelectedIndex(imageName)
         if imageIdx is not None:
-            self.mainWindow.setGalleryImage(imageIdx, new_image.cData)
+            self.mainWindow.setGalleryImage(imageIdx, qImage if qImage != None else new_image.cData)
             if self.selectedImageIdx == imageIdx:
-                self.mainWindow.setEditorImage(new_image.cData)
-        self.metaImage = new_image.metadata
-        self.originalImages[imageName].setMetadata(self.metaImage)
-        self.imagesManagement.saveProcesspipe(imageName,self.metaImage)
+                self.mainWindow.setEditorImage(qImage if qImage != None else new_image.cData)
+        self.originalImages[imageName].setMetadata(new_image.metadata)
+        self.imagesManagement.saveProcesspipe(imageName,new_image.metadata)
+
+    def renderFailed(self, imageName: str, message: str) -> None:
+        """
+        Report a failed rendering of the edited image (the previous image stays displayed).
+        
+        Args:
+            imageName (str, required)
+            message (str, required): error message
+        """
+        self.mainWindow.statusBar().showMessage(f'rendering of {imageName} failed: {message}', 5000)
+
+    def prepareProcessPipe(self, imageName: str) -> None:
+        """
+        Set the image to the process-pipe, only if the process-pipe does not already have it:
+        the prepared input image is reused by all edits of the image.
+        
+        Args:
+            imageName (str, required)
+        """
+        if self.processPipeImageName != imageName:
+            img = self.getImageInstance(imageName)
+            if img is None: return
+            self.processPipe.setImage(img)
+            self.renderSource = self.processPipe.getInputImage()
+            self.processPipeImageName = imageName
+
+    def renderImage(self, imageName: str) -> None:
+        """
+        Request the rendering of the process-pipe (worker thread), the GUI is updated by updateImage when it is done.
+        While a slider is dragged a proxy of the image (process-pipe input pyramid) is rendered, then the image when it settles.
+        
+        Args:
+            imageName (str, required)
+        """
+        if self.processPipeImageName != imageName: return
+        self.metaImage = deepcopy(self.processPipe.toDict())
+        proxy = self.processPipe.getProxyInputImage(self.renderService.policy.proxySize)
+        self.renderService.requestRender(imageName, self.renderSource, self.metaImage, proxy, self.mainWindow.editorDisplaySize())
 
     def applyProcessing(self, img: Image, processPipe: dict) -> Image:
         """
@@ -329,13 +449,11 @@ class App:
             if self.disabledContent[0]['exposure'] is True:
                 imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
                 if self.processPipe:
-                    img = self.getImageInstance(imageName)
-                    self.processPipe.setImage(img)
+                    self.prepareProcessPipe(imageName)
 
                     self.processPipe.setParameters(0, {'EV': value})
                     
-                    newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                    self.updateImage(imageName, newImage)
+                    self.renderImage(imageName)
 
     def onContrastScalingChanged(self, value: float):
         """
@@ -349,12 +467,10 @@ class App:
             if self.disabledContent[1]['contrast'] is True:
                 imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
                 if self.processPipe:
-                    img = self.getImageInstance(imageName)
-                    self.processPipe.setImage(img)
+                    self.prepareProcessPipe(imageName)
                     self.processPipe.setParameters(1, {'contrast': value})
 
-                    newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                    self.updateImage(imageName, newImage)
+                    self.renderImage(imageName)
     
     def onLightnessRangeChanged(self, value: tuple):
         """
@@ -367,15 +483,13 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 dico = self.processPipe.getParameters(2)
                 dico['start'] = [value[0], value[0]]
                 dico['end'] = [value[1], value[1]]
                 self.processPipe.setParameters(2, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
             
     def onHighlightsChanged(self, value: int):
         """
@@ -388,14 +502,12 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 dico = self.processPipe.getParameters(2)
                 dico['highlights'] = [value, value]
                 self.processPipe.setParameters(2, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onShadowsChanged(self, value: float):
         """ 
@@ -408,14 +520,12 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 dico = self.processPipe.getParameters(2)
                 dico['shadows'] = [value, value]
                 self.processPipe.setParameters(2, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onWhitesChanged(self, value: float):
         """ 
@@ -428,14 +538,12 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 dico = self.processPipe.getParameters(2)
                 dico['whites'] = [value, value]
                 self.processPipe.setParameters(2, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onBlacksChanged(self, value: float):
         """
@@ -448,14 +556,12 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 dico = self.processPipe.getParameters(2)
                 dico['blacks'] = [value, value]
                 self.processPipe.setParameters(2, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onMediumsChanged(self, value: float):
         """
@@ -468,14 +574,12 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 dico = self.processPipe.getParameters(2)
                 dico['mediums'] = [value, value]
                 self.processPipe.setParameters(2, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
 
 
@@ -495,8 +599,7 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 
                 nb = value2+5
                 dico = self.processPipe.getParameters(nb)
@@ -504,8 +607,7 @@ class App:
 
                 self.processPipe.setParameters(nb, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onSaturationChanged(self, value: float, value2: int):
         """
@@ -519,8 +621,7 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
 
                 nb = value2+5
                 dico = self.processPipe.getParameters(nb)
@@ -528,8 +629,7 @@ class App:
                 
                 self.processPipe.setParameters(nb, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onColorExposureChanged(self, value: float, value2: int):
         """
@@ -543,8 +643,7 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 
                 nb = value2+5
                 dico = self.processPipe.getParameters(nb)
@@ -552,8 +651,7 @@ class App:
                 
                 self.processPipe.setParameters(nb, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onColorContrastChanged(self, value: float, value2: int):
         """
@@ -567,8 +665,7 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 
                 nb = value2+5
                 dico = self.processPipe.getParameters(nb)
@@ -576,8 +673,7 @@ class App:
                 
                 self.processPipe.setParameters(nb, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onHueRangeChanged(self, value: tuple, value2: int):
         """
@@ -591,8 +687,7 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 
                 nb = value2+5
                 dico = self.processPipe.getParameters(nb)
@@ -600,8 +695,7 @@ class App:
                 
                 self.processPipe.setParameters(nb, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onChromaRangeChanged(self, value: tuple, value2: int):
         """
@@ -615,8 +709,7 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 
                 nb = value2+5
                 dico = self.processPipe.getParameters(nb)
@@ -624,8 +717,7 @@ class App:
                 
                 self.processPipe.setParameters(nb, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onLightness2RangeChanged(self, value: tuple, value2: int):
         """
@@ -639,8 +731,7 @@ class App:
         if self.selectedImageIdx is not None:
             imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
             if self.processPipe:
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
                 
                 nb = value2+5
                 dico = self.processPipe.getParameters(nb)
@@ -648,8 +739,7 @@ class App:
                 
                 self.processPipe.setParameters(nb, dico)
 
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onActiveContrastChanged(self, value: bool):
         """
@@ -665,8 +755,7 @@ class App:
                 tempSave = self.imagesManagement.getProcesspipe(imageName)
                 self.saveMeta[1]['contrast']['contrast'] = tempSave[1]['contrast']['contrast']
             
-            img = self.getImageInstance(imageName)
-            self.processPipe.setImage(img)
+            self.prepareProcessPipe(imageName)
             if value == True:
                 self.processPipe.setParameters(1, {'contrast': self.saveMeta[1]['contrast']['contrast']})
             if value == False:
@@ -674,8 +763,7 @@ class App:
                 self.processPipe.setParameters(1, {'contrast': self.originalMeta[1]['contrast']['contrast']})
                 
             self.disabledContent[1]['contrast'] = value
-            newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-            self.updateImage(imageName, newImage)
+            self.renderImage(imageName)
 
     def onActiveExposureChanged(self, value: bool):
         """
@@ -691,8 +779,7 @@ class App:
                 tempSave = self.imagesManagement.getProcesspipe(imageName)
                 self.saveMeta[0]['exposure']['EV'] = tempSave[0]['exposure']['EV']
             
-            img = self.getImageInstance(imageName)
-            self.processPipe.setImage(img)
+            self.prepareProcessPipe(imageName)
             if value == True:
                 self.processPipe.setParameters(0, {'EV': self.saveMeta[0]['exposure']['EV']})
             if value == False:
@@ -700,8 +787,7 @@ class App:
                 self.processPipe.setParameters(0, {'EV': self.originalMeta[0]['exposure']['EV']})
                 
             self.disabledContent[0]['exposure'] = value
-            newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-            self.updateImage(imageName, newImage)
+            self.renderImage(imageName)
     
     def onActiveLightnessChanged(self, value: bool):
         """
@@ -718,8 +804,7 @@ class App:
                     tempSave = self.imagesManagement.getProcesspipe(imageName)
                     self.saveMeta[2]['tonecurve'] = tempSave[2]['tonecurve']
                 
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
 
                 if value == True:
                     self.processPipe.setParameters(2, self.saveMeta[2]['tonecurve'])
@@ -728,8 +813,7 @@ class App:
                     self.processPipe.setParameters(2, self.originalMeta[2]['tonecurve'])
 
                 self.disabledContent[2]['lightness'] = value
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
     
     def onActiveColorsChanged(self, value: bool, value2: int):
         """ 
@@ -749,8 +833,7 @@ class App:
                     tempSave = self.imagesManagement.getProcesspipe(imageName)
                     print(tempSave)
                     self.saveMeta[nb]['colorEditor'+str(value2)] = tempSave[nb]['colorEditor'+str(value2)]
-                img = self.getImageInstance(imageName)
-                self.processPipe.setImage(img)
+                self.prepareProcessPipe(imageName)
 
                 if value == True:
                     self.processPipe.setParameters(nb, self.saveMeta[nb]['colorEditor'+str(value2)])
@@ -760,8 +843,7 @@ class App:
 
                 self.disabledContent[3][value2+1] = value
  
-                newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                self.updateImage(imageName, newImage)
+                self.renderImage(imageName)
 
     def onAutoClickedExposure(self, value: bool):
         """
@@ -774,13 +856,11 @@ class App:
             if self.disabledContent[0]['exposure'] is True:
                 imageName = self.selectionMap.selectedIndexToImageName(self.selectedImageIdx)
                 if self.processPipe:
-                    img = self.getImageInstance(imageName)
-                    self.processPipe.setImage(img)
+                    self.prepareProcessPipe(imageName)
 
                     self.processPipe.setParameters(0, {'EV': value})
                     
-                    newImage = coreC.coreCcompute(self.processPipe.getImage(), self.processPipe.toDict())
-                    self.updateImage(imageName, newImage)
+                    self.renderImage(imageName)
         
     @staticmethod
     def buildProcessPipe():
@@ -0,0 +1,205 @@
+from __future__ import annotations
+# uHDR: HDR image editing software
+#   Copyright (C) 2022  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020-2022
+# author: remi.cozot@univ-littoral.fr
+
+# import
+# ------------------------------------------------------------------------------------------
+import os, json, sqlite3, threading
+from app.Tags import Tags
+from app.Score import Score
+from app.Jexif import Jexif
+
+# ------------------------------------------------------------------------------------------
+# --- class Catalog ------------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+debug : bool = True
+# ------------------------------------------------------------------------------------------
+class Catalog:
+    """per directory index (sqlite database in extra '.uHDR' dir) of image tags, exif, score, processpipe and stats.
+
+        sidecar files (.tags, .jexif, .score, image .json) are imported once, when an image is not in the catalog.
+    """
+    # class attributes
+    catalogFilename : str = 'catalog.db'
+    fields : list[str] = ['tags', 'exif', 'score', 'processpipe', 'stats']
+
+    # constructor
+    def __init__(self: Catalog, imageDir: str, extraDir: str) -> None:
+
+        self.imageDir : str = imageDir
+        self.extraDir : str = extraDir
+        self.lock : threading.Lock = threading.Lock()
+
+        extraPath : str = os.path.join(imageDir, extraDir)
+        if not os.path.exists(extraPath): os.mkdir(extraPath)
+
+        # connection shared by GUI thread and writer threads: access protected by lock
+        self.db : sqlite3.Connection = sqlite3.connect(os.path.join(extraPath, Catalog.catalogFilename), check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute("""CREATE TABLE IF NOT EXISTS images (
+                            name TEXT PRIMARY KEY,
+                            tags TEXT,
+                            exif TEXT,
+                            score INTEGER,
+                            processpipe TEXT,
+                            stats TEXT)""")
+        self.db.commit()
+
+    # methods
+    # ------------------------------------------------------------------------------------
+    def close(self: Catalog) -> None:
+        with self.lock: self.db.close()
+    # ------------------------------------------------------------------------------------
+    ## load
+    def loadAll(self: Catalog, imageFilenames: list[str]) -> dict[str, dict]:
+        """return records (key: filename) of all images: one query, images not in catalog are imported from sidecar files."""
+        if debug: print(f'Catalog.loadAll({len(imageFilenames)} images)')
+
+        records : dict[str, dict] = {}
+        with self.lock:
+            for row in self.db.execute('SELECT name, tags, exif, score, processpipe, stats FROM images'):
+                records[row[0]] = Catalog.rowToRecord(row)
+
+        missing : list[str] = [f for f in imageFilenames if f not in records]
+        if missing: records.update(self.importSidecars(missing))
+
+        return {f: records[f] for f in imageFilenames}
+    # ------------------------------------------------------------------------------------
+    def importSidecars(self: Catalog, imageFilenames: list[str]) -> dict[str, dict]:
+        """import sidecar files of images in the catalog (single transaction)."""
+        if debug: print(f'Catalog.importSidecars({len(imageFilenames)} images)')
+
+        exifs : dict[str, dict[str, str]] = Jexif.loadAll(self.imageDir, imageFilenames, self.extraDir)
+
+        records : dict[str, dict] = {}
+        for filename in imageFilenames:
+            scoreFilename : str = os.path.join(self.imageDir, self.extraDir, filename[:-3]+'score')
+            records[filename] = {
+                'tags': Tags.load(self.imageDir, filename, self.extraDir).tags,
+                'exif': exifs[filename],
+                'score': Score.load(self.imageDir, filename, self.extraDir) if os.path.exists(scoreFilename) else 0,
+                'processpipe': self.readProcesspipeFile(filename),
+                'stats': None}
+
+        with self.lock:
+            self.db.executemany('INSERT OR REPLACE INTO images VALUES (?,?,?,?,?,?)',
+                                [Catalog.recordToRow(f, r) for f, r in records.items()])
+            self.db.commit()
+        return records
+    # ------------------------------------------------------------------------------------
+    def readProcesspipeFile(self: Catalog, filename: str) -> dict|None:
+        """return 'processpipe' of image json file (image dir), None if not found."""
+        jsonFilename : str = os.path.join(self.imageDir, '.'.join(filename.split('.')[:-1])+'.json')
+        if os.path.isfile(jsonFilename):
+            try:
+                with open(jsonFilename) as jsonFile: return json.load(jsonFile).get('processpipe')
+            except (IOError, ValueError) as e: print(f'[ERROR] Catalog.readProcesspipeFile({filename}): {e}')
+        return None
+    # ------------------------------------------------------------------------------------
+    def get(self: Catalog, filename: str, field: str):
+        """return field of image filename, None if not in catalog."""
+        with self.lock:
+            row = self.db.execute(f'SELECT {field} FROM images WHERE name=?', (filename,)).fetchone()
+        if row == None or row[0] == None: return None
+        return row[0] if field == 'score' else json.loads(row[0])
+    # ------------------------------------------------------------------------------------
+    ## incremental write
+    def set(self: Catalog, filename: str, field: str, value) -> None:
+        """write field of image filename."""
+        if field not in Catalog.fields: raise ValueError(f'Catalog.set(): unknown field "{field}"')
+        if debug: print(f'Catalog.set({filename}, {field})')
+
+        value = value if field == 'score' else json.dumps(value)
+        with self.lock:
+            self.db.execute('INSERT OR IGNORE INTO images (name) VALUES (?)', (filename,))
+            self.db.execute(f'UPDATE images SET {field}=? WHERE name=?', (value, filename))
+            self.db.commit()
+    # ------------------------------------------------------------------------------------
+    def setMany(self: Catalog, field: str, values: dict) -> None:
+        """write field of several images (single transaction)."""
+        if field not in Catalog.fields: raise ValueError(f'Catalog.setMany(): unknown field "{field}"')
+        rows : list = [(v if field == 'score' else json.dumps(v), f) for f, v in values.items()]
+        with self.lock:
+            self.db.executemany('INSERT OR IGNORE INTO images (name) VALUES (?)', [(f,) for f in values.keys()])
+            self.db.executemany(f'UPDATE images SET {field}=? WHERE name=?', rows)
+            self.db.commit()
+    # ------------------------------------------------------------------------------------
+    def remove(self: Catalog, imageFilenames: list[str]) -> None:
+        """remove images from catalog (image files removed from directory)."""
+        if debug: print(f'Catalog.remove({imageFilenames})')
+        with self.lock:
+            self.db.executemany('DELETE FROM images WHERE name=?', [(f,) for f in imageFilenames])
+            self.db.commit()
+    # ------------------------------------------------------------------------------------
+    ## tags
+    def aggregateTags(self: Catalog) -> dict[str, dict[str,bool]]:
+        """aggregate tags of all images in catalog (replaces Tags.aggregateTagsFiles)."""
+        with self.lock:
+            allTags : list[dict[str, dict[str,bool]]] = [json.loads(row[0]) for row in self.db.execute('SELECT tags FROM images WHERE tags IS NOT NULL')]
+        return Tags.aggregateTagsData(allTags)
+
+    # static methods
+    # ------------------------------------------------------------------------------------
+    @staticmethod
+    def rowToRecord(row: tuple) -> dict:
+        name, tags, exif, score, processpipe, stats = row
+        return {'tags': json.loads(tags) if tags else {},
+                'exif': json.loads(exif) if exif else {},
+                'score': score if score != None else 0,
+                'processpipe': json.loads(processpipe) if processpipe else None,
+                'stats': json.loads(stats) if stats else None}
+    # ------------------------------------------------------------------------------------
+    @staticmethod
+    def recordToRow(name: str, record: dict) -> tuple:
+        return (name,
+                json.dumps(record['tags']),
+                json.dumps(record['exif']),
+                record['score'],
+                json.dumps(record['processpipe']) if record['processpipe'] != None else None,
+                json.dumps(record['stats']) if record['stats'] != None else None)
+
+# ------------------ main -------------------------------
+# benchmark: directory open time (sidecar files vs catalog) for 10k images
+if __name__ == "__main__":
+    import tempfile, time
+
+    debug = False
+    nbImages : int = 10000
+    with tempfile.TemporaryDirectory() as imageDir:
+        extraDir : str = '.uHDR'
+        os.mkdir(os.path.join(imageDir, extraDir))
+        names : list[str] = [f'img{i:05d}.jpg' for i in range(nbImages)]
+        for name in names:
+            with open(os.path.join(imageDir, extraDir, name[:-3]+'tags'), 'w') as f: json.dump({'scene': {'landscape': True}}, f)
+            with open(os.path.join(imageDir, extraDir, name[:-3]+'score'), 'w') as f: json.dump({'score': 3}, f)
+            with open(os.path.join(imageDir, extraDir, name[:-3]+'jexif'), 'w') as f: json.dump({'Color Space': 'sRGB', 'Bits Per Sample': '8', 'Type': 'SDR', 'Size': '6000 x 4000'}, f)
+
+        start : float = time.perf_counter()
+        for name in names:
+            Tags.load(imageDir, name, extraDir) ; Jexif.load(imageDir, name, extraDir) ; Score.load(imageDir, name, extraDir)
+        Tags.aggregateTagsFiles(imageDir, extraDir)
+        print(f'sidecar files: {time.perf_counter()-start:.3f} s')
+
+        start = time.perf_counter()
+        catalog : Catalog = Catalog(imageDir, extraDir)
+        catalog.loadAll(names) ; catalog.aggregateTags() ; catalog.close()
+        print(f'catalog (first open, import): {time.perf_counter()-start:.3f} s')
+
+        start = time.perf_counter()
+        catalog = Catalog(imageDir, extraDir)
+        catalog.loadAll(names) ; catalog.aggregateTags() ; catalog.close()
+        print(f'catalog: {time.perf_counter()-start:.3f} s')
@@ -0,0 +1,111 @@
+from __future__ import annotations
+# uHDR: HDR image editing software
+#   Copyright (C) 2022  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020-2022
+# author: remi.cozot@univ-littoral.fr
+
+# import
+# ------------------------------------------------------------------------------------------
+import os
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+# ------------------------------------------------------------------------------------------
+# --- class DirectoryWatcher ---------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+debug : bool = True
+# ------------------------------------------------------------------------------------------
+class DirectoryWatcher(QObject):
+    """incremental watching of image files of a directory (GUI thread).
+
+        change notification: QFileSystemWatcher (inotify, FSEvents, ReadDirectoryChangesW) when the platform supports it,
+        polling stand-in (timer) otherwise; files modified in place are found by a slow poll in both cases.
+        on notification (debounced) the directory is scanned (name, mtime, size) and compared with the previous scan:
+        'filesChanged' is emitted with added, removed and modified image filenames.
+    """
+    # class attributes
+    ## signal
+    filesChanged : pyqtSignal = pyqtSignal(list, list, list)   # added, removed, modified
+
+    # constructor
+    def __init__(self: DirectoryWatcher, extensions: tuple[str, ...], delay: int = 300, pollInterval: int = 5000) -> None:
+        super().__init__()
+
+        self.extensions : tuple[str, ...] = extensions
+        self.path : str|None = None
+        self.entries : dict[str, tuple[float, int]] = {}          # filename -> (mtime, size)
+
+        self.watcher : QFileSystemWatcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.CBdirectoryChanged)
+
+        # notifications are coalesced: one scan after 'delay' ms
+        self.timer : QTimer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.scan)
+
+        self.pollInterval : int = pollInterval                    # slow poll (with change notification)
+        self.pollTimer : QTimer = QTimer(self)
+        self.pollTimer.setInterval(pollInterval)
+        self.pollTimer.timeout.connect(self.scan)
+
+    # methods
+    # ------------------------------------------------------------------------------------
+    def setDirectory(self: DirectoryWatcher, path: str, filenames: list[str]) -> None:
+        """watch directory, filenames: image files already listed (not reported as added)."""
+        self.stop()
+        self.path = path
+        current : dict[str, tuple[float, int]] = self.list()
+        self.entries = {name: current[name] for name in filenames if name in current}
+
+        if self.watcher.addPath(path): self.pollTimer.setInterval(self.pollInterval)
+        else:
+            if debug: print(f'DirectoryWatcher.setDirectory({path}): no change notification > polling')
+            self.pollTimer.setInterval(self.timer.interval()*4)
+        self.pollTimer.start()
+    # ------------------------------------------------------------------------------------
+    def stop(self: DirectoryWatcher) -> None:
+        if self.watcher.directories(): self.watcher.removePaths(self.watcher.directories())
+        self.timer.stop()
+        self.pollTimer.stop()
+        self.path = None
+        self.entries = {}
+    # ------------------------------------------------------------------------------------
+    def CBdirectoryChanged(self: DirectoryWatcher, path: str) -> None:
+        if not self.timer.isActive(): self.timer.start()
+    # ------------------------------------------------------------------------------------
+    def list(self: DirectoryWatcher) -> dict[str, tuple[float, int]]:
+        """return (mtime, size) of image files of directory."""
+        res : dict[str, tuple[float, int]] = {}
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if entry.name.endswith(self.extensions) and entry.is_file():
+                        st : os.stat_result = entry.stat()
+                        res[entry.name] = (st.st_mtime, st.st_size)
+        except OSError as e: print(f'[ERROR] DirectoryWatcher.list({self.path}): {e}')
+        return res
+    # ------------------------------------------------------------------------------------
+    def scan(self: DirectoryWatcher) -> None:
+        """compare directory with previous scan, emit filesChanged if image files are added, removed or modified."""
+        if self.path == None: return
+
+        current : dict[str, tuple[float, int]] = self.list()
+        added : list[str] = sorted(name for name in current if name not in self.entries)
+        removed : list[str] = sorted(name for name in self.entries if name not in current)
+        modified : list[str] = sorted(name for name, stat in current.items() if name in self.entries and self.entries[name] != stat)
+        self.entries = current
+
+        if added or removed or modified:
+            if debug: print(f'DirectoryWatcher.scan() > added:{len(added)} removed:{len(removed)} modified:{len(modified)}')
+            self.filesChanged.emit(added, removed, modified)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+# uHDR: HDR image editing software
+#   Copyright (C) 2022  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020-2022
+# author: remi.cozot@univ-littoral.fr
+
+# import
+# ------------------------------------------------------------------------------------------
+import os, json, threading
+from copy import deepcopy
+from typing import TYPE_CHECKING
+from PyQt6.QtCore import QObject, QTimer, QRunnable
+from app.JobScheduler import JobScheduler, Priority
+
+if TYPE_CHECKING: from app.ImageFIles import ImageFiles
+
+# ------------------------------------------------------------------------------------------
+# --- class EditJournal --------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+debug : bool = True
+# ------------------------------------------------------------------------------------------
+class EditJournal(QObject):
+    """write-behind persistence of processpipe edits.
+
+        record() stores the last processpipe of an image in memory (GUI thread, no IO),
+        edits are coalesced per image and flushed on a worker thread after 'delay' ms (or on image switch, or at quit):
+            (1) appended to the journal log ('.uHDR/journal.log', fsync): crash safe,
+            (2) written to catalog and image json file,
+            (3) journal log is compacted (truncated) when all edits are written.
+        records of the journal log not written (crash) are recovered when the directory is opened.
+    """
+    # class attributes
+    logFilename : str = 'journal.log'
+
+    # constructor
+    def __init__(self: EditJournal, imageFiles: ImageFiles, delay: int = 500) -> None:
+        super().__init__()
+
+        self.imageFiles : ImageFiles = imageFiles
+        self.lock : threading.Lock = threading.Lock()           # protects pending
+        self.writeLock : threading.Lock = threading.Lock()      # serializes writes
+        self.pending : dict[str, list|dict] = {}
+        self.writing : dict[str, list|dict] = {}                # edits being written
+        self.logPath : str|None = None
+
+        self.timer : QTimer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.flush)
+
+    # methods
+    # ------------------------------------------------------------------------------------
+    def setDirectory(self: EditJournal, imagePath: str, extraPath: str) -> None:
+        """set journal log of directory and recover edits not written."""
+        self.logPath = os.path.join(imagePath, extraPath, EditJournal.logFilename)
+        self.recover()
+    # ------------------------------------------------------------------------------------
+    def record(self: EditJournal, imageName: str, processpipe: list|dict) -> None:
+        """record processpipe of image, write is delayed (coalesced per image)."""
+        with self.lock: self.pending[imageName] = deepcopy(processpipe)
+        if not self.timer.isActive(): self.timer.start()
+    # ------------------------------------------------------------------------------------
+    def get(self: EditJournal, imageName: str) -> list|dict|None:
+        """return processpipe of image recorded but not yet written, None if no pending edit."""
+        with self.lock:
+            if imageName in self.pending: return deepcopy(self.pending[imageName])
+            if imageName in self.writing: return deepcopy(self.writing[imageName])
+            return None
+    # ------------------------------------------------------------------------------------
+    def flush(self: EditJournal) -> None:
+        """write pending edits on a worker thread."""
+        self.timer.stop()
+        with self.lock:
+            if not self.pending: return
+        JobScheduler.instance().submit(RunWriteJournal(self), Priority.BATCH, key='EditJournal.write')
+    # ------------------------------------------------------------------------------------
+    def flushSync(self: EditJournal) -> None:
+        """write pending edits now (quit, directory change)."""
+        self.timer.stop()
+        self.write()
+    # ------------------------------------------------------------------------------------
+    def write(self: EditJournal) -> None:
+        """append pending edits to journal log, write them to catalog and json files, compact journal log."""
+        with self.writeLock:
+            with self.lock:
+                edits : dict[str, list|dict] = self.pending
+                self.pending = {}
+                if not edits or not self.logPath: return
+                self.writing = edits
+
+            if debug: print(f'EditJournal.write({list(edits.keys())})')
+
+            # (1) journal log
+            with open(self.logPath, 'a') as log:
+                for name, processpipe in edits.items(): log.write(json.dumps({'name': name, 'processpipe': processpipe})+'\n')
+                log.flush()
+                os.fsync(log.fileno())
+
+            # (2) catalog and json files
+            self.apply(edits)
+
+            # (3) compaction
+            with self.lock:
+                self.writing = {}
+                if not self.pending: open(self.logPath, 'w').close()
+    # ------------------------------------------------------------------------------------
+    def apply(self: EditJournal, edits: dict[str, list|dict]) -> None:
+        if self.imageFiles.catalog: self.imageFiles.catalog.setMany('processpipe', edits)
+        for name, processpipe in edits.items(): self.imageFiles.writeProcesspipe(name, processpipe)
+    # ------------------------------------------------------------------------------------
+    def recover(self: EditJournal) -> None:
+        """write edits of journal log (left by a crash), then compact it."""
+        if not self.logPath or not os.path.isfile(self.logPath): return
+
+        edits : dict[str, list|dict] = {}
+        with open(self.logPath) as log:
+            for line in log:
+                try:
+                    entry : dict = json.loads(line)
+                    edits[entry['name']] = entry['processpipe']     # last edit wins
+                except (ValueError, KeyError): pass                 # incomplete last line
+        if edits:
+            if debug: print(f'EditJournal.recover({list(edits.keys())})')
+            self.apply(edits)
+        open(self.logPath, 'w').close()
+
+# ------------------------------------------------------------------------------------------
+# --- class RunWriteJournal ----------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+class RunWriteJournal(QRunnable):
+    def __init__(self: RunWriteJournal, parent: EditJournal) -> None:
+        super().__init__()
+        self.parent : EditJournal = parent
+
+    def run(self: RunWriteJournal) -> None:
+        self.parent.write()
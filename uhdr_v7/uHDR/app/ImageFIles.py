@@ -1,15 +1,21 @@
 # ImageFiles.py
 from __future__ import annotations
-import os
+import os, bisect
 from core.image import Image, filenamesplit
 from numpy import ndarray
 import numpy as np
 
-from PyQt6.QtCore import QObject, pyqtSignal, QThreadPool, QRunnable
-from app.Jexif import Jexif
+from PyQt6.QtCore import QObject, pyqtSignal, QRunnable
+from PyQt6.QtGui import QImage
+from app.JobScheduler import JobScheduler, Priority
 from app.Tags import Tags
-from app.Score import Score
+from app.Jexif import Jexif
+from app.Catalog import Catalog
+from app.EditJournal import EditJournal
+from app.DirectoryWatcher import DirectoryWatcher
+from app.ImportPipeline import ImportPipeline
 from preferences.Prefs import Prefs
+from guiQt.ImageWidget import ImageWidget
 import json
 
 debug: bool = True
@@ -17,6 +23,7 @@ debug: bool = True
 class ImageFiles(QObject):
     """Manages image files in the directory: asynchronous loading, caching images."""
     imageLoaded: pyqtSignal = pyqtSignal(str)
+    filesChanged: pyqtSignal = pyqtSignal(list, list, list)    # added, removed, modified (image lists already updated)
 
     def __init__(self: ImageFiles) -> None: 
         super().__init__()
@@ -27,16 +34,26 @@ class ImageFiles(QObject):
         self.imageIsLoaded: dict[str, bool] = {}
         self.imageIsThumbnail: dict[str, bool] = {}
         self.images: dict[str, ndarray] = {}
+        self.tiles: dict[str, QImage] = {}              # display-ready gallery images (converted by loader)
+        self.tileSize: tuple[int, int] | None = None    # device pixel size of gallery images
         self.imageScore: dict[str, int] = {}
         self.imageTags: dict[str, Tags] = {}
         self.imageExif: dict[str, dict[str, str]] = {}
-        self.pool = QThreadPool.globalInstance()
+        self.catalog: Catalog | None = None
+        self.journal: EditJournal = EditJournal(self)
+        self.watcher: DirectoryWatcher = DirectoryWatcher(tuple(Prefs.imgExt))
+        self.watcher.filesChanged.connect(self.CBfilesChanged)
+        self.importPipeline: ImportPipeline = ImportPipeline(self)
+        self.scheduler: JobScheduler = JobScheduler.instance()
+        self.loadGroup: str = 'imageFiles'
+        self.loadGeneration: int = self.scheduler.generation(self.loadGroup)
 
     def reset(self: ImageFiles):
         self.imageFilenames = []
         self.imageIsLoaded = {}
         self.imageIsThumbnail = {}
         self.images = {}
+        self.tiles = {}
         self.imageScore = {}
         self.imageTags = {}
         self.imageExif = {}
@@ -73,6 +90,9 @@ class ImageFiles(QObject):
         """Set directory: scan for image files."""
         if debug: print(f'ImageFiles.setDirectory({dirPath})')
 
+        # write pending edits of previous directory
+        self.journal.flushSync()
+
         self.reset()
         self.imagePath = dirPath
         ext: tuple[str] = tuple(Prefs.imgExt)
@@ -85,25 +105,88 @@ class ImageFiles(QObject):
 
         self.checkExtra()
 
+        # tags, exif, score: single query in directory catalog
+        if self.catalog: self.catalog.close()
+        self.catalog = Catalog(self.imagePath, self.extraPath)
+        records: dict[str, dict] = self.catalog.loadAll(self.imageFilenames)
+        self.journal.setDirectory(self.imagePath, self.extraPath)
+
         for filename in self.imageFilenames:
-            self.imageTags[filename] = Tags.load(self.imagePath, filename, self.extraPath)
-            self.imageExif[filename] = Jexif.load(self.imagePath, filename, self.extraPath)
-            self.imageScore[filename] = Score.load(self.imagePath, filename, self.extraPath)
+            self.imageTags[filename] = Tags(records[filename]['tags'])
+            self.imageExif[filename] = records[filename]['exif']
+            self.imageScore[filename] = records[filename]['score']
+
+        # incremental updates of image files
+        self.watcher.setDirectory(self.imagePath, self.imageFilenames)
+
+        # background import of all images (thumbnails, exif, stats)
+        self.importPipeline.start(self.imageFilenames)
 
         return len(self.imageFilenames)
 
-    def requestLoad(self: ImageFiles, filename: str, thumbnail: bool = True):
-        """Add an image loading request to pool thread."""
-        if debug: print(f'ImageFiles.requestLoad({filename}, thumbnail={thumbnail})')
+    def CBfilesChanged(self: ImageFiles, added: list[str], removed: list[str], modified: list[str]) -> None:
+        """Callback: image files added, removed or modified in directory (see DirectoryWatcher), no rescan."""
+        if debug: print(f'ImageFiles.CBfilesChanged(added:{added}, removed:{removed}, modified:{modified})')
 
-        if not self.imageIsLoaded[filename]:
-            self.imageTags[filename] = Tags.load(self.imagePath, filename, self.extraPath)
-            self.imageExif[filename] = Jexif.load(self.imagePath, filename, self.extraPath)
-            self.imageScore[filename] = Score.load(self.imagePath, filename, self.extraPath)
+        removed = [filename for filename in removed if filename in self.imageIsLoaded]
+        for filename in removed:
+            del self.imageFilenames[bisect.bisect_left(self.imageFilenames, filename)]
+            for d in (self.imageIsLoaded, self.imageIsThumbnail, self.images, self.tiles, self.imageScore, self.imageTags, self.imageExif): d.pop(filename, None)
+            self.removeThumbnail(filename)
+        if removed and self.catalog: self.catalog.remove(removed)
 
+        # image data are read again (exif and thumbnail), tags and score are kept
+        modified = [filename for filename in modified if filename in self.imageIsLoaded]
+        for filename in modified:
+            self.imageIsLoaded[filename] = False
+            for d in (self.images, self.tiles): d.pop(filename, None)
+            self.removeThumbnail(filename)
+            exifFilename: str = os.path.join(self.imagePath, self.extraPath, filename[:-3] + 'jexif')
+            if os.path.exists(exifFilename): os.remove(exifFilename)
+        if modified:
+            exifs: dict[str, dict[str, str]] = Jexif.loadAll(self.imagePath, modified, self.extraPath)
+            self.imageExif.update(exifs)
+            if self.catalog: self.catalog.setMany('exif', exifs)
+
+        added = [filename for filename in added if filename not in self.imageIsLoaded]
+        if added:
+            records: dict[str, dict] = self.catalog.loadAll(added) if self.catalog else {}
+            for filename in added:
+                bisect.insort(self.imageFilenames, filename)
+                self.imageIsLoaded[filename] = False
+                self.imageTags[filename] = Tags(records[filename]['tags'] if filename in records else {})
+                self.imageExif[filename] = records[filename]['exif'] if filename in records else {}
+                self.imageScore[filename] = records[filename]['score'] if filename in records else 0
+
+        self.nbImages = len(self.imageFilenames)
+        self.importPipeline.request(added + modified)
+        self.filesChanged.emit(added, removed, modified)
+
+    def removeThumbnail(self: ImageFiles, filename: str) -> None:
+        """Remove thumbnail files (pyramid) of image (rebuilt when image is imported)."""
+        for level in ImportPipeline.levels:
+            thumbnailName: str = self.importPipeline.thumbnailName(filename, level)
+            if os.path.exists(thumbnailName): os.remove(thumbnailName)
+
+    def newRequestGeneration(self: ImageFiles) -> int:
+        """Cancel queued loading requests (call before requesting a new page of images)."""
+        self.loadGeneration = self.scheduler.newGeneration(self.loadGroup)
+        return self.loadGeneration
+
+    def setTileSize(self: ImageFiles, size: tuple[int, int] | None) -> None:
+        """Set device pixel size of gallery images, tiles of another size are converted again when requested."""
+        if size != self.tileSize:
+            self.tileSize = size
+            self.tiles = {}
+
+    def requestLoad(self: ImageFiles, filename: str, thumbnail: bool = True, priority: Priority = Priority.VISIBLE):
+        """Add an image loading request to the job scheduler (duplicate requests for a queued file are dropped, prefetch of a loaded image does nothing)."""
+        if debug: print(f'ImageFiles.requestLoad({filename}, thumbnail={thumbnail}, priority={priority.name})')
+
+        if not self.imageIsLoaded[filename] or filename not in self.tiles:
             filename_ = os.path.join(self.imagePath, filename)
-            self.pool.start(RunLoadImage(self, filename_, thumbnail))
-        else:
+            self.scheduler.submit(RunLoadImage(self, filename_, thumbnail, self.tileSize), priority, key=filename_, group=self.loadGroup)
+        elif priority > Priority.PREFETCH:
             self.imageLoaded.emit(filename)
 
     def endLoadImage(self: ImageFiles, error: bool, filename: str):
@@ -125,6 +208,10 @@ class ImageFiles(QObject):
             return np.zeros((0, 0, 3))
         return image
 
+    def getTile(self: ImageFiles, name: str) -> QImage | None:
+        """Get display-ready gallery image, None if not converted at current tile size."""
+        return self.tiles.get(name)
+
     def getImageTags(self: ImageFiles, name: str) -> Tags: 
         return self.imageTags[name]
 
@@ -141,15 +228,16 @@ class ImageFiles(QObject):
 
     def updateImageTag(self: ImageFiles, imageName: str, type: str, name: str, value: bool) -> None:
         self.imageTags[imageName].add(type, name, value)
-        self.imageTags[imageName].save(self.imagePath, self.extraPath, imageName)
+        self.catalog.set(imageName, 'tags', self.imageTags[imageName].tags)
 
     def updateImageScore(self: ImageFiles, imageName: str, value: int) -> None:
         self.imageScore[imageName] = value
-        Score.save(self.imagePath, self.extraPath, imageName, self.imageScore[imageName])
+        self.catalog.set(imageName, 'score', self.imageScore[imageName])
 
     def updateImage(self: ImageFiles, imageName: str, new_image: Image) -> None:
         """Update the image data with the new processed image."""
         self.images[imageName] = new_image.cData
+        self.tiles.pop(imageName, None)
 
     def getProcesspipe(self, namefile: str) -> list | None:
         """
@@ -163,6 +251,16 @@ class ImageFiles(QObject):
         
         """
 
+        # edit not yet written
+        processpipe = self.journal.get(namefile)
+        if processpipe is not None:
+            return processpipe
+
+        if self.catalog and namefile in self.imageFilenames:
+            processpipe = self.catalog.get(namefile, 'processpipe')
+            if processpipe is not None:
+                return processpipe
+
         path, name, ext = filenamesplit(namefile)
         if ext != 'json':
             namefile = f"{name}.json"
@@ -188,6 +286,21 @@ class ImageFiles(QObject):
             return None
 
     def saveProcesspipe(self, namefile: str, dico: dict) -> bool | None:
+        """
+        Record the 'processpipe' of the image in the edit journal:
+        catalog and JSON file are written later on a worker thread (see EditJournal)
+
+        Args:
+            namefile (str, Required)
+            dico (dict, Required)
+                
+        Returns:
+            (bool, Required): bool
+        """
+        self.journal.record(namefile, dico)
+        return True
+
+    def writeProcesspipe(self, namefile: str, dico: dict) -> bool | None:
         """
         Get the 'processpipe' list in the given JSON file
         and change the values to then write it back to the file to save the changes
@@ -221,27 +334,24 @@ class ImageFiles(QObject):
             return False
         
 class RunLoadImage(QRunnable):
-    def __init__(self: RunLoadImage, parent: ImageFiles, filename: str, thumbnail: bool = True):
+    def __init__(self: RunLoadImage, parent: ImageFiles, filename: str, thumbnail: bool = True, tileSize: tuple[int, int] | None = None):
         super().__init__()
         self.parent: ImageFiles = parent
         self.filename: str = filename
         self.thumbnail: bool = thumbnail
+        self.tileSize: tuple[int, int] | None = tileSize
 
     def run(self: RunLoadImage):
         if debug: print(f'RunLoadImage.run({self.filename})')
 
         try:
-            if os.path.exists(self.filename):
+            key: str = self.filename.split('\\')[-1]
+            if self.parent.imageIsLoaded.get(key) and key in self.parent.images:
+                pass                                                    # already loaded: only the display-ready tile is missing
+            elif os.path.exists(self.filename):
                 if self.thumbnail: 
-                    path, name, ext = filenamesplit(self.filename)
-                    thumbnailName: str = os.path.join(path, Prefs.extraPath, Prefs.thumbnailPrefix + name + '.' + ext)
-                    
-                    if os.path.exists(thumbnailName):
-                        imageSmall: Image = Image.read(thumbnailName)
-                    else:
-                        imageBig: Image = Image.read(self.filename)
-                        imageSmall: Image = imageBig.buildThumbnail(Prefs.thumbnailMaxSize)
-                        imageSmall.write(thumbnailName)
+                    # thumbnail of imported image, visible images are imported first (see ImportPipeline)
+                    imageSmall: Image = self.parent.importPipeline.importImage(os.path.basename(self.filename))
                     
                     self.parent.images[self.filename.split('\\')[-1]] = imageSmall.cData 
                 else:
@@ -253,6 +363,10 @@ class RunLoadImage(QRunnable):
                     print(f"Image stored with key: {self.filename.split('\\')[-1]}")
                 else:
                     print(f"Failed to store image with key: {self.filename.split('\\')[-1]}")
+
+            # display-ready gallery image: converted here, not on the GUI thread
+            if key in self.parent.images and self.tileSize == self.parent.tileSize:
+                self.parent.tiles[key] = ImageWidget.toQImage(self.parent.images[key], self.tileSize)
             
             self.parent.endLoadImage(False, self.filename)
         except(IOError, ValueError) as e:
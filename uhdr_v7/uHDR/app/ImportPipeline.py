@@ -0,0 +1,178 @@
+from __future__ import annotations
+# uHDR: HDR image editing software
+#   Copyright (C) 2022  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020-2022
+# author: remi.cozot@univ-littoral.fr
+
+# import
+# ------------------------------------------------------------------------------------------
+import os, threading
+import numpy as np
+from typing import TYPE_CHECKING
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from app.JobScheduler import JobScheduler, Priority
+from app.Jexif import Jexif
+from core.image import Image, filenamesplit
+from preferences.Prefs import Prefs
+
+if TYPE_CHECKING: from app.ImageFIles import ImageFiles
+
+# ------------------------------------------------------------------------------------------
+# --- class ImportPipeline -----------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+debug : bool = True
+# ------------------------------------------------------------------------------------------
+class ImportPipeline(QObject):
+    """import of images of a directory: background batch (BATCH priority) over all images, results are persisted.
+
+        import of an image (importImage, any thread):
+            (1) thumbnail pyramid: thumbnail (Prefs.thumbnailMaxSize, also the render of the default process-pipe) and reduced levels (levels),
+            (2) exif (jexif file and catalog),
+            (3) luminance stats and colour palette (catalog 'stats' field).
+        an image is up to date when its catalog stats have the mtime and size of the image file and all thumbnail files exist: nothing is recomputed.
+        visible images go first: the gallery loader (VISIBLE priority) imports the images it loads, the batch skips them.
+    """
+    # class attributes
+    group : str = 'import'
+    levels : list[int] = [1, 4]                 # thumbnail pyramid: thumbnail max size divided by level
+    paletteSize : int = 5
+    ## signal
+    progress : pyqtSignal = pyqtSignal(int, int)    # done, total
+
+    # constructor
+    def __init__(self: ImportPipeline, imageFiles: ImageFiles) -> None:
+        super().__init__()
+
+        self.imageFiles : ImageFiles = imageFiles
+        self.scheduler : JobScheduler = JobScheduler.instance()
+        self.lock : threading.Lock = threading.Lock()                       # protects locks, generation, done, total
+        self.locks : dict[str, threading.Lock] = {}                         # per image: one import at a time
+        self.generation : int = 0                                           # jobs of previous directories are not counted
+        self.done : int = 0
+        self.total : int = 0
+
+    # methods
+    # ------------------------------------------------------------------------------------
+    def start(self: ImportPipeline, filenames: list[str]) -> None:
+        """import images of directory (queued imports of previous directory are cancelled)."""
+        if debug: print(f'ImportPipeline.start({len(filenames)} images)')
+        generation : int = self.scheduler.newGeneration(ImportPipeline.group)
+        with self.lock: self.generation, self.done, self.total, self.locks = generation, 0, 0, {}
+        self.request(filenames)
+    # ------------------------------------------------------------------------------------
+    def request(self: ImportPipeline, filenames: list[str]) -> None:
+        """add images to the import batch (new or modified images), images already queued are not counted twice."""
+        with self.lock: generation : int = self.generation
+        for filename in filenames:
+            if self.scheduler.submit(RunImportImage(self, filename, generation), Priority.BATCH, key=ImportPipeline.group+':'+filename, group=ImportPipeline.group):
+                with self.lock:
+                    if generation == self.generation: self.total += 1
+    # ------------------------------------------------------------------------------------
+    def endImport(self: ImportPipeline, generation: int) -> None:
+        """count an import of generation (imports of previous directories are ignored)."""
+        with self.lock:
+            if generation != self.generation: return
+            self.done += 1
+            done, total = self.done, self.total
+        self.progress.emit(done, total)
+    # ------------------------------------------------------------------------------------
+    def thumbnailName(self: ImportPipeline, filename: str, level: int = 1) -> str:
+        """return filename of thumbnail of level."""
+        path, name, ext = filenamesplit(os.path.join(self.imageFiles.imagePath, filename))
+        prefix : str = Prefs.thumbnailPrefix if level == 1 else Prefs.thumbnailPrefix + str(level) + Prefs.thumbnailPrefix
+        return os.path.join(path, Prefs.extraPath, prefix + name + '.' + ext)
+    # ------------------------------------------------------------------------------------
+    def isUpToDate(self: ImportPipeline, filename: str) -> bool:
+        """return True if image is imported and its file has not changed since."""
+        catalog = self.imageFiles.catalog
+        stats : dict|None = catalog.get(filename, 'stats') if catalog else None
+        if stats == None: return False
+        try: st : os.stat_result = os.stat(os.path.join(self.imageFiles.imagePath, filename))
+        except OSError: return False
+        return stats.get('mtime') == st.st_mtime and stats.get('size') == st.st_size \
+            and all(os.path.exists(self.thumbnailName(filename, level)) for level in ImportPipeline.levels)
+    # ------------------------------------------------------------------------------------
+    def importImage(self: ImportPipeline, filename: str, load: bool = True) -> Image|None:
+        """import image if not up to date, return its thumbnail if load is True (any thread)."""
+        with self.lock: lock : threading.Lock = self.locks.setdefault(filename, threading.Lock())
+
+        with lock:
+            if self.isUpToDate(filename):
+                return Image.read(self.thumbnailName(filename)) if load else None
+
+            if debug: print(f'ImportPipeline.importImage({filename})')
+            imagePath : str = os.path.join(self.imageFiles.imagePath, filename)
+            st : os.stat_result = os.stat(imagePath)
+
+            # (1) thumbnail pyramid
+            imagePreview : Image = Image.readPreview(imagePath, Prefs.thumbnailMaxSize)      # reduced resolution decode
+            thumbnail : Image = imagePreview.buildThumbnail(Prefs.thumbnailMaxSize)
+            del imagePreview
+            for level in ImportPipeline.levels:
+                image : Image = thumbnail if level == 1 else thumbnail.buildThumbnail(Prefs.thumbnailMaxSize//level)
+                image.write(self.thumbnailName(filename, level))
+
+            # (2) exif: jexif file (built by exiftool if missing)
+            exif : dict[str, str] = Jexif.load(self.imageFiles.imagePath, filename, self.imageFiles.extraPath)
+
+            # (3) stats and palette (smallest level)
+            small : np.ndarray = thumbnail.cData if len(ImportPipeline.levels) == 1 else image.cData
+            stats : dict = ImportPipeline.imageStats(small)
+            stats['mtime'], stats['size'] = st.st_mtime, st.st_size
+
+            catalog = self.imageFiles.catalog
+            if catalog:
+                if exif and not catalog.get(filename, 'exif'): catalog.set(filename, 'exif', exif)
+                catalog.set(filename, 'stats', stats)
+
+            return thumbnail if load else None
+
+    # static methods
+    # ------------------------------------------------------------------------------------
+    @staticmethod
+    def imageStats(cData: np.ndarray) -> dict:
+        """return luminance stats (Y: Rec. 709 weights of colour data) and colour palette (most populated 4 bits per channel bins)."""
+        rgb : np.ndarray = cData.reshape(-1, 3)
+        Y : np.ndarray = rgb @ np.asarray([0.2126, 0.7152, 0.0722], dtype=rgb.dtype)
+        p01, p50, p99 = np.percentile(Y, [1, 50, 99])
+        luminance : dict[str, float] = {'min': float(Y.min()), 'mean': float(Y.mean()), 'max': float(Y.max()),
+                                        'p01': float(p01), 'p50': float(p50), 'p99': float(p99)}
+
+        # palette: mean colour of the most populated bins
+        bins : np.ndarray = np.clip(rgb*16, 0, 15).astype(np.intp)
+        index : np.ndarray = (bins[:,0]*16 + bins[:,1])*16 + bins[:,2]
+        counts : np.ndarray = np.bincount(index, minlength=4096)
+        sums : np.ndarray = np.stack([np.bincount(index, weights=rgb[:,c], minlength=4096) for c in range(3)], axis=-1)
+        best : np.ndarray = np.argsort(counts)[::-1][:ImportPipeline.paletteSize]
+        best = best[counts[best] > 0]
+        palette : list[list[float]] = (sums[best]/counts[best][:,np.newaxis]).tolist()
+        weights : list[float] = (counts[best]/len(index)).tolist()
+
+        return {'luminance': luminance, 'palette': palette, 'paletteWeights': weights}
+
+# ------------------------------------------------------------------------------------------
+# --- class RunImportImage -----------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+class RunImportImage(QRunnable):
+    def __init__(self: RunImportImage, parent: ImportPipeline, filename: str, generation: int) -> None:
+        super().__init__()
+        self.parent : ImportPipeline = parent
+        self.filename : str = filename
+        self.generation : int = generation
+
+    def run(self: RunImportImage) -> None:
+        # any failure (decoder, exif, catalog) ends the import of the image: the generation completes
+        try: self.parent.importImage(self.filename, load=False)
+        except Exception as e: print(f'[ERROR] RunImportImage.run({self.filename}): {e}')
+        finally: self.parent.endImport(self.generation)
@@ -47,6 +47,20 @@ class Jexif:
                     return jexif
         return {"Color Space": "unkwown", "Bits Per Sample": "-1", "Type": "unkwown", "Size": "-1 x -1"} # default value
 
+    @staticmethod
+    def loadAll(imageDir: str, imageFilenames: list[str], extraDir : str) -> dict[str, dict[str, str]]:
+        """load jexif of all images: missing jexif files are built with a single exiftool call."""
+        extraPath = os.path.join(imageDir, extraDir) 
+        if os.path.isdir(extraPath):
+            missing : list[str] = [f for f in imageFilenames if not os.path.exists(os.path.join(imageDir,extraDir,f[:-3]+'jexif'))]
+            rawExifs : dict[str, dict[str, str]] = Exif.readExifBatch(imageDir, missing)
+            for imageFilename, rawExif in rawExifs.items():
+                if rawExif:
+                    exifFilename= os.path.join(imageDir,extraDir,imageFilename[:-3]+'jexif')
+                    with open(exifFilename, 'w') as exifFile:
+                        json.dump(Exif.recoverExifData(rawExif), exifFile)
+        return {f: Jexif.load(imageDir, f, extraDir) for f in imageFilenames}
+
     @staticmethod
     def toTuple(exifDict: dict[str, str]) -> tuple[tuple[int,int], str, str, int] :
         size : tuple[int,int] = (int(exifDict['Size'].split('x')[0]),int(exifDict['Size'].split('x')[-1]))
@@ -0,0 +1,173 @@
+from __future__ import annotations
+# uHDR: HDR image editing software
+#   Copyright (C) 2022  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020-2022
+# author: remi.cozot@univ-littoral.fr
+
+# import
+# ------------------------------------------------------------------------------------------
+import enum, threading
+from PyQt6.QtCore import QRunnable, QThreadPool
+
+# ------------------------------------------------------------------------------------------
+# --- class Priority -----------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+debug : bool = True
+# ------------------------------------------------------------------------------------------
+class Priority(enum.IntEnum):
+    """job priority classes, highest value runs first: edit > visible > prefetch > batch."""
+    BATCH : int = 0
+    PREFETCH : int = 1
+    VISIBLE : int = 2
+    EDIT : int = 3
+
+# ------------------------------------------------------------------------------------------
+# --- class JobScheduler -------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+class JobScheduler:
+    """central scheduler of thread pool jobs: priority classes, cancellation by group generation, dedup by key (filename)."""
+
+    # class attributes
+    __instance : JobScheduler | None = None
+
+    # constructor
+    def __init__(self: JobScheduler, pool: QThreadPool) -> None:
+
+        self.pool : QThreadPool = pool
+        self.lock : threading.Lock = threading.Lock()
+
+        self.generations : dict[str, int] = {}
+        self.queued : set[Job] = set()
+        self.keys : dict[str, Job] = {}
+        self.running : dict[Priority, int] = {p: 0 for p in Priority}
+        self.counters : dict[str, int] = {'submitted': 0, 'started': 0, 'done': 0, 'cancelled': 0, 'dropped': 0}
+
+    # static methods
+    # ------------------------------------------------------------------------------------
+    @staticmethod
+    def instance() -> JobScheduler:
+        """return the scheduler shared by the application (on the Qt global thread pool)."""
+        if not JobScheduler.__instance: JobScheduler.__instance = JobScheduler(QThreadPool.globalInstance())
+        return JobScheduler.__instance
+
+    # methods
+    # ------------------------------------------------------------------------------------
+    ## generation
+    def generation(self: JobScheduler, group: str) -> int:
+        """return current generation of group."""
+        with self.lock: return self.generations.get(group, 0)
+    # ------------------------------------------------------------------------------------
+    def newGeneration(self: JobScheduler, group: str) -> int:
+        """start a new generation of group: queued jobs of group are removed from the pool."""
+        with self.lock:
+            generation : int = self.generations.get(group, 0) + 1
+            self.generations[group] = generation
+            nbCancelled : int = 0
+            for job in list(self.queued):
+                if job.group == group and self.pool.tryTake(job):
+                    self.__unqueue(job)
+                    self.counters['cancelled'] += 1
+                    nbCancelled += 1
+
+        if debug: print(f'JobScheduler.newGeneration({group}) -> {generation}, cancelled: {nbCancelled}')
+        return generation
+    # ------------------------------------------------------------------------------------
+    def isCurrent(self: JobScheduler, group: str, generation: int) -> bool:
+        """return True if generation is the current generation of group."""
+        return self.generation(group) == generation
+    # ------------------------------------------------------------------------------------
+    ## submit
+    def submit(self: JobScheduler, runnable: QRunnable, priority: Priority = Priority.BATCH, key: str|None = None, group: str|None = None) -> bool:
+        """submit runnable to the thread pool, return False if dropped (same key already queued with higher or equal priority)."""
+        with self.lock:
+            generation : int = self.generations.get(group, 0)
+            if key != None and key in self.keys:
+                queuedJob : Job = self.keys[key]
+                if queuedJob.generation == self.generations.get(queuedJob.group, 0) and queuedJob.priority >= priority:
+                    self.counters['dropped'] += 1
+                    return False
+                # stale or lower priority: replace it
+                if self.pool.tryTake(queuedJob):
+                    self.__unqueue(queuedJob)
+                    self.counters['cancelled'] += 1
+            job : Job = Job(self, runnable, priority, key, group, generation)
+            self.queued.add(job)
+            if key != None: self.keys[key] = job
+            self.counters['submitted'] += 1
+
+        self.pool.start(job, int(priority))
+        return True
+    # ------------------------------------------------------------------------------------
+    ## metrics
+    def queueDepth(self: JobScheduler) -> dict[str, int]:
+        """return number of queued (not started) jobs per priority class."""
+        with self.lock:
+            res : dict[str, int] = {p.name: 0 for p in Priority}
+            for job in self.queued: res[job.priority.name] += 1
+            return res
+    # ------------------------------------------------------------------------------------
+    def metrics(self: JobScheduler) -> dict:
+        """return queue depth, running jobs per priority class and job counters."""
+        queued : dict[str, int] = self.queueDepth()
+        with self.lock:
+            return {'queued': queued,
+                    'running': {p.name: n for p, n in self.running.items()},
+                    'threads': self.pool.activeThreadCount(),
+                    **self.counters}
+    # ------------------------------------------------------------------------------------
+    ## job callbacks (worker threads)
+    def begin(self: JobScheduler, job: Job) -> bool:
+        """called by job before running: return False if its generation is over."""
+        with self.lock:
+            self.__unqueue(job)
+            if job.group != None and job.generation != self.generations.get(job.group, 0):
+                self.counters['cancelled'] += 1
+                return False
+            self.running[job.priority] += 1
+            self.counters['started'] += 1
+            return True
+    # ------------------------------------------------------------------------------------
+    def end(self: JobScheduler, job: Job) -> None:
+        """called by job after running."""
+        with self.lock:
+            self.running[job.priority] -= 1
+            self.counters['done'] += 1
+    # ------------------------------------------------------------------------------------
+    def __unqueue(self: JobScheduler, job: Job) -> None:
+        self.queued.discard(job)
+        if job.key != None and self.keys.get(job.key) is job: del self.keys[job.key]
+
+# ------------------------------------------------------------------------------------------
+# --- class Job ----------------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+class Job(QRunnable):
+    """runnable submitted to the scheduler: skipped if its generation is over."""
+    # constructor
+    def __init__(self: Job, scheduler: JobScheduler, runnable: QRunnable, priority: Priority, key: str|None, group: str|None, generation: int) -> None:
+        super().__init__()
+        self.scheduler : JobScheduler = scheduler
+        self.runnable : QRunnable = runnable
+        self.priority : Priority = Priority(priority)
+        self.key : str|None = key
+        self.group : str|None = group
+        self.generation : int = generation
+
+    # methods
+    # ------------------------------------------------------------------------------------
+    def run(self: Job) -> None:
+        if not self.scheduler.begin(self): return
+        try:
+            self.runnable.run()
+        finally:
+            self.scheduler.end(self)
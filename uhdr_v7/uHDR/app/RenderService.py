@@ -0,0 +1,308 @@
+from __future__ import annotations
+# uHDR: HDR image editing software
+#   Copyright (C) 2022  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020-2022
+# author: remi.cozot@univ-littoral.fr
+
+# import
+# ------------------------------------------------------------------------------------------
+import copy, threading, time
+from collections import deque
+from typing import Callable
+from PyQt6.QtCore import QObject, QRunnable, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage
+import preferences.Prefs
+from app.JobScheduler import JobScheduler, Priority
+from core.image import Image
+from guiQt.ImageWidget import ImageWidget
+from hdrCore import coreC
+
+# ------------------------------------------------------------------------------------------
+# --- class PreviewPolicy ------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+debug : bool = True
+# ------------------------------------------------------------------------------------------
+class PreviewPolicy:
+    """progressive preview policy: while requests arrive quickly (drag), a proxy (reduced size) is rendered,
+        when requests stop for 'settleDelay' ms the last request is rendered at working size.
+    """
+    # constructor
+    def __init__(self: PreviewPolicy, enabled: bool = True, proxySize: int = 300, dragInterval: int = 100, settleDelay: int = 150) -> None:
+        self.enabled : bool = enabled
+        self.proxySize : int = proxySize            # px, largest side of proxy image
+        self.dragInterval : int = dragInterval      # ms, interval between requests below which editing is a drag
+        self.settleDelay : int = settleDelay        # ms, delay without request before refinement
+
+    # methods
+    # ------------------------------------------------------------------------------------
+    def isDragging(self: PreviewPolicy, interval: float) -> bool:
+        """return True if a request coming 'interval' seconds after the previous one must be rendered as a proxy."""
+        return self.enabled and 1000*interval < self.dragInterval
+
+    # static methods
+    # ------------------------------------------------------------------------------------
+    @staticmethod
+    def fromPrefs() -> PreviewPolicy:
+        """return policy set in preferences ('gui' > 'preview')."""
+        return PreviewPolicy(**preferences.Prefs.Prefs.preview)
+
+# ------------------------------------------------------------------------------------------
+# --- class RenderService ------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+class RenderService(QObject):
+    """asynchronous rendering of the edited image (process-pipe computed on a worker thread).
+
+        requestRender() (GUI thread) only stores the request: requests are coalesced, the latest one wins,
+        at most one render is in flight; when it ends the latest pending request (if any) is rendered.
+        cancel() (image changed) drops pending request and result of render in flight.
+        results are delivered on the GUI thread by the 'rendered' signal: (image name, image, display QImage converted on the worker thread at requested display size),
+        a failed render is delivered by the 'failed' signal: (image name, error message).
+        slider-to-pixels latency of each request is measured until a result at least as recent is delivered.
+        progressive preview (see PreviewPolicy): during a drag the proxy image is rendered, the working size image when it settles.
+    """
+    # signals
+    rendered = pyqtSignal(str, object, object)
+    failed = pyqtSignal(str, str)
+    renderDone = pyqtSignal(int, int, str, object, object)   # worker thread -> GUI thread: generation, cancel generation, image name, image, display QImage
+    renderFailed = pyqtSignal(int, int, str, str)            # worker thread -> GUI thread: generation, cancel generation, image name, error message
+
+    # class attributes
+    nbLatencySamples : int = 1000
+
+    # constructor
+    def __init__(self: RenderService, compute: Callable[[Image, list], Image] = coreC.coreCcompute, policy: PreviewPolicy|None = None) -> None:
+        super().__init__()
+
+        self.compute : Callable[[Image, list], Image] = compute
+        self.policy : PreviewPolicy = policy if policy else PreviewPolicy.fromPrefs()
+        self.lock : threading.Lock = threading.Lock()  # protects pending, running and generations
+
+        self.pending : tuple[int, str, Image, list, tuple|None]|None = None     # (generation, image name, source image, processpipe, display size)
+        self.running : bool = False
+        self.generation : int = 0               # generation of last request
+        self.cancelGeneration : int = 0         # incremented by cancel()
+        self.deliveredGeneration : int = 0      # generation of last delivered result
+
+        self.requestTimes : dict[int, float] = {}           # GUI thread only
+        self.latencies : deque[float] = deque(maxlen=RenderService.nbLatencySamples)
+        self.nbRenders : int = 0
+
+        # progressive preview: last request rendered as proxy, refined when no request comes for policy.settleDelay ms
+        self.lastRequestTime : float = 0.0
+        self.refineRequest : tuple[str, Image, list, tuple|None]|None = None
+        self.settleTimer : QTimer = QTimer(self)
+        self.settleTimer.setSingleShot(True)
+        self.settleTimer.setInterval(self.policy.settleDelay)
+        self.settleTimer.timeout.connect(self.refine)
+
+        self.renderDone.connect(self.__onDone)
+        self.renderFailed.connect(self.__onFailed)
+
+    # methods
+    # ------------------------------------------------------------------------------------
+    def requestRender(self: RenderService, imageName: str, source: Image, processpipe: list, proxy: Image|None = None, displaySize: tuple[int,int]|None = None) -> int:
+        """request the rendering of source (prepared input image, not modified) with processpipe (copied), return request generation.
+            during a drag (see PreviewPolicy), proxy (source at reduced size) is rendered instead, then source when requests settle.
+            displaySize (width, height in device pixels): size of display QImage (see guiQt.ImageWidget.toQImage).
+        """
+        processpipe = copy.deepcopy(processpipe)
+        now : float = time.perf_counter()
+        dragging : bool = proxy != None and proxy is not source and self.policy.isDragging(now - self.lastRequestTime)
+        self.lastRequestTime = now
+
+        if dragging:
+            self.refineRequest = (imageName, source, processpipe, displaySize)
+            self.settleTimer.start()
+        else:
+            self.refineRequest = None
+            self.settleTimer.stop()
+
+        generation : int = self.submit(imageName, proxy if dragging else source, processpipe, displaySize)
+        self.requestTimes[generation] = now
+        return generation
+    # ------------------------------------------------------------------------------------
+    def refine(self: RenderService) -> None:
+        """render at working size the last request rendered as proxy (requests have settled)."""
+        if self.refineRequest == None: return
+        if debug: print(f'RenderService.refine({self.refineRequest[0]})')
+        self.submit(*self.refineRequest)
+        self.refineRequest = None
+    # ------------------------------------------------------------------------------------
+    def submit(self: RenderService, imageName: str, source: Image, processpipe: list, displaySize: tuple[int,int]|None = None) -> int:
+        """store request as the pending one (latest wins), start rendering if no render is in flight."""
+        with self.lock:
+            self.generation += 1
+            generation : int = self.generation
+            self.pending = (generation, imageName, source, processpipe, displaySize)
+            start : bool = not self.running
+            self.running = True
+
+        if start: JobScheduler.instance().submit(RunRender(self), Priority.EDIT)
+        return generation
+    # ------------------------------------------------------------------------------------
+    def cancel(self: RenderService) -> None:
+        """drop pending request and result of render in flight (image changed)."""
+        with self.lock:
+            self.pending = None
+            self.cancelGeneration += 1
+            self.deliveredGeneration = self.generation
+        self.requestTimes.clear()
+        self.refineRequest = None
+        self.settleTimer.stop()
+    # ------------------------------------------------------------------------------------
+    def isRendering(self: RenderService) -> bool:
+        """return True if the result of the last request (or its refinement) is not yet delivered."""
+        with self.lock: return self.deliveredGeneration < self.generation or self.refineRequest != None
+    # ------------------------------------------------------------------------------------
+    def render(self: RenderService) -> None:
+        """render pending requests until none is left (worker thread)."""
+        while True:
+            with self.lock:
+                if self.pending == None:
+                    self.running = False
+                    return
+                generation, imageName, source, processpipe, displaySize = self.pending
+                self.pending = None
+                cancelGeneration : int = self.cancelGeneration
+
+            # source is shared with the GUI thread: compute on a copy (compute replaces cData)
+            img : Image = copy.copy(source)
+            img.metadata = processpipe
+            try:
+                img = self.compute(img, processpipe)
+            except Exception as e:
+                if debug: print(f'RenderService.render({imageName}, generation: {generation}): failed: {e}')
+                self.renderFailed.emit(generation, cancelGeneration, imageName, str(e))
+                continue
+            self.nbRenders += 1
+
+            with self.lock:
+                if cancelGeneration != self.cancelGeneration: continue
+            # display conversion (off the GUI thread)
+            qImage : QImage = ImageWidget.toQImage(img.cData, displaySize)
+            self.renderDone.emit(generation, cancelGeneration, imageName, img, qImage)
+    # ------------------------------------------------------------------------------------
+    def __onDone(self: RenderService, generation: int, cancelGeneration: int, imageName: str, img: Image, qImage: QImage) -> None:
+        """deliver result on the GUI thread, record latency of the requests it answers."""
+        with self.lock:
+            if cancelGeneration != self.cancelGeneration or generation <= self.deliveredGeneration: return
+            self.deliveredGeneration = generation
+            latest : bool = generation == self.generation
+
+        if debug: print(f'RenderService.rendered({imageName}, generation: {generation}, latest: {latest})')
+        self.rendered.emit(imageName, img, qImage)
+
+        now : float = time.perf_counter()
+        for g in [g for g in self.requestTimes if g <= generation]:
+            self.latencies.append(now - self.requestTimes.pop(g))
+    # ------------------------------------------------------------------------------------
+    def __onFailed(self: RenderService, generation: int, cancelGeneration: int, imageName: str, message: str) -> None:
+        """deliver failure on the GUI thread: the failed request is answered (rendering state settles), no latency is recorded."""
+        with self.lock:
+            if cancelGeneration != self.cancelGeneration or generation <= self.deliveredGeneration: return
+            self.deliveredGeneration = generation
+
+        self.failed.emit(imageName, message)
+        for g in [g for g in self.requestTimes if g <= generation]: del self.requestTimes[g]
+    # ------------------------------------------------------------------------------------
+    def latency(self: RenderService) -> dict[str, float]:
+        """return p50 and p99 slider-to-pixels latency (ms) of last requests."""
+        samples : list[float] = sorted(self.latencies)
+        if not samples: return {'p50': 0.0, 'p99': 0.0, 'samples': 0}
+        return {'p50': 1000*samples[int(0.50*(len(samples)-1))],
+                'p99': 1000*samples[int(0.99*(len(samples)-1))],
+                'samples': len(samples)}
+
+# ------------------------------------------------------------------------------------------
+# --- class RunRender ----------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+class RunRender(QRunnable):
+    def __init__(self: RunRender, parent: RenderService) -> None:
+        super().__init__()
+        self.parent : RenderService = parent
+
+    def run(self: RunRender) -> None:
+        self.parent.render()
+
+# ------------------ main -------------------------------
+# benchmark: slider-to-pixels latency of a simulated drag (60 events/s), synchronous rendering vs render service (with and without proxy)
+if __name__ == "__main__":
+    import os, sys
+    import numpy as np
+    from PyQt6.QtCore import QCoreApplication, QTimer
+    from core.colourSpace import ColorSpace
+
+    debug = False
+    nbEvents : int = 120
+    period : int = 16
+
+    def stubCompute(img: Image, processpipe: list) -> Image:
+        """stand-in for coreC.coreCcompute when HDRip.dll is not available (numpy pipe of similar cost)."""
+        ev : float = processpipe[0]['exposure']['EV']
+        res : np.ndarray = img.cData * 2**ev
+        for _ in range(8): res = np.clip(res/(1+res), 0, 1)**0.98
+        img.cData = res.astype(np.float32)
+        return img
+
+    compute : Callable = coreC.coreCcompute if os.path.exists('./HDRip.dll') and sys.platform == 'win32' else stubCompute
+    processpipe : list = [{'exposure': {'EV': 0.0}}]
+    source : Image = Image(np.random.rand(800, 1200, 3).astype(np.float32), ColorSpace.sRGB, False, name='bench.jpg')
+
+    app : QCoreApplication = QCoreApplication(sys.argv)
+
+    def percentiles(samples: list[float]) -> str:
+        samples = sorted(samples)
+        return f'p50: {1000*samples[int(0.5*(len(samples)-1))]:.1f} ms, p99: {1000*samples[int(0.99*(len(samples)-1))]:.1f} ms'
+
+    # (1) synchronous: each event is rendered on the GUI thread (events are queued behind renders)
+    syncLatencies : list[float] = []
+    start : float = time.perf_counter()
+    for i in range(nbEvents):
+        eventTime : float = start + i*period/1000
+        while time.perf_counter() < eventTime: pass
+        processpipe[0]['exposure']['EV'] = i/nbEvents
+        img : Image = copy.copy(source)
+        compute(img, processpipe)
+        syncLatencies.append(time.perf_counter() - eventTime)
+    print(f'synchronous: {nbEvents} renders, {percentiles(syncLatencies)}')
+
+    # (2) render service, (3) render service with progressive preview (proxy from pyramid of working image)
+    def benchmark(title: str, proxy: Image|None) -> None:
+        service : RenderService = RenderService(compute, PreviewPolicy())
+        events : list[int] = [0]
+
+        def drag() -> None:
+            processpipe[0]['exposure']['EV'] = events[0]/nbEvents
+            service.requestRender('bench.jpg', source, processpipe, proxy)
+            events[0] += 1
+            if events[0] == nbEvents: timer.stop()
+
+        def report() -> None:
+            lat : dict = service.latency()
+            print(f'{title}: {service.nbRenders} renders, p50: {lat["p50"]:.1f} ms, p99: {lat["p99"]:.1f} ms')
+            app.quit()
+
+        def check() -> None:
+            # last request delivered (and refined): report once its latency is recorded
+            if events[0] == nbEvents and not service.isRendering(): QTimer.singleShot(0, report)
+
+        timer : QTimer = QTimer()
+        timer.timeout.connect(drag)
+        timer.start(period)
+        service.rendered.connect(lambda name, img, qImage: check())
+        app.exec()
+
+    from hdrCore.processing import ProcessPipe
+    benchmark('render service', None)
+    benchmark('render service + proxy', ProcessPipe.halfSize(ProcessPipe.halfSize(source)))
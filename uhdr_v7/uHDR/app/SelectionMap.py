@@ -17,25 +17,41 @@ from __future__ import annotations
 
 # import
 # ------------------------------------------------------------------------------------------
+import re, fnmatch
+import numpy as np
 
 # ------------------------------------------------------------------------------------------
-# --- class Score --------------------------------------------------------------------------
+# --- class SelectionMap -------------------------------------------------------------------
 # ------------------------------------------------------------------------------------------
 debug : bool = True
 # ------------------------------------------------------------------------------------------
 class SelectionMap:
-    """user selection of images: by score, tags and name."""
+    """user selection of images: by score, tags and name.
+
+        image data are arrays indexed by global index (order of image names):
+            - score vector,
+            - packed bitmap (numpy.packbits) per tag (type, name),
+            - name index (name -> global index).
+        selection is the AND of filters (score in scores, all tags, name glob), evaluated on arrays,
+        index translation: selected -> global (indices of selected images), global -> selected (prefix sum of selection).
+    """
     # constructor
     def __init__(self : SelectionMap, imageNames : list[str]):
         # attributes
+        self.names : list[str] = []
+        self.nameIndex : dict[str, int] = {}
+        self.scores : np.ndarray = np.zeros(0, dtype=np.int8)
+        self.tagBits : dict[tuple[str,str], np.ndarray] = {}
 
-        self.__imageNameToIsSelected : dict[str, bool] = {}
-        self.__imageNameToGlobalIndex : dict[str, int] = {}
-
-        self.__globalIndexToImageName : dict[int, str] = {}
+        # filters: None (or empty) = no filter
+        self.scoresSelected : list[int]|None = None
+        self.tagsSelected : list[tuple[str,str]] = []
+        self.nameSelected : str|None = None
 
-        self.__globalIndexToSelectedIndex : dict[int, int|None] = {}   
-        self.__selectedIndexToGlobalIndex : dict[int, int] = {}
+        # selection
+        self.selected : np.ndarray = np.zeros(0, dtype=bool)
+        self.selectedToGlobal : np.ndarray = np.zeros(0, dtype=np.intp)
+        self.globalToSelected : np.ndarray = np.zeros(0, dtype=np.intp)
 
         self.numberImages : int =0
         self.numberSelectedImages : int  =0  
@@ -47,112 +63,175 @@ class SelectionMap:
     ## repr
     def __repr__(self: SelectionMap) -> str:
         res : str = '----------------- Selection map ------------------\n'
-        for name, selected in self.__imageNameToIsSelected.items():
-            res+= f'{name} : {selected} :: global:{self.__imageNameToGlobalIndex[name]} -> local: {self.__globalIndexToSelectedIndex[self.__imageNameToGlobalIndex[name]]} \n' 
-        res += '--------------------------------------------------\n'
+        res += f'filters: scores:{self.scoresSelected} tags:{self.tagsSelected} name:{self.nameSelected}\n'
         res += f'number of selected image:{self.numberSelectedImages}/{self.numberImages}'+'\n'
         res += '--------------------------------------------------\n'
 
         return res
 
     ## ---------------------------------------------------------------------------------------
-    ## reset dicts
+    ## reset arrays
     def reset(self: SelectionMap) -> None:
-        """"set image filenames and select all."""  
-        self.__imageNameToIsSelected  = {}
-        self.__imageNameToGlobalIndex  = {}
-
-        self.__globalIndexToImageName  = {}
+        """"remove all images, scores, tags and filters."""  
+        self.names = []
+        self.nameIndex = {}
+        self.scores = np.zeros(0, dtype=np.int8)
+        self.tagBits = {}
 
-        self.__globalIndexToSelectedIndex  = {}   
-        self.__selectedIndexToGlobalIndex  = {}
+        self.scoresSelected = None
+        self.tagsSelected = []
+        self.nameSelected = None
 
-        self.numberImages : int =0
-        self.numberSelectedImages : int  =0 
+        self.setSelection(np.zeros(0, dtype=bool))
     ## ---------------------------------------------------------------------------------------
     ## setImageNames: select all image
     def setImageNames(self: SelectionMap, names: list[str]) -> None:
         """"set image filenames and select all."""        
         
         self.reset()
-        
-        for i, name in enumerate(names):
-            self.__imageNameToIsSelected[name] = True
-            self.__imageNameToGlobalIndex[name] = i
 
-            self.__globalIndexToImageName[i] = name
+        self.names = list(names)
+        self.nameIndex = {name: i for i, name in enumerate(self.names)}
+        self.scores = np.zeros(len(self.names), dtype=np.int8)
+
+        self.setSelection(np.ones(len(self.names), dtype=bool))
 
-            self.__globalIndexToSelectedIndex[i] = i
-            self.__selectedIndexToGlobalIndex[i] = i 
+    ## ---------------------------------------------------------------------------------------
+    ## updateImageNames: images added or removed
+    def updateImageNames(self: SelectionMap, names: list[str], scores: dict[str, int], tags: dict[str, dict[str, dict[str,bool]]]) -> None:
+        """set image filenames after images are added or removed (directory watching): scores and tags of images already known are kept,
+            scores and tags of new images are in scores and tags, filters are evaluated again."""
+        newIdx : list[int] = [i for i, name in enumerate(names) if name in self.nameIndex]
+        oldIdx : list[int] = [self.nameIndex[names[i]] for i in newIdx]
+
+        newScores : np.ndarray = np.zeros(len(names), dtype=np.int8)
+        newScores[newIdx] = self.scores[oldIdx]
+        newTagBits : dict[tuple[str,str], np.ndarray] = {}
+        for tag in self.tagBits:
+            bits : np.ndarray = np.zeros(len(names), dtype=bool)
+            bits[newIdx] = self.hasTag(tag)[oldIdx]
+            newTagBits[tag] = np.packbits(bits)
+
+        self.names = list(names)
+        self.nameIndex = {name: i for i, name in enumerate(self.names)}
+        self.scores = newScores
+        self.tagBits = newTagBits
+
+        for name, score in scores.items(): self.setScore(name, score)
+        for name, imageTags in tags.items():
+            for tagType, tagNames in imageTags.items():
+                for tagName, value in tagNames.items(): 
+                    if value: self.setTag(name, (tagType, tagName), True)
 
-        self.numberImages= len(names)
-        self.numberSelectedImages = self.numberImages
+        self.select()
+
+    ## ---------------------------------------------------------------------------------------
+    ## scores and tags of images
+    def setScores(self: SelectionMap, scores: dict[str, int]) -> None:
+        """set score vector from scores of images (key: image name)."""
+        self.scores = np.fromiter((scores.get(name, 0) for name in self.names), dtype=np.int8, count=len(self.names))
+    # ---------------------------------------------------------------------------------------
+    def setScore(self: SelectionMap, name: str, score: int) -> None:
+        """set score of image (selection is not updated)."""
+        gIdx : int|None = self.imageNameToGlobalIndex(name)
+        if gIdx != None: self.scores[gIdx] = score
+    # ---------------------------------------------------------------------------------------
+    def setTags(self: SelectionMap, tags: dict[str, dict[str, dict[str,bool]]]) -> None:
+        """set tag bitmaps from tags of images (key: image name, value: {tag type: {tag name: bool}})."""
+        bits : dict[tuple[str,str], np.ndarray] = {}
+        for name, imageTags in tags.items():
+            gIdx : int|None = self.nameIndex.get(name)
+            if gIdx == None: continue
+            for tagType, tagNames in imageTags.items():
+                for tagName, value in tagNames.items():
+                    if value:
+                        if (tagType, tagName) not in bits: bits[(tagType, tagName)] = np.zeros(len(self.names), dtype=bool)
+                        bits[(tagType, tagName)][gIdx] = True
+        self.tagBits = {key: np.packbits(b) for key, b in bits.items()}
+    # ---------------------------------------------------------------------------------------
+    def setTag(self: SelectionMap, name: str, tag: tuple[str,str], value: bool) -> None:
+        """set tag (type, name) of image (selection is not updated)."""
+        gIdx : int|None = self.imageNameToGlobalIndex(name)
+        if gIdx == None: return
+        if tag not in self.tagBits: self.tagBits[tag] = np.zeros((len(self.names)+7)//8, dtype=np.uint8)
+        mask : np.uint8 = np.uint8(0x80 >> (gIdx & 7))          # packbits: big bit order
+        if value:   self.tagBits[tag][gIdx >> 3] |= mask
+        else:       self.tagBits[tag][gIdx >> 3] &= ~mask
+    # ---------------------------------------------------------------------------------------
+    def hasTag(self: SelectionMap, tag: tuple[str,str]) -> np.ndarray:
+        """return boolean vector: True if image has tag."""
+        if tag not in self.tagBits: return np.zeros(len(self.names), dtype=bool)
+        return np.unpackbits(self.tagBits[tag], count=len(self.names)).astype(bool)
 
     ## ---------------------------------------------------------------------------------------
     ## selectAll
     def selectAll(self: SelectionMap) -> None:
-        """select all images."""
-        for i, name in enumerate(self.__imageNameToIsSelected.keys()):
-                self.__imageNameToIsSelected[name] = True
-                self.__imageNameToGlobalIndex[name] = i
-
-                self.__globalIndexToImageName[i] = name
+        """select all images (filters are removed)."""
+        self.scoresSelected = None
+        self.tagsSelected = []
+        self.nameSelected = None
 
-                self.__globalIndexToSelectedIndex[i] = i
-                self.__selectedIndexToGlobalIndex[i] = i
+        self.setSelection(np.ones(len(self.names), dtype=bool))
+    # ---------------------------------------------------------------------------------------
+    def setSelection(self: SelectionMap, selected: np.ndarray) -> None:
+        """set selection (boolean vector indexed by global index) and its index translation arrays."""
+        self.selected = selected
+        self.selectedToGlobal = np.flatnonzero(selected)
+        self.globalToSelected = np.cumsum(selected, dtype=np.intp) - 1   # valid for selected images only
 
-        self.numberImages= len(self.__imageNameToIsSelected.keys())
-        self.numberSelectedImages = self.numberImages
+        self.numberImages = len(selected)
+        self.numberSelectedImages = len(self.selectedToGlobal)
     # ---------------------------------------------------------------------------------------
     def applySelection(self: SelectionMap, selection: list[tuple[str,bool]]) -> None:
-        """apply a selection."""
-        
-        self.__selectedIndexToGlobalIndex = {}
-
-        sIdx  : int = 0
-        self.numberSelectedImages = 0
-        for gIdx, (name, selected) in enumerate(selection):
-                self.__imageNameToIsSelected[name] = selected
+        """apply a selection: (image name, selected) for all images."""
+        selected : np.ndarray = np.zeros(len(self.names), dtype=bool)
+        for name, isSelected in selection:
+            if isSelected and name in self.nameIndex: selected[self.nameIndex[name]] = True
+        self.setSelection(selected)
 
-                self.__imageNameToGlobalIndex[name] = gIdx
+        if debug: print(f'SelectionMap.applySelection():\n{self}')
+    # ---------------------------------------------------------------------------------------
+    def select(self: SelectionMap) -> None:
+        """evaluate filters (score in scoresSelected AND all tagsSelected AND name matches nameSelected)."""
+        selected : np.ndarray = np.ones(len(self.names), dtype=bool)
 
-                self.__globalIndexToImageName[gIdx] = name
+        if self.scoresSelected != None: selected &= np.isin(self.scores, self.scoresSelected)
+        for tag in self.tagsSelected:
+            if tag not in self.tagBits: selected[:] = False ; break
+            selected &= self.hasTag(tag)
+        if self.nameSelected:
+            regex : re.Pattern = re.compile(fnmatch.translate(self.nameSelected), re.IGNORECASE)
+            selected &= np.fromiter((regex.match(name) != None for name in self.names), dtype=bool, count=len(self.names))
 
-                if selected:
-                    self.__globalIndexToSelectedIndex[gIdx] = sIdx
-                    self.__selectedIndexToGlobalIndex[sIdx] = gIdx
-                    sIdx = sIdx+1
-                    self.numberSelectedImages +=1
-                else:  
-                    self.__globalIndexToSelectedIndex[gIdx] = None
+        self.setSelection(selected)
 
-        if debug: print(f'SelectionMap.applySelection({selection}):\n{self}')
+        if debug: print(f'SelectionMap.select():\n{self}')
     # ---------------------------------------------------------------------------------------
     def isSelected(self: SelectionMap, name : str) -> bool|None: 
-        if name in self.__imageNameToIsSelected.keys() : return self.__imageNameToIsSelected[name]
+        if name in self.nameIndex : return bool(self.selected[self.nameIndex[name]])
         else:
             print(f'[ERROR] SelectionMap.isSelected({name}): imagefile "{name}" not found > return None')
             return None
     # ---------------------------------------------------------------------------------------
     def imageNameToGlobalIndex(self: SelectionMap, name : str)  -> int|None: 
 
-        if name in self.__imageNameToGlobalIndex.keys() : return self.__imageNameToGlobalIndex[name]
+        if name in self.nameIndex : return self.nameIndex[name]
         else:
             print(f'[ERROR] SelectionMap.imageNameToGlobalIndex({name}): imagefile "{name}" not found > return None')
             return None
     # ---------------------------------------------------------------------------------------
     def globalIndexToImageName(self: SelectionMap, gIdx: int) -> str|None :
-        if gIdx in self.__globalIndexToImageName.keys(): return self.__globalIndexToImageName[gIdx]
+        if 0 <= gIdx < len(self.names): return self.names[gIdx]
         else:
             print(f'[ERROR] SelectionMap.globalIndexToImageName({gIdx}): key ({gIdx}) not found > return None')
             return None
     # ---------------------------------------------------------------------------------------
     def globalIndexToSelectedIndex(self : SelectionMap, gIdx :int) -> int|None: 
-        if gIdx in self.__globalIndexToSelectedIndex.keys(): return self.__globalIndexToSelectedIndex[gIdx]
+        if 0 <= gIdx < len(self.names) and self.selected[gIdx]: return int(self.globalToSelected[gIdx])
         else: return None
     # ---------------------------------------------------------------------------------------
     def selectedlIndexToGlobalIndex(self : SelectionMap, sIdx : int) -> int|None: 
-        if sIdx in self.__selectedIndexToGlobalIndex.keys() : return self.__selectedIndexToGlobalIndex[sIdx]
+        if 0 <= sIdx < self.numberSelectedImages : return int(self.selectedToGlobal[sIdx])
         else: return None           
     # ---------------------------------------------------------------------------------------  
     def selectedIndexToImageName(self: SelectionMap, sIdx : int ) -> str|None:
@@ -165,18 +244,48 @@ class SelectionMap:
         if gIdx != None : return self.globalIndexToSelectedIndex(gIdx)
         else : return None
     # ---------------------------------------------------------------------------------------
-    def selectByScore(self : SelectionMap, scores :dict[str, int], scoresSelected : list[int]):
-        """select images which score is in selected score."""
-
-        imagesSelection : list[tuple[str,bool]] = []
-        for name, score in scores.items():
-            imagesSelection.append((name, score in scoresSelected))
-        self.applySelection(imagesSelection)
+    def selectByScore(self : SelectionMap, scoresSelected : list[int]|None):
+        """select images which score is in selected score (other filters are kept)."""
+        self.scoresSelected = scoresSelected
+        self.select()
+    # ---------------------------------------------------------------------------------------
+    def selectByTags(self : SelectionMap, tagsSelected : list[tuple[str,str]]):
+        """select images which have all selected tags (type, name), no filter if empty (other filters are kept)."""
+        self.tagsSelected = list(tagsSelected)
+        self.select()
+    # ---------------------------------------------------------------------------------------
+    def selectByName(self : SelectionMap, pattern : str|None):
+        """select images which name matches pattern (glob, case insensitive), no filter if None (other filters are kept)."""
+        self.nameSelected = pattern
+        self.select()
     # ---------------------------------------------------------------------------------------
     def getSelectedImageNumber(self: SelectionMap) -> int : return self.numberSelectedImages
     # ---------------------------------------------------------------------------------------
 
+# ------------------ main -------------------------------
+# benchmark: composite filter and index translation for 100k images
+if __name__ == "__main__":
+    import time
 
-        
-            
+    debug = False
+    nbImages : int = 100000
+    rng : np.random.Generator = np.random.default_rng(0)
+    names : list[str] = [f'img{i:06d}.jpg' for i in range(nbImages)]
+
+    start : float = time.perf_counter()
+    selectionMap : SelectionMap = SelectionMap(names)
+    selectionMap.setScores({name: int(s) for name, s in zip(names, rng.integers(0, 6, nbImages))})
+    selectionMap.setTags({name: {'scene': {'landscape': True}} for name in names[::3]})
+    print(f'set images, scores and tags: {time.perf_counter()-start:.3f} s')
+
+    start = time.perf_counter()
+    selectionMap.scoresSelected = [4, 5]
+    selectionMap.tagsSelected = [('scene', 'landscape')]
+    selectionMap.nameSelected = 'img0*'
+    selectionMap.select()
+    print(f'composite filter: {time.perf_counter()-start:.3f} s > {selectionMap}')
 
+    start = time.perf_counter()
+    for sIdx in range(selectionMap.getSelectedImageNumber()):
+        assert selectionMap.globalIndexToSelectedIndex(selectionMap.selectedlIndexToGlobalIndex(sIdx)) == sIdx
+    print(f'index translation ({selectionMap.getSelectedImageNumber()} round trips): {time.perf_counter()-start:.3f} s')
@@ -30,109 +30,39 @@ def buildLchcolourData( L : tuple[float,float],
                         height:str) -> np.ndarray:
 
 
+    """build gradient image (Lch colour data) of size (height, width): channel 'width' varies along x, channel 'height' along y, the third channel is the middle of its range.
+
+    Args:
+        L, c, h (tuple[float,float], Required): lightness, chroma and hue ranges, hue range wraps around 360 when h[0] > h[1]
+        size (tuple[int,int], Required): (height, width) of gradient image
+        width, height (str, Required): channel ('L', 'c' or 'h') along x and along y
+            
+    Returns:
+        (numpy.ndarray): Lch colour data
+    """
     colourData : np.ndarray= np.zeros((size[0], size[1],3))
     Lmin, Lmax = L if L[0] < L[1] else (L[1], L[0])
     cmin, cmax = c if c[0] < c[1] else (c[1], c[0])
     hmin, hmax = h
 
-    xmin, xmax = 0, size[1]
-    ymin, ymax = 0, size[0]
+    channels : tuple[str,str,str] = ('L','c','h')
+    if width not in channels or height not in channels or width == height: return colourData
 
-    if width=='L':
-        if height=='c':
-            #     +-------------------------------+
-            #  c  |                               |
-            #     +-------------------------------+
-            #                Lightness
-            for x in range(xmin,xmax):
-                for y in range(ymin,ymax):
-                    u, v = x/(xmax-1), y/(ymax-1)
-                    Lu = Lmin*(1-u)+Lmax*u
-                    cv = cmin*(1-v) + cmax*v
-                    hh = (hmin+hmax)/2
-                    colourData[y,x,:] = [Lu,cv,hh]
-        elif height=='h':
-            #     +-------------------------------+
-            #  h  |                               |
-            #     +-------------------------------+
-            #                Lightness
-            for x in range(xmin,xmax):
-                for y in range(ymin,ymax):
-                    u, v = x/(xmax-1), y/(ymax-1)
-                    Lu = Lmin*(1-u)+Lmax*u
-                    if hmin <= hmax:
-                        hv = hmin*(1-v) + hmax*v
-                    else:
-                        # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
-                        hv = (hmin-360)*(1-v) + hmax*v
-                        if hv < 0: hv = 360 +hv
-                    cc = (cmin+cmax)/2
-                    colourData[y,x,:] = [Lu,cc,hv]
-    elif width=='c':
-        if height=='L':
-            #     +-------------------------------+
-            #  L  |                               |
-            #     +-------------------------------+
-            #                chroma
-            for x in range(xmin,xmax):
-                for y in range(ymin,ymax):
-                    u, v = x/(xmax-1), y/(ymax-1)
-                    cu = cmin*(1-u) + cmax*u
-                    Lv = Lmin*(1-v)+Lmax*v
-                    hh = (hmin+hmax)/2
-                    colourData[y,x,:] = [Lv,cu,hh]
-        elif height=='h':
-            #     +-------------------------------+
-            #  h  |                               |
-            #     +-------------------------------+
-            #                chroma
-            for x in range(xmin,xmax):
-                for y in range(ymin,ymax):
-                    u, v = x/(xmax-1), y/(ymax-1)
-                    cu = cmin*(1-u) + cmax*u
-                    if hmin <= hmax:
-                        hv = hmin*(1-v) + hmax*v
-                    else:
-                        # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
-                        hv = (hmin-360)*(1-v) + hmax*v
-                        if hv < 0: hv = 360 +hv
-                    LL = (Lmin+Lmax)/2
-                    colourData[y,x,:] = [LL,cu,hv]
-    elif width == 'h':
-        if height=='L':
-            #     +-------------------------------+
-            #  L  |                               |
-            #     +-------------------------------+
-            #                hue
-            for x in range(xmin,xmax):
-                for y in range(ymin,ymax):
-                    u, v = x/(xmax-1), y/(ymax-1)
-                    if hmin <= hmax:
-                        hu = hmin*(1-u) + hmax*u
-                    else:
-                        # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
-                        hu = (hmin-360)*(1-u) + hmax*u
-                        if hu < 0: hv = 360 +hu
-                    Lv = Lmin*(1-v)+Lmax*v
-                    cc = (cmin+cmax)/2
-                    colourData[y,x,:] = [Lv,cc,hu]
-        elif height=='c':
-            #     +-------------------------------+
-            #  c  |                               |
-            #     +-------------------------------+
-            #                hue
-            for x in range(xmin,xmax):
-                for y in range(ymin,ymax):
-                    u, v = x/(xmax-1), y/(ymax-1)
-                    if hmin <= hmax:
-                        hu = hmin*(1-u) + hmax*u
-                    else:
-                        # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
-                        hu = (hmin-360)*(1-u) + hmax*u
-                        if hu < 0: hv = 360 +hu
-                    cv = cmin*(1-v)+cmax*v
-                    LL = (Lmin+Lmax)/2
-                    colourData[y,x,:] = [LL,cv,hu]
+    def hueRange(t: np.ndarray) -> np.ndarray:
+        if hmin <= hmax: return hmin*(1-t) + hmax*t
+        # hmin = 340 / hmax=20 -> hmin = hmin-360 >> hmin = -20, hmax =20
+        hue : np.ndarray = (hmin-360)*(1-t) + hmax*t
+        return np.where(hue < 0, 360+hue, hue)
 
-    return colourData
+    ranges : dict = {'L': lambda t: Lmin*(1-t) + Lmax*t, 'c': lambda t: cmin*(1-t) + cmax*t, 'h': hueRange}
+    middles : dict[str,float] = {'L': (Lmin+Lmax)/2, 'c': (cmin+cmax)/2, 'h': (hmin+hmax)/2}
+
+    u : np.ndarray = np.arange(size[1])/(size[1]-1)     # x/(xmax-1)
+    v : np.ndarray = np.arange(size[0])/(size[0]-1)     # y/(ymax-1)
 
+    for i, channel in enumerate(channels):
+        if channel == width:        colourData[:,:,i] = ranges[channel](u)[np.newaxis,:]
+        elif channel == height:     colourData[:,:,i] = ranges[channel](v)[:,np.newaxis]
+        else:                       colourData[:,:,i] = middles[channel]
+
+    return colourData
@@ -22,6 +22,8 @@ from core.colourSpace import ColorSpace
 from copy import deepcopy
 import numpy as np, os, colour
 import skimage.transform
+import PIL.Image
+from hdrCore import resample
 import json, os
 
 # ------------------------------------------------------------------------------------------
@@ -95,7 +97,7 @@ class Image:
         y, x, _ =  self.cData.shape
         factor : int = maxSize/max(y,x)
         if factor<1:
-            thumbcData = skimage.transform.resize(self.cData, (int(y * factor),int(x*factor) ))
+            thumbcData = resample.resize(self.cData, (int(y * factor),int(x*factor) ))
 
             return Image(thumbcData, self.cSpace, self.hdr, self.linear, self.name)
         else:
@@ -120,9 +122,57 @@ class Image:
             img = Image(np.ones((600,800,3))*0.50, ColorSpace.sRGB, False, True, name)
         return img
 
+    # -----------------------------------------------------------------
+    @staticmethod
+    def readPreview(fileName : str, maxSize : int = 800) -> Image:
+        """read image from system at reduced resolution: largest side is at least maxSize (when image is larger), used to build thumbnails.
+
+            jpg: downscale in DCT domain while decoding (draft mode: 1/2, 1/4 or 1/8 scale),
+            hdr: decoded image is subsampled (rows and columns) by the integer reduction factor.
+        """
+        path, name, ext = filenamesplit(fileName)
+        if not os.path.exists(fileName): return Image.read(fileName)
+
+        if ext == "jpg":
+            with PIL.Image.open(fileName) as pilImage:
+                width, height = pilImage.size
+                scale : float = min(1.0, maxSize/max(width, height))
+                pilImage.draft('RGB', (max(1, int(width*scale)), max(1, int(height*scale))))
+                imgData : np.ndarray = np.asarray(pilImage.convert('RGB'), dtype=np.float32)/np.float32(255)
+            return Image(imgData, ColorSpace.sRGB, False, True, name)
+
+        if ext == "hdr":
+            img : Image = Image.read(fileName)
+            factor : int = max(1, max(img.cData.shape[:2])//maxSize)
+            if factor > 1: img.cData = np.ascontiguousarray(img.cData[::factor, ::factor])
+            return img
+
+        return Image.read(fileName)
+
     def setMetadata(self, metadata):
         self.metadata = metadata
     
     def isHDR(self):
         return self.hdr
     
+
+# ------------------ main -------------------------------
+# benchmark: thumbnail generation throughput (full decode + resize vs reduced resolution decode)
+if __name__ == "__main__":
+    import sys, tempfile, time
+
+    debug = False
+    with tempfile.TemporaryDirectory() as imageDir:
+        if len(sys.argv) > 1: 
+            imageDir = sys.argv[1]
+        else:
+            rng : np.random.Generator = np.random.default_rng(0)
+            base : np.ndarray = skimage.transform.resize(rng.random((30,40,3)), (3000,4000,3))
+            for i in range(8): PIL.Image.fromarray((np.roll(base, i*100, axis=1)*255).astype(np.uint8)).save(os.path.join(imageDir, f'img{i}.jpg'), quality=90)
+        names : list[str] = [f for f in sorted(os.listdir(imageDir)) if f.lower().endswith(('.jpg', '.hdr'))]
+
+        for label, reader in [('full decode + resize', Image.read), ('reduced resolution decode', Image.readPreview)]:
+            start : float = time.perf_counter()
+            for name in names: reader(os.path.join(imageDir, name)).buildThumbnail(800)
+            elapsed : float = time.perf_counter()-start
+            print(f'{label}: {len(names)/elapsed:.2f} images/s')
@@ -20,8 +20,9 @@
 from __future__ import annotations
 from math import ceil
 from typing_extensions import Self
-from PyQt6.QtWidgets import QHBoxLayout, QWidget, QSplitter, QPushButton, QLabel, QSlider
+from PyQt6.QtWidgets import QHBoxLayout, QWidget, QSplitter, QPushButton, QLabel, QSlider, QScrollBar
 from PyQt6.QtCore import pyqtSignal, Qt
+from PyQt6.QtGui import QImage, QWheelEvent
 
 from guiQt.ImageGallery import ImageGallery
 
@@ -33,6 +34,9 @@ from numpy import ndarray
 debug : bool = True
 class AdvanceImageGallery(QSplitter):
     """ 
+    virtualized gallery: the grid (fixed pool of image widgets, see ImageGallery) displays rows [firstRow, firstRow+nbRow[ of images,
+    scrolling (scroll bar, mouse wheel, previous/next buttons) is continuous by rows: image widgets are recycled and only images of the rows
+    displayed are requested (requestImages signal).
     """
     # class attributes
     ## signal
@@ -52,15 +56,22 @@ class AdvanceImageGallery(QSplitter):
         self.deltaSize : float = 1.5
         self.maxColSize : int = 9
 
-        ## pages
-        self.pageIndex : int = 0
+        ## first row displayed
+        self.firstRow : int = 0
+        self.wheelDelta : int = 0           # wheel angle not scrolled yet (high resolution wheels, touchpads)
 
         ## images
         self.selectedImage : int|None = None
         self.nbImages : int = nbImages
 
         # gallery part
-        self.gallery : ImageGallery = ImageGallery(self.size)
+        self.galleryContainer : QWidget = QWidget()
+        self.galleryLayout : QHBoxLayout = QHBoxLayout(); self.galleryContainer.setLayout(self.galleryLayout)
+        self.galleryLayout.setContentsMargins(0,0,0,0)
+        self.gallery : ImageGallery = ImageGallery(self.size) ; self.galleryLayout.addWidget(self.gallery)
+        self.scrollBar : QScrollBar = QScrollBar(Qt.Orientation.Vertical) ; self.galleryLayout.addWidget(self.scrollBar)
+        self.scrollBar.setMinimum(0)
+        self.scrollBar.setSingleStep(1)
 
         # control part
         self.navContainer : QWidget = QWidget()
@@ -76,12 +87,12 @@ class AdvanceImageGallery(QSplitter):
         self.navLayout.addWidget(self.zoomSlider)
         self.zoomPlus : QPushButton = QPushButton("(-)") ; self.navLayout.addWidget(self.zoomPlus)
         self.navLayout.addStretch()
-        self.pageLabel : QLabel = QLabel("page: X/XX"); self.navLayout.addWidget(self.pageLabel)
+        self.pageLabel : QLabel = QLabel("images: X-X/XX"); self.navLayout.addWidget(self.pageLabel)
         self.navLayout.addStretch()
         self.nextPage : QPushButton = QPushButton("next >") ; self.navLayout.addWidget(self.nextPage)
 
         # all parts
-        self.addWidget(self.gallery)
+        self.addWidget(self.galleryContainer)
         self.addWidget(self.navContainer)
         self.setSizes([1060,20])
 
@@ -93,6 +104,7 @@ class AdvanceImageGallery(QSplitter):
 
         self.nextPage.clicked.connect(self.CBnextPage)
         self.previousPage.clicked.connect(self.CBpreviousPage)
+        self.scrollBar.valueChanged.connect(self.CBscroll)
 
         self.gallery.imageSelected.connect(self.CBimageSelected)
 
@@ -110,29 +122,13 @@ class AdvanceImageGallery(QSplitter):
             nbCol+=1
             if nbCol > nbRow * self.deltaSize : nbRow += 1
         
-        self.size = (nbRow,nbCol) 
-
-        self.active = False
-        self.zoomSlider.setValue(nbCol)
-        self.active = True
-
-        self.gallery.size = self.size
-
-        minImgIdx, maxImgIdx = self.getImageRangeIndex()
-        if not isinstance(self.selectedImage, int):
-            imgIdx : int = (minImgIdx+maxImgIdx)//2
-        else:
-            imgIdx : int = self.selectedImage
-        self.pageIndex = self.imageIdxToPageIndex(imgIdx)
+        self.changeSize((nbRow,nbCol))
 
         if debug : 
             print(f'AdvanceImageGallery.incSize():')
-            print(f'\t page index:{self.pageIndex}') 
+            print(f'\t first row:{self.firstRow}') 
             print(f'\t displayed images between:{self.getImageRangeIndex()}')
 
-        self.requestImages.emit(*self.getImageRangeIndex())
-        self.updatePageInfo()
-
     ## -------------------------------------------------------------------------------------------
     def decSize(self: AdvanceImageGallery) -> None:
         if debug : print(f'AdvanceImageGallery.decSize()')
@@ -144,29 +140,37 @@ class AdvanceImageGallery(QSplitter):
             if nbCol <= (nbRow-1) * self.deltaSize : 
                 if nbRow > 1 : nbRow -= 1
         
-        self.size = (nbRow,nbCol) 
+        self.changeSize((nbRow,nbCol))
 
-        self.active = False
-        self.zoomSlider.setValue(nbCol)
-        self.active = True
+        if debug : 
+            print(f'AdvanceImageGallery.decSize():') 
+            print(f'\t first row:{self.firstRow}') 
+            print(f'\t displayed images between:{self.getImageRangeIndex()} ')
 
-        self.gallery.size = self.size
+    ## -------------------------------------------------------------------------------------------
+    def changeSize(self: AdvanceImageGallery, size : tuple[int,int]) -> None:
+        """change gallery size (zoom): selected image (or image in the middle of the gallery) stays displayed."""
 
         minImgIdx, maxImgIdx = self.getImageRangeIndex()
         if not isinstance(self.selectedImage, int):
-            imgIdx : int = (minImgIdx+maxImgIdx)//2
+            imgIdx : int = (minImgIdx+min(maxImgIdx, max(0,self.nbImages-1)))//2
         else:
             imgIdx : int = self.selectedImage
-        self.pageIndex = self.imageIdxToPageIndex(imgIdx)
 
-        if debug : 
-            print(f'AdvanceImageGallery.decSize():') 
-            print(f'\t page index:{self.pageIndex}') 
-            print(f'\t displayed images between:{self.getImageRangeIndex()} ')
+        self.size = size
 
-        self.requestImages.emit(*self.getImageRangeIndex())
+        self.active = False
+        self.zoomSlider.setValue(size[1])
+        self.active = True
+
+        self.gallery.size = self.size
+
+        self.firstRow = self.clampRow(self.imageIdxToRow(imgIdx) - (self.size[0]-1)//2)
+        self.updateScrollBar()
         self.updatePageInfo()
 
+        self.requestImages.emit(*self.getImageRangeIndex())
+
     ## -------------------------------------------------------------------------------------------
     def zoomSliderChanged(self:AdvanceImageGallery):
 
@@ -191,6 +195,8 @@ class AdvanceImageGallery(QSplitter):
         self.zoomSlider.setValue(size[1])
         self.active = True
 
+        self.firstRow = self.clampRow(self.firstRow)
+        self.updateScrollBar()
         self.updatePageInfo()
         
         if debug : print(f'AdvanceImageGallery.setSize({size}) > emit requestImage({self.getImageRangeIndex()})')
@@ -198,15 +204,24 @@ class AdvanceImageGallery(QSplitter):
         self.requestImages.emit(*self.getImageRangeIndex())
 
     ## -------------------------------------------------------------------------------------------
-    ## pages management
+    ## rows management
     @property
     def nbImgPerPage(self: AdvanceImageGallery) -> int : return self.size[0]*self.size[1]
 
+    ## -------------------------------------------------------------------------------------------
+    @property
+    def maxRow(self: AdvanceImageGallery) -> int : 
+        """last value of first row: last row of images is at the bottom of the gallery."""
+        return max(0, ceil(self.nbImages/self.size[1]) - self.size[0])
+
+    ## -------------------------------------------------------------------------------------------
+    def clampRow(self: AdvanceImageGallery, row : int) -> int : return min(max(0, row), self.maxRow)
+
     ## -------------------------------------------------------------------------------------------
     def getImageRangeIndex(self: Self) -> tuple[int,int]:
 
-        minIdx : int = self.pageIndex*self.nbImgPerPage
-        maxIdx :int  = (self.pageIndex+1)*self.nbImgPerPage -1
+        minIdx : int = self.firstRow*self.size[1]
+        maxIdx :int  = minIdx + self.nbImgPerPage -1
 
         if debug : 
             print(f'AdvanceImageGallery.getImageRangeIndex() -> ({minIdx},{maxIdx})')
@@ -214,6 +229,38 @@ class AdvanceImageGallery(QSplitter):
 
         return minIdx,maxIdx
 
+    ## -------------------------------------------------------------------------------------------
+    ## scrolling
+    def scrollTo(self: AdvanceImageGallery, row : int) -> None:
+        """display images from row: images still displayed are moved (recycled widgets), images of the rows displayed are requested."""
+        row = self.clampRow(row)
+        if row == self.firstRow: return
+
+        if debug : print(f'AdvanceImageGallery.scrollTo({row})')
+
+        self.gallery.shift((row - self.firstRow)*self.size[1])
+        self.firstRow = row
+
+        self.active = False
+        self.scrollBar.setValue(row)
+        self.active = True
+
+        self.updatePageInfo()
+        self.requestImages.emit(*self.getImageRangeIndex())
+
+    ## -------------------------------------------------------------------------------------------
+    def CBscroll(self: AdvanceImageGallery, row : int) -> None:
+        """callback: scroll bar moved."""
+        if self.active: self.scrollTo(row)
+
+    ## -------------------------------------------------------------------------------------------
+    def updateScrollBar(self: AdvanceImageGallery) -> None:
+        self.active = False
+        self.scrollBar.setMaximum(self.maxRow)
+        self.scrollBar.setPageStep(self.size[0])
+        self.scrollBar.setValue(self.firstRow)
+        self.active = True
+
     ## -------------------------------------------------------------------------------------------
     def CBOne(self: AdvanceImageGallery) -> None:
         """"callback when one 'image' button is clicled"""
@@ -224,63 +271,27 @@ class AdvanceImageGallery(QSplitter):
             # return to previous size
             if debug : print(f'AdvanceImageGallery.CBOne(): > return to previous size: {self.previousSize}')
 
-            self.size = self.previousSize
-            self.gallery.size = self.size
-
-            self.active = False
-            self.zoomSlider.setValue(self.size[1])
-            self.active = True
-
-            self.pageIndex =   self.imageIdxToPageIndex(self.selectedImage) #type: ignore
-            self.updatePageInfo()   
-            self.requestImages.emit(*self.getImageRangeIndex())    
+            self.changeSize(self.previousSize)
             
         else:
             # go to one image page
             self.previousSize = (self.size[0], self.size[1])
-            if self.selectedImage != None:
-                if debug : print(f'AdvanceImageGallery.CBOne(): > goto one page, index: {self.selectedImage}')
-                self.previousSize = self.size
-                self.size = (1,1)
-                self.gallery.size = self.size
-
-                self.active = False
-                self.zoomSlider.setValue(self.size[1])
-                self.active = True
-
-                self.pageIndex =   self.imageIdxToPageIndex(self.selectedImage)
-                self.updatePageInfo()
-                self.requestImages.emit(self.selectedImage, self.selectedImage)
-                                
-                if debug : print(f'\tAdvanceImageGallery.CBOne(): > goto one page, index: {self.selectedImage} > requestImages.emit({self.selectedImage}, {self.selectedImage})') #####
-                
-                self.requestImages.emit(self.selectedImage, self.selectedImage)
-
-
-            else:   # auto select first image in current page
+            if self.selectedImage == None:   # auto select first image in current page
                 if debug : print(f'AdvanceImageGallery.CBOne(): > goto one page, index: {self.imageLocalIdxToGlobalIndex(0)}')
                 self.CBimageSelected(0)
 
-                self.size = (1,1)
-                self.gallery.size = self.size
-
-                self.active = False
-                self.zoomSlider.setValue(self.size[1])
-                self.active = True
-
-
-                self.pageIndex =   self.imageIdxToPageIndex(self.selectedImage) #type: ignore
-                self.updatePageInfo()
-                self.requestImages.emit(self.selectedImage, self.selectedImage)
+            if self.selectedImage != None:
+                if debug : print(f'AdvanceImageGallery.CBOne(): > goto one page, index: {self.selectedImage}')
+                self.changeSize((1,1))
 
     ## -------------------------------------------------------------------------------------------
     def firstPage(self:AdvanceImageGallery) -> None : 
-        """ firstPage: force to go to first page."""
+        """ firstPage: force to go to first row."""
         if debug : print(f'AdvanceImageGallery.firstPage():')
         
-        if self.nbImages > 0:
-            self.pageIndex = 0
-            self.updatePageInfo()
+        self.firstRow = 0
+        self.updateScrollBar()
+        self.updatePageInfo()
 
         self.gallery.resetImages()
         self.requestImages.emit(*self.getImageRangeIndex())
@@ -289,58 +300,50 @@ class AdvanceImageGallery(QSplitter):
         if debug : print(f'AdvanceImageGallery.CBnextPage():')
 
         if self.nbImages > 0:
-            self.pageIndex = (self.pageIndex +1)%ceil(self.nbImages/self.nbImgPerPage)
-            self.updatePageInfo()
-
-        self.gallery.resetImages()
-        self.requestImages.emit(*self.getImageRangeIndex())
+            # scroll by a full gallery, back to first row after last one
+            self.scrollTo(self.firstRow + self.size[0] if self.firstRow < self.maxRow else 0)
 
     ## -------------------------------------------------------------------------------------------
     def CBpreviousPage(self: AdvanceImageGallery) -> None :
         if debug : print(f'AdvanceImageGallery.CBpreviousPage():')
 
         if self.nbImages > 0:
-            self.pageIndex = (self.pageIndex -1)%ceil(self.nbImages/self.nbImgPerPage)  
-            self.updatePageInfo()
-
-        self.gallery.resetImages()
-        self.requestImages.emit(*self.getImageRangeIndex())
+            self.scrollTo(self.firstRow - self.size[0] if self.firstRow > 0 else self.maxRow)
 
     ## -------------------------------------------------------------------------------------------
     ## number of images in gallery
     def setNbImages(self: AdvanceImageGallery, nb: int) -> None : 
         self.nbImages = nb
+        self.firstRow = self.clampRow(self.firstRow)
+        self.updateScrollBar()
         self.updatePageInfo()
 
     ## -------------------------------------------------------------------------------------------
     ## image local index to global index
     def imageLocalIdxToGlobalIndex(self: AdvanceImageGallery, idxLocal) -> int:
         """return global index of image given by its local index."""
-        return self.pageIndex*self.nbImgPerPage+idxLocal
+        return self.firstRow*self.size[1]+idxLocal
 
     ## -------------------------------------------------------------------------------------------
-    ## image index to page index
-    def imageIdxToIndexInPage(self : AdvanceImageGallery, imageIndex : int) -> int:
-        """return the index of image in current page."""
+    ## image index to index in gallery
+    def imageIdxToIndexInPage(self : AdvanceImageGallery, imageIndex : int) -> int|None:
+        """return the index of image in gallery, None if image is not displayed."""
+        idxLocal : int = imageIndex - self.firstRow*self.size[1]
 
-        if debug : print(f'AdvanceImageGallery.imageIdxToIndexInPage({imageIndex}) > {imageIndex}%{self.nbImgPerPage} >> {imageIndex%self.nbImgPerPage}')
-
-        return imageIndex%self.nbImgPerPage
+        if debug : print(f'AdvanceImageGallery.imageIdxToIndexInPage({imageIndex}) > {idxLocal}')
 
+        return idxLocal if 0 <= idxLocal < self.nbImgPerPage else None
 
     ## -------------------------------------------------------------------------------------------
-    def imageIdxToPageIndex(self : AdvanceImageGallery, imageIndex : int) -> int:
-        """return the page index of image index."""
-
-        if debug : print(f'AdvanceImageGallery.imageIdxToPageIndex({imageIndex}) > {imageIndex}//{self.nbImgPerPage} >> {imageIndex//self.nbImgPerPage}')
-
-        return imageIndex//self.nbImgPerPage
+    def imageIdxToRow(self : AdvanceImageGallery, imageIndex : int) -> int:
+        """return the row of image index."""
+        return imageIndex//self.size[1]
 
     ## -------------------------------------------------------------------------------------------
     ## updatepage info
     def updatePageInfo(self :AdvanceImageGallery) -> None:
-        maxPage : int = ceil(self.nbImages/self.nbImgPerPage)
-        self.pageLabel.setText("page: "+str(self.pageIndex+1)+"/"+str(maxPage))
+        minIdx, maxIdx = self.getImageRangeIndex()
+        self.pageLabel.setText("images: "+str(min(minIdx+1, self.nbImages))+"-"+str(min(maxIdx+1, self.nbImages))+"/"+str(self.nbImages))
 
     ## -------------------------------------------------------------------------------------------
     ## request
@@ -348,14 +351,24 @@ class AdvanceImageGallery(QSplitter):
         if debug : print(f'AdvanceImageGallery.sendRequestImages()')
         self.requestImages.emit(*self.getImageRangeIndex())
 
+    ## -------------------------------------------------------------------------------------------
+    ## tileSize
+    def tileSize(self:AdvanceImageGallery) -> tuple[int,int]|None:
+        """return (width, height) in device pixels of an image of the gallery, None if not visible."""
+        return self.gallery.tileSize()
+
     ## -------------------------------------------------------------------------------------------
     ## setImage
-    def setImage(self:AdvanceImageGallery, index: int, image: ndarray|None) -> None:
-        """set an image 'ndarray' in the gallery at 'index' (global index)."""
+    def setImage(self:AdvanceImageGallery, index: int, image: ndarray|QImage|None) -> None:
+        """set an image 'ndarray' or display-ready 'QImage' in the gallery at 'index' (global index), ignored if image is not displayed (prefetch)."""
+
+        idxLocal : int|None = self.imageIdxToIndexInPage(index)
 
-        if debug : print(f'AdvanceImageGallery.setImage({index}) > {self.imageIdxToIndexInPage(index)} ')
+        if debug : print(f'AdvanceImageGallery.setImage({index}) > {idxLocal} ')
 
-        self.gallery.setImage(self.imageIdxToIndexInPage(index), image)
+        if idxLocal == None: return
+
+        self.gallery.setImage(idxLocal, image)
 
         # autoselect if one image per page
         if self.nbImgPerPage == 1:
@@ -374,7 +387,15 @@ class AdvanceImageGallery(QSplitter):
             
             self.imageSelected.emit(self.selectedImage)
 
-# -------------------------------------------------------------------------------------------
-
- 
+    # event
+    ## -------------------------------------------------------------------------------------------
+    def wheelEvent(self: AdvanceImageGallery, event: QWheelEvent) -> None:
+        """mouse wheel: scroll by one row per notch (120), the remaining angle is kept for next events."""
+        self.wheelDelta += event.angleDelta().y()
+        steps : int = int(self.wheelDelta/120)
+        if steps != 0:
+            self.wheelDelta -= steps*120
+            self.scrollTo(self.firstRow - steps)
+        event.accept()
 
+# -------------------------------------------------------------------------------------------
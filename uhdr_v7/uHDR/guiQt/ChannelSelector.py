@@ -20,7 +20,7 @@ import numpy as np, copy
 from typing_extensions import Self
 from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QSlider, QLabel, QLineEdit, QPushButton
 from PyQt6.QtCore import pyqtSignal, Qt
-from PyQt6.QtGui import QIntValidator
+from PyQt6.QtGui import QIntValidator, QPixmap
 
 from guiQt.ImageWidget import ImageWidget
 
@@ -29,7 +29,7 @@ class ChannelSelector(QFrame):
     # class attributes
     ## signal
     valuesChanged : pyqtSignal = pyqtSignal(str,int, int)
-    def __init__(self : Self, name : str, colourDataRGB : np.ndarray, range :tuple[int,int], default : tuple[int,int]  ) -> None:
+    def __init__(self : Self, name : str, colourDataRGB : np.ndarray|QPixmap, range :tuple[int,int], default : tuple[int,int]  ) -> None:
         super().__init__()
         self.setFrameShape(QFrame.Shape.StyledPanel)
 
@@ -71,7 +71,8 @@ class ChannelSelector(QFrame):
         # image
         self.imageWidget : ImageWidget = ImageWidget()
         self.imageWidget.setMinimumSize(2, 22) #2,72
-        self.imageWidget.setPixmap(colourDataRGB)
+        if isinstance(colourDataRGB, QPixmap):  self.imageWidget.setQPixmap(colourDataRGB)
+        else:                                   self.imageWidget.setPixmap(colourDataRGB)
         
         # slider min
         self.sliderMin = QSlider(Qt.Orientation.Horizontal)
@@ -21,12 +21,12 @@ import numpy as np, copy
 from typing_extensions import Self
 from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QSlider, QLabel, QLineEdit, QCheckBox, QWidget
 from PyQt6.QtCore import pyqtSignal, Qt
-from PyQt6.QtGui import QIntValidator
+from PyQt6.QtGui import QIntValidator, QPixmap
 
 from guiQt.AdvanceSliderLine import AdvanceSliderLine
 from guiQt.ChannelSelector import ChannelSelector
 
-from core import colourData, colourSpace
+from guiQt.LchGradients import LchGradients
 
 class Contrast(QFrame):
     # Declaration of signals
@@ -84,9 +84,8 @@ class Contrast(QFrame):
         self.containerScalingOffsetLayout.addWidget(self.offsetlider)
 
         ### lightness
-        lightnessBarLch: np.ndarray = colourData.buildLchcolourData((0, 200), (0, 0), (180, 180), (20, 720), width='L', height='c')
-        lightnessBarRGB: np.ndarray = colourSpace.Lch_to_sRGB(lightnessBarLch, apply_cctf_encoding=True, clip=True)
-        self.lightnessSelector: ChannelSelector = ChannelSelector('lightness', lightnessBarRGB, (0, 200), (0, 150))
+        lightnessBar: QPixmap = LchGradients.pixmap((0, 200), (0, 0), (180, 180), (20, 720), width='L', height='c')
+        self.lightnessSelector: ChannelSelector = ChannelSelector('lightness', lightnessBar, (0, 200), (0, 150))
 
         ### show selection
         self.showSelection: QCheckBox = QCheckBox("show selection")
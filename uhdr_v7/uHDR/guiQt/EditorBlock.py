@@ -21,6 +21,7 @@ from typing_extensions import Self
 from numpy import ndarray
 from PyQt6.QtWidgets import QSplitter
 from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QImage
 from guiQt.Editor import Editor
 from guiQt.ImageWidget import ImageWidget
 
@@ -119,5 +120,6 @@ class EditorBlock(QSplitter):
         colorEdit.activeColorsChanged.connect(lambda value, idx=index: self.activeColorsChanged.emit(value, idx))
 
     # methods
-    def setImage(self: Self, image: ndarray | None):
-        self.imageWidget.setPixmap(image)
+    def setImage(self: Self, image: ndarray | QImage | None):
+        if isinstance(image, QImage):   self.imageWidget.setQImage(image)
+        else:                           self.imageWidget.setPixmap(image)
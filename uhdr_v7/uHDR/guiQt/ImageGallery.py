@@ -87,7 +87,7 @@ from __future__ import annotations
 from numpy import ndarray
 from PyQt6.QtWidgets import QGridLayout, QWidget, QSplitter, QFrame
 from PyQt6.QtCore import pyqtSignal, Qt
-from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtGui import QMouseEvent, QImage
 
 from guiQt.ImageWidget import ImageWidget
 
@@ -97,7 +97,7 @@ from guiQt.ImageWidget import ImageWidget
 # ------------------------------------------------------------------------------------------
 debug : bool = False
 class ImageGallery(QFrame):
-    """Image gallery layout on grid."""
+    """Image gallery layout on grid: image widgets come from a pool, recycled when size changes or when gallery is scrolled."""
     # class attributes
     pass
     ## signal
@@ -116,7 +116,8 @@ class ImageGallery(QFrame):
         super().__init__()
 
         self._size : tuple[int,int] = size
-        self.imageWidgets : list[ImageWidget] = []
+        self.imageWidgets : list[ImageWidget] = []     # widgets in grid (row major order)
+        self.pool : list[ImageWidget] = []             # all widgets created (never deleted)
 
         # gallery part
         #self.imagesContainer = QFrame()
@@ -138,26 +139,45 @@ class ImageGallery(QFrame):
 
     ## grid mangement
     def buildGrid(self:ImageGallery) -> None:
-        """build image widget grid according to size."""
-        for i in range(self._size[0]): 
-            for j in range(self._size[1]):
-                iw = ImageWidget()
-                self.imageWidgets.append(iw)
-                self.imagesLayout.addWidget(iw,i,j)
+        """build image widget grid according to size, image widgets are created only when the pool is too small."""
+        nbImages : int = self._size[0]*self._size[1]
+        while len(self.pool) < nbImages: self.pool.append(ImageWidget())
+
+        self.imageWidgets = self.pool[:nbImages]
+        for idx, iw in enumerate(self.imageWidgets):
+            self.imagesLayout.addWidget(iw, idx//self._size[1], idx%self._size[1])
+            iw.show()
 
     def reset(self :ImageGallery) -> None:
-        """reset the grid, delete image widget and rebuild the grid."""
-        for iw in self.imageWidgets : iw.deleteLater()
-        self.imageWidgets = []
+        """reset the grid: image widgets are removed from the grid (recycled) and the grid is rebuilt."""
+        for iw in self.imageWidgets : 
+            self.imagesLayout.removeWidget(iw)
+            iw.hide()
         self.buildGrid()
 
+    def shift(self: ImageGallery, offset: int) -> None:
+        """scroll the images of the grid by offset (number of images), images still displayed are moved, others are reset."""
+        nbImages : int = len(self.imageWidgets)
+        order : range = range(nbImages) if offset > 0 else range(nbImages-1, -1, -1)
+        for idx in order:
+            if 0 <= idx+offset < nbImages: self.imageWidgets[idx].setQPixmap(self.imageWidgets[idx+offset].imagePixmap)
+            else: self.imageWidgets[idx].setPixmap(None)
+
     def resetImages(self: ImageGallery) -> None:
         """reset the image (pixmap) in the grid."""
         for iw in self.imageWidgets : iw.setPixmap(None)
 
-    def setImage(self:ImageGallery, index: int, image: ndarray|None):
-        """set image pixmap."""
-        self.imageWidgets[index].setPixmap(image)
+    def setImage(self:ImageGallery, index: int, image: ndarray|QImage|None):
+        """set image pixmap (QImage: display-ready tile converted by loader)."""
+        if isinstance(image, QImage):   self.imageWidgets[index].setQImage(image)
+        else:                           self.imageWidgets[index].setPixmap(image)
+
+    def tileSize(self: ImageGallery) -> tuple[int,int]|None:
+        """return (width, height) in device pixels of a grid cell, None if gallery is not visible."""
+        if not self.isVisible(): return None
+        ratio : float = self.devicePixelRatioF()
+        rect = self.contentsRect()
+        return (max(1,int(rect.width()*ratio/self._size[1])), max(1,int(rect.height()*ratio/self._size[0])))
 
 
     # event
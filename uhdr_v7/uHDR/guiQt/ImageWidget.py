@@ -58,6 +58,18 @@ import numpy as np
 # --- class ImageWidget(QWidget) -------------------------------------------------------
 # ------------------------------------------------------------------------------------------
 class ImageWidget(QWidget):
+    """display of float colour data ([0,1], RGB).
+
+        display conversion (toQImage, any thread): colour data is reduced (integer factor box filter) to the device pixel size of the widget,
+        then converted by a float -> 8 bits look up table (optional ordered dithering) straight into the memory of a QImage, colour data is never modified.
+    """
+    # class attributes
+    lutSize : int = 4096                                                            # 16 input levels per 8 bits level
+    lut : np.ndarray = (np.arange(lutSize)*256//lutSize).astype(np.uint8)
+    bayer : np.ndarray = np.asarray([[ 0, 8, 2,10],
+                                     [12, 4,14, 6],
+                                     [ 3,11, 1, 9],
+                                     [15, 7,13, 5]], dtype=np.float32)            # ordered dithering: offsets in [0,16[ input levels
 
     def __init__(self: Self,colorData : np.ndarray|None = None) -> None:
         super().__init__()
@@ -65,6 +77,10 @@ class ImageWidget(QWidget):
         self.label : QLabel = QLabel(self)   # create a QtLabel for pixmap
         self.label.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter)
 
+        # colour data displayed (not copied, None if pixmap is set) and its reduction factor
+        self.colorData : np.ndarray|None = None
+        self.reduction : int = 1
+
         if not isinstance(colorData, np.ndarray): colorData = ImageWidget.emptyImageColorData()
         self.imagePixmap : QPixmap
         self.setPixmap(colorData)  
@@ -72,6 +88,10 @@ class ImageWidget(QWidget):
     # methods
     # -------------------------------------------------- 
     def resize(self : Self)-> None:
+        # widget larger than reduced colour data: convert again
+        if isinstance(self.colorData, np.ndarray) and self.reduction > ImageWidget.reductionFactor(self.colorData.shape, self.deviceSize()):
+            self.setPixmap(self.colorData)
+            return
         self.label.resize(self.size())
         self.label.setPixmap(self.imagePixmap.scaled(self.size(),Qt.AspectRatioMode.KeepAspectRatio))
 
@@ -80,28 +100,88 @@ class ImageWidget(QWidget):
         self.resize()
         super().resizeEvent(event)
 
+    # -------------------------------------------------- 
+    def deviceSize(self: Self) -> tuple[int,int]|None:
+        """return (width, height) of widget in device pixels, None if widget is not visible (size not set by layout)."""
+        if not self.isVisible(): return None
+        ratio : float = self.devicePixelRatioF()
+        return (int(self.width()*ratio), int(self.height()*ratio))
+
     # -------------------------------------------------- 
     def setPixmap(self: Self, colorData :  np.ndarray|None = None) -> QPixmap:
         if not isinstance(colorData, np.ndarray): colorData = ImageWidget.emptyImageColorData()
+        size : tuple[int,int]|None = self.deviceSize()
 
-        height, width , channel  = colorData.shape   
-        bytesPerLine = channel * width
-
-        # clip
-        colorData[colorData>1.0] = 1.0
-        colorData[colorData<0.0] = 0.0
-
-        qImg : QImage= QImage(bytes((colorData*255).astype(np.uint8)), width, height, bytesPerLine, QImage.Format.Format_RGB888) # QImage
-        self.imagePixmap : QPixmap = QPixmap.fromImage(qImg)
+        self.colorData = colorData
+        self.reduction = ImageWidget.reductionFactor(colorData.shape, size)
+        self.imagePixmap : QPixmap = QPixmap.fromImage(ImageWidget.toQImage(colorData, size))
         self.resize()
 
         return self.imagePixmap
 
+    # -------------------------------------------------- 
+    def setQImage(self: Self, qImage : QImage)-> QPixmap:
+        """set image converted on a worker thread (see toQImage)."""
+        self.setQPixmap(QPixmap.fromImage(qImage))
+        return self.imagePixmap
+
     # -------------------------------------------------- 
     def setQPixmap(self: Self, qPixmap : QPixmap)-> None:
+        self.colorData = None
+        self.reduction = 1
         self.imagePixmap = qPixmap
         self.resize()
 
+    # -------------------------------------------------- 
+    @staticmethod
+    def toQPixmap(colorData :  np.ndarray|None = None) -> QPixmap:
+        return QPixmap.fromImage(ImageWidget.toQImage(colorData))
+
+    # -------------------------------------------------- 
+    @staticmethod
+    def reductionFactor(shape : tuple, size : tuple[int,int]|None) -> int:
+        """return the largest integer factor that keeps image (shape) at least as large as its display (keep aspect ratio) in size (width, height)."""
+        if size == None: return 1
+        height, width = shape[0], shape[1]
+        return max(1, int(max(width/max(1,size[0]), height/max(1,size[1]))))
+
+    # -------------------------------------------------- 
+    @staticmethod
+    def toQImage(colorData :  np.ndarray|None = None, size : tuple[int,int]|None = None, dither : bool = False) -> QImage:
+        """convert colour data ([0,1], RGB) to QImage (RGB888): any thread, colorData is not modified.
+
+        Args:
+            colorData (np.ndarray, Optional): colour data, empty image if None
+            size (tuple[int,int], Optional): display size (width, height) in device pixels, colour data is reduced by an integer factor to fit it
+            dither (bool, Optional): ordered dithering
+
+        Returns:
+            (QImage)
+        """
+        if not isinstance(colorData, np.ndarray): colorData = ImageWidget.emptyImageColorData()
+
+        # reduction: box filter
+        factor : int = ImageWidget.reductionFactor(colorData.shape, size)
+        if factor > 1:
+            height, width = (colorData.shape[0]//factor)*factor, (colorData.shape[1]//factor)*factor
+            colorData = colorData[:height,:width,:].reshape(height//factor, factor, width//factor, factor, -1).mean(axis=(1,3))
+
+        height, width, _ = colorData.shape
+
+        # look up table index (new array: colorData is not modified)
+        index : np.ndarray = np.empty(colorData.shape, dtype=np.intp)
+        if dither:  np.add(colorData*(ImageWidget.lutSize-1), np.tile(ImageWidget.bayer, (height//4+1, width//4+1))[:height,:width,np.newaxis], out=index, casting='unsafe')
+        else:       np.multiply(colorData, ImageWidget.lutSize-1, out=index, casting='unsafe')
+
+        # look up (index out of table: colour data out of [0,1], clipped) written in QImage memory (rows are aligned on 32 bits)
+        qImage : QImage = QImage(width, height, QImage.Format.Format_RGB888)
+        bits = qImage.bits()
+        bits.setsize(qImage.sizeInBytes())
+        pixels : np.ndarray = np.ndarray((height, width, 3), dtype=np.uint8, buffer=bits, strides=(qImage.bytesPerLine(), 3, 1))
+        np.take(ImageWidget.lut, index, out=pixels, mode='clip')
+
+        return qImage
+
     # -------------------------------------------------- 
     @staticmethod
     def emptyImageColorData()-> np.ndarray: return np.ones((90,160,3))*(220/255) 
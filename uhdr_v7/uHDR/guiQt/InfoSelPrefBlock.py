@@ -36,13 +36,15 @@ class InfoSelPrefBlock(QTabWidget):
     tagChanged : pyqtSignal = pyqtSignal(tuple,bool)
     scoreChanged : pyqtSignal = pyqtSignal(int)
     scoreSelectionChanged : pyqtSignal = pyqtSignal(list)
+    tagSelectionChanged : pyqtSignal = pyqtSignal(list)
+    nameSelectionChanged : pyqtSignal = pyqtSignal(str)
     # constructor
     def __init__(self:Self, tags : dict[Tuple[str,str], bool]) -> None:
         super().__init__()
 
         # attributes
         self.infoExifScoreTag : InfoScoreExifTags = InfoScoreExifTags(tags) 
-        self.selection : Selection = Selection() 
+        self.selection : Selection = Selection(tags) 
         self.preferences : QWidget = QWidget() 
 
         # QTabWidget settup
@@ -59,6 +61,8 @@ class InfoSelPrefBlock(QTabWidget):
         self.infoExifScoreTag.scoreChanged.connect(self.CBscoreChanged)
 
         self.selection.scoreSelectionChanged.connect(self.CBscoreSelectionChanged)
+        self.selection.tagSelectionChanged.connect(self.CBtagSelectionChanged)
+        self.selection.nameSelectionChanged.connect(self.CBnameSelectionChanged)
     
     # methods
     ## tags
@@ -79,6 +83,7 @@ class InfoSelPrefBlock(QTabWidget):
     # -----------------------------------------------------------------
     def CBtagChanged(self, key: tuple[str, str], value : bool) -> None:
         if debug :print(f'guiQt.InfoSelPrefBlock.CBtagChanged({key},{value}) > emit !')
+        self.selection.addTag(key)      # new tag: available in tag filter
         self.tagChanged.emit(key,value)
 
     # -----------------------------------------------------------------
@@ -91,6 +96,16 @@ class InfoSelPrefBlock(QTabWidget):
     def CBscoreSelectionChanged(self: Self, scoreSelection: list) -> None:
         if debug : print(f'guiQt.InfoSelPrefBlock.CBscoreSelectionChanged({scoreSelection})') 
         self.scoreSelectionChanged.emit(scoreSelection)
+
+    # ---------------------------------------------------------------
+    def CBtagSelectionChanged(self: Self, tagSelection: list) -> None:
+        if debug : print(f'guiQt.InfoSelPrefBlock.CBtagSelectionChanged({tagSelection})') 
+        self.tagSelectionChanged.emit(tagSelection)
+
+    # ---------------------------------------------------------------
+    def CBnameSelectionChanged(self: Self, pattern: str) -> None:
+        if debug : print(f'guiQt.InfoSelPrefBlock.CBnameSelectionChanged({pattern})') 
+        self.nameSelectionChanged.emit(pattern)
 # ------------------------------------------------------------------------------------------
 
 
@@ -0,0 +1,54 @@
+# uHDR: HDR image editing software
+#   Copyright (C) 2022  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020-2022
+# author: remi.cozot@univ-littoral.fr
+
+# import
+# ------------------------------------------------------------------------------------------
+from __future__ import annotations
+import numpy as np
+from PyQt6.QtGui import QPixmap
+
+from guiQt.ImageWidget import ImageWidget
+from core import colourData, colourSpace
+
+# ------------------------------------------------------------------------------------------
+# --- class LchGradients -------------------------------------------------------------------
+# ------------------------------------------------------------------------------------------
+class LchGradients:
+    """cache (least recently used) of gradient pixmaps of Lch selectors (channel bars and selection views).
+
+        key: Lch ranges, size and axes of gradient (see core.colourData.buildLchcolourData), GUI thread only.
+    """
+    # class attributes
+    maxCount : int = 64
+    pixmaps : dict[tuple, QPixmap] = {}
+
+    # static methods
+    # ------------------------------------------------------------------------------------
+    @staticmethod
+    def pixmap(L : tuple[float,float], c : tuple[float,float], h : tuple[float,float], size : tuple[int,int], width : str, height : str) -> QPixmap:
+        """return pixmap of gradient, built (sRGB, clipped) if not in cache."""
+        key : tuple = (tuple(L), tuple(c), tuple(h), tuple(size), width, height)
+
+        pixmap : QPixmap|None = LchGradients.pixmaps.pop(key, None)
+        if pixmap is None:
+            colourDataLch : np.ndarray = colourData.buildLchcolourData(L, c, h, size, width=width, height=height)
+            pixmap = ImageWidget.toQPixmap(colourSpace.Lch_to_sRGB(colourDataLch, apply_cctf_encoding=True, clip=True))
+
+        # most recently used last
+        LchGradients.pixmaps[key] = pixmap
+        while len(LchGradients.pixmaps) > LchGradients.maxCount: del LchGradients.pixmaps[next(iter(LchGradients.pixmaps))]
+
+        return pixmap
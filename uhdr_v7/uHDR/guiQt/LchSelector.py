@@ -20,11 +20,11 @@ import numpy as np, copy
 from typing_extensions import Self
 from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QSlider, QLabel, QLineEdit, QCheckBox, QWidget
 from PyQt6.QtCore import pyqtSignal, Qt
-from PyQt6.QtGui import QIntValidator
+from PyQt6.QtGui import QIntValidator, QPixmap
 
 from guiQt.ImageWidget import ImageWidget
 from guiQt.ChannelSelector import ChannelSelector
-from core import colourData, colourSpace
+from guiQt.LchGradients import LchGradients
 # ------------------------------------------------------------------------------------------
 class LchSelector(QFrame):
     # class attributes
@@ -68,19 +68,16 @@ class LchSelector(QFrame):
         self.containerLayout.addWidget(self.lightnessHue) 
 
         ### hue
-        hueBarLch : np.ndarray = colourData.buildLchcolourData((75,75), (100,100), (0,360+90), (20,720), width='h', height='c')
-        hueBarRGB : np.ndarray = colourSpace.Lch_to_sRGB(hueBarLch,apply_cctf_encoding=True, clip=True)
-        self.hueSelector : ChannelSelector = ChannelSelector('hue',hueBarRGB, (0,360+90),(0,360+90))   
+        hueBar : QPixmap = LchGradients.pixmap((75,75), (100,100), (0,360+90), (20,720), width='h', height='c')
+        self.hueSelector : ChannelSelector = ChannelSelector('hue',hueBar, (0,360+90),(0,360+90))   
 
         ### chroma
-        chromaBarLch : np.ndarray = colourData.buildLchcolourData((75,75), (0,100), (180,180), (20,720), width='c', height='L')
-        chromaBarRGB : np.ndarray= colourSpace.Lch_to_sRGB(chromaBarLch,apply_cctf_encoding=True, clip=True)    
-        self.chromaSelector : ChannelSelector = ChannelSelector('chroma',chromaBarRGB, (0,100),(0,100)) 
+        chromaBar : QPixmap = LchGradients.pixmap((75,75), (0,100), (180,180), (20,720), width='c', height='L')
+        self.chromaSelector : ChannelSelector = ChannelSelector('chroma',chromaBar, (0,100),(0,100)) 
 
         ### lightness  
-        lightnessBarLch : np.ndarray = colourData.buildLchcolourData((0,200), (0,0), (180,180), (20,720), width='L', height='c')
-        lightnessBarRGB : np.ndarray = colourSpace.Lch_to_sRGB(lightnessBarLch,apply_cctf_encoding=True, clip=True)
-        self.lightnessSelector : ChannelSelector = ChannelSelector('lightness',lightnessBarRGB, (0,200),(0,150)) 
+        lightnessBar : QPixmap = LchGradients.pixmap((0,200), (0,0), (180,180), (20,720), width='L', height='c')
+        self.lightnessSelector : ChannelSelector = ChannelSelector('lightness',lightnessBar, (0,200),(0,150)) 
 
         ### show selection
         self.showSelection : QCheckBox = QCheckBox("show selection")
@@ -155,9 +152,7 @@ class LchSelector(QFrame):
         hue : int  = (hueMin + hueMax)//2
         self.hueRange = (hueMin, hueMax)
         # compute chroma bar
-        chromaBarLch : np.ndarray = colourData.buildLchcolourData((75,75), (0,100), (hue,hue), (20,720), width='c', height='L')
-        chromaBarRGB : np.ndarray= colourSpace.Lch_to_sRGB(chromaBarLch,apply_cctf_encoding=True, clip=True)
-        self.chromaSelector.imageWidget.setPixmap(chromaBarRGB)
+        self.chromaSelector.imageWidget.setQPixmap(LchGradients.pixmap((75,75), (0,100), (hue,hue), (20,720), width='c', height='L'))
 
         self.hueRangeChanged.emit(self.hueSelector.getValues())
         self.updateView()
@@ -175,10 +170,6 @@ class LchSelector(QFrame):
     # update view
     def updateView(self: Self) -> None:
         # chrmaHue
-        chromaHueLCh : np.ndarray = colourData.buildLchcolourData((75,75), self.chromaRange, self.hueRange, (200,200), width='h', height='c')
-        chromaHueRGB : np.ndarray= colourSpace.Lch_to_sRGB(chromaHueLCh,apply_cctf_encoding=True, clip=True)
-        self.chromaHue.setPixmap(chromaHueRGB)
+        self.chromaHue.setQPixmap(LchGradients.pixmap((75,75), self.chromaRange, self.hueRange, (200,200), width='h', height='c'))
         # chromaLightness
-        chromaLightnessLch : np.ndarray = colourData.buildLchcolourData(self.LightnessRange, self.chromaRange, self.hueRange, (200,200), width='h', height='L')
-        chromaLightnessRGB : np.ndarray= colourSpace.Lch_to_sRGB(chromaLightnessLch,apply_cctf_encoding=True, clip=True)
-        self.lightnessHue.setPixmap(chromaLightnessRGB)
+        self.lightnessHue.setQPixmap(LchGradients.pixmap(self.LightnessRange, self.chromaRange, self.hueRange, (200,200), width='h', height='L'))
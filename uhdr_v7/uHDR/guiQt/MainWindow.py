@@ -4,7 +4,7 @@ from typing_extensions import Self
 from typing import Tuple
 from PyQt6.QtWidgets import QFileDialog, QDockWidget, QMainWindow
 from PyQt6.QtCore import pyqtSignal, Qt, pyqtSlot
-from PyQt6.QtGui import QAction
+from PyQt6.QtGui import QAction, QImage
 from numpy import ndarray
 from app.Tags import Tags
 import preferences.Prefs
@@ -22,6 +22,8 @@ class MainWindow(QMainWindow):
     tagChanged = pyqtSignal(tuple, bool)
     scoreChanged = pyqtSignal(int)
     scoreSelectionChanged = pyqtSignal(list)
+    tagSelectionChanged = pyqtSignal(list)
+    nameSelectionChanged = pyqtSignal(str)
 
     exposureChanged = pyqtSignal(float)
     contrastScalingChanged = pyqtSignal(float)
@@ -86,6 +88,8 @@ class MainWindow(QMainWindow):
         self.metaBlock.tagChanged.connect(self.CBtagChanged)
         self.metaBlock.scoreChanged.connect(self.CBscoreChanged)
         self.metaBlock.scoreSelectionChanged.connect(self.CBscoreSelectionChanged)
+        self.metaBlock.tagSelectionChanged.connect(self.CBtagSelectionChanged)
+        self.metaBlock.nameSelectionChanged.connect(self.CBnameSelectionChanged)
 
         ### from EditorBlock
         self.editBlock.exposureChanged.connect(self.exposureChanged)
@@ -137,17 +141,25 @@ class MainWindow(QMainWindow):
         
     
     ## image
-    def setGalleryImage(self: Self, index: int, image: ndarray|None) -> None:
+    def setGalleryImage(self: Self, index: int, image: ndarray|QImage|None) -> None:
         """send the image of global index to image gallery"""
         if debug: print(f'MainWindows.setGalleryImage(index={index}, image= ...)')
         self.imageGallery.setImage(index, image)
 
+    def galleryTileSize(self: Self) -> tuple[int,int]|None:
+        """return (width, height) in device pixels of gallery images, None if not visible."""
+        return self.imageGallery.tileSize()
+
     def setNumberImages(self: Self, nbImages: int) -> None:
         self.imageGallery.setNbImages(nbImages)
 
-    def setEditorImage(self: Self, image: ndarray) -> None:
+    def setEditorImage(self: Self, image: ndarray|QImage) -> None:
         self.editBlock.setImage(image)
 
+    def editorDisplaySize(self: Self) -> tuple[int,int]|None:
+        """return (width, height) in device pixels of editor image, None if not visible."""
+        return self.editBlock.imageWidget.deviceSize()
+
     ## tags
     def setTagsImage(self: Self, tags: dict[Tuple[str,str], bool]) -> None :
         self.metaBlock.setTags(tags)
@@ -220,4 +232,12 @@ class MainWindow(QMainWindow):
     # -----------------------------------------------------------------
     def CBscoreSelectionChanged(self: Self, scoreSelection: list) -> None:
         if debug : print(f'guiQt.MainWindow.CBscoreSelectionChanged({scoreSelection})') 
-        self.scoreSelectionChanged.emit(scoreSelection)
\ No newline at end of file
+        self.scoreSelectionChanged.emit(scoreSelection)
+    # -----------------------------------------------------------------
+    def CBtagSelectionChanged(self: Self, tagSelection: list) -> None:
+        if debug : print(f'guiQt.MainWindow.CBtagSelectionChanged({tagSelection})') 
+        self.tagSelectionChanged.emit(tagSelection)
+    # -----------------------------------------------------------------
+    def CBnameSelectionChanged(self: Self, pattern: str) -> None:
+        if debug : print(f'guiQt.MainWindow.CBnameSelectionChanged({pattern})') 
+        self.nameSelectionChanged.emit(pattern)
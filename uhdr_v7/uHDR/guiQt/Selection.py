@@ -18,36 +18,62 @@ from __future__ import annotations
 # import
 # ------------------------------------------------------------------------------------------
 from typing_extensions import Self
-from PyQt6.QtWidgets import QFrame,QVBoxLayout 
+from PyQt6.QtWidgets import QFrame,QVBoxLayout, QHBoxLayout, QLabel, QLineEdit
 from PyQt6.QtCore import pyqtSignal
 import copy
 from guiQt.ScoringSelection import ScoringSelection
+from guiQt.AdvanceCheckBoxGroup import AdvanceCheckBoxGroup
 
 # -------------------------------------------------------------------------------------------
 # --- ScoringSelection (QFrame) -------------------------------------------------------------
 # -------------------------------------------------------------------------------------------
 debug = True
 class Selection(QFrame):
-    """gui of selection panel."""
+    """gui of selection panel: filters by score, tags (images have all checked tags) and name (glob pattern)."""
     # class attributes
     ## signal
     scoreSelectionChanged : pyqtSignal = pyqtSignal(list)
+    tagSelectionChanged : pyqtSignal = pyqtSignal(list)     # checked tags (type, name)
+    nameSelectionChanged : pyqtSignal = pyqtSignal(str)     # glob pattern, '': no filter
 
     # constructor
     # -----------------------------------------------------------------------------
 
-    def __init__(self: Selection) -> None: 
+    def __init__(self: Selection, tags : dict[tuple[str,str], bool] = {}) -> None: 
         super().__init__()
 
         # attributes
+        self.tagsSelected : list[tuple[str,str]] = []
+
         self.topLayout : QVBoxLayout = QVBoxLayout() ; self.setLayout(self.topLayout)
         self.selectByScore : ScoringSelection = ScoringSelection('score:', 6)
 
+        self.nameContainer : QFrame = QFrame() ; self.nameContainer.setFrameShape(QFrame.Shape.StyledPanel)
+        self.nameLayout : QHBoxLayout = QHBoxLayout() ; self.nameContainer.setLayout(self.nameLayout)
+        self.nameLabel : QLabel = QLabel('name:')
+        self.selectByName : QLineEdit = QLineEdit() ; self.selectByName.setPlaceholderText('*.jpg')
+        self.nameLayout.addWidget(self.nameLabel)
+        self.nameLayout.addWidget(self.selectByName)
+
+        self.tagsLabel : QLabel = QLabel('tags:')
+        self.selectByTags : AdvanceCheckBoxGroup = AdvanceCheckBoxGroup({key: False for key in tags})
+
         self.topLayout.addWidget(self.selectByScore)
+        self.topLayout.addWidget(self.nameContainer)
+        self.topLayout.addWidget(self.tagsLabel)
+        self.topLayout.addWidget(self.selectByTags)
         self.topLayout.addStretch()
 
         ## callbacks
         self.selectByScore.selectionChanged.connect(self.CBscoreSlectionChanged)
+        self.selectByTags.toggled.connect(self.CBtagSelectionChanged)
+        self.selectByName.editingFinished.connect(self.CBnameSelectionChanged)
+
+    # methods
+    # -----------------------------------------------------------------------------
+    def addTag(self: Selection, key: tuple[str,str]) -> None:
+        """add a tag (created in information panel) to the tag filter."""
+        if not self.selectByTags.getByKey(key): self.selectByTags.addLine({key: False})
 
     # methods
     # -----------------------------------------------------------------------------
@@ -55,4 +81,17 @@ class Selection(QFrame):
     def CBscoreSlectionChanged(self : Selection, scores : list[bool]) -> None:
         """called when score selection changed."""
         if debug : print(f'guiQt.Selection.CBscoreSelectionChanged({scores})')
-        self.scoreSelectionChanged.emit(copy.deepcopy(scores))
\ No newline at end of file
+        self.scoreSelectionChanged.emit(copy.deepcopy(scores))
+
+    def CBtagSelectionChanged(self : Selection, key : tuple[str,str], value : bool) -> None:
+        """called when a tag of tag filter is checked or unchecked."""
+        if value and key not in self.tagsSelected: self.tagsSelected.append(key)
+        elif not value and key in self.tagsSelected: self.tagsSelected.remove(key)
+        if debug : print(f'guiQt.Selection.CBtagSelectionChanged({key},{value}) > emit {self.tagsSelected}')
+        self.tagSelectionChanged.emit(copy.deepcopy(self.tagsSelected))
+
+    def CBnameSelectionChanged(self : Selection) -> None:
+        """called when name filter is edited (return or focus lost)."""
+        pattern : str = self.selectByName.text().strip()
+        if debug : print(f'guiQt.Selection.CBnameSelectionChanged() > emit {pattern}')
+        self.nameSelectionChanged.emit(pattern)
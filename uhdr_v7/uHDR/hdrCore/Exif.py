@@ -17,12 +17,30 @@
 # import
 # ------------------------------------------------------------------------------------------
 from typing_extensions import Self
-import os, subprocess
+import os, subprocess, json, re, shutil, struct, math
 # ------------------------------------------------------------------------------------------
 # --- class Exif ---------------------------------------------------------------------------
 # ------------------------------------------------------------------------------------------
 debug : bool = True
 class Exif:    
+    # exif tags read from jpeg header (IFD0 and Exif IFD): tag -> exiftool description
+    jpegTags : dict[int, str] = {
+        0x010F: 'Make',
+        0x0110: 'Camera Model Name',
+        0x0131: 'Software',
+        0x829A: 'Exposure Time',
+        0x829D: 'F Number',
+        0x8827: 'ISO',
+        0x920A: 'Focal Length',
+        0xA001: 'Color Space',
+        0xA434: 'Lens Model'}
+
+    @staticmethod
+    def exiftool() -> str|None:
+        """ returns exiftool executable: exiftool.exe in working directory or exiftool in PATH, None if not found."""
+        if os.path.isfile('exiftool.exe'): return 'exiftool.exe'
+        return shutil.which('exiftool')
+
     @staticmethod
     def readExif(imagePath: str ,filename: str) -> dict[str,str]|None:
         """ returns a dict containing exif data.
@@ -46,13 +64,150 @@ class Exif:
                 for each in exifdataLines:
                     tag,val = each.split(':',1)# tags and values are separated by a semi colon
                     exifDict[tag.strip()] = val.strip()
-            else: print("ERROR: exiftool.exe not found!")
+            else: 
+                print("ERROR: exiftool.exe not found! > reading image header")
+                exifDict = Exif.readHeader(imagePath, filename)
 
         else: print("ERROR: Exif.readExif(",filename,"): file not found!")
 
         return exifDict
-        
-        
+
+    @staticmethod
+    def readExifBatch(imagePath: str, filenames: list[str]) -> dict[str, dict[str,str]]:
+        """ returns a dict (key: filename) of exif dicts, a single exiftool call (json output) for all files.
+            files not processed by exiftool (or exiftool not found) are read by Exif.readHeader (no pixel decoding).
+        """
+        res : dict[str, dict[str,str]] = {}
+        if not filenames: return res
+
+        if debug : print(f'Exif.readExifBatch({imagePath}, {len(filenames)} files)')
+
+        tool : str|None = Exif.exiftool()
+        if tool:
+            try:
+                # filenames are sent on stdin (-@ -): no command line length limit
+                argFile : str = '\n'.join([os.path.join(imagePath, filename) for filename in filenames])
+                output : str = subprocess.run([tool, '-json', '-charset', 'filename=utf8', '-@', '-'],
+                    input=argFile, capture_output=True, text=True, encoding='utf-8').stdout
+                for entry in json.loads(output) if output else []:
+                    filename : str = re.split(r'[\\/]', entry.get('SourceFile', ''))[-1]
+                    res[filename] = {Exif.tagDescription(tag): str(val) for tag, val in entry.items()}
+            except (OSError, ValueError) as e:
+                print(f'ERROR: Exif.readExifBatch({imagePath}): {e}')
+        else: print("ERROR: exiftool.exe not found! > reading image headers")
+
+        for filename in filenames:
+            if filename not in res: res[filename] = Exif.readHeader(imagePath, filename)
+
+        return res
+
+    @staticmethod
+    def tagDescription(tag: str) -> str:
+        """ exiftool json tag name to exiftool text description: 'BitsPerSample' -> 'Bits Per Sample', 'FNumber' -> 'F Number'."""
+        if tag == 'Model': return 'Camera Model Name'
+        return re.sub(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])', ' ', tag)
+
+    @staticmethod
+    def readHeader(imagePath: str ,filename: str) -> dict[str,str]:
+        """ returns a dict containing exif data read from image header (jpeg: SOF and APP1 exif, radiance: header), pixels are not decoded.
+        """
+        exifDict : dict[str,str] = {'File Name': filename}
+        file : str = os.path.join(imagePath, filename)
+        ext : str = filename.split('.')[-1].lower()
+        try:
+            with open(file, 'rb') as f:
+                if ext in ('jpg', 'jpeg'):  exifDict.update(Exif.readJpegHeader(f))
+                elif ext == 'hdr':          exifDict.update(Exif.readRadianceHeader(f))
+        except (OSError, ValueError, struct.error) as e:
+            print(f'ERROR: Exif.readHeader({imagePath},{filename}): {e}')
+        return exifDict
+
+    @staticmethod
+    def readJpegHeader(f) -> dict[str,str]:
+        """ reads jpeg markers until start of scan: size and bits per sample (SOF), exif (APP1)."""
+        exifDict : dict[str,str] = {}
+        if f.read(2) != b'\xff\xd8': raise ValueError('not a jpeg file')
+        while True:
+            marker : bytes = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF: break
+            m : int = marker[1]
+            if m == 0xFF:                       f.seek(-1, 1) ; continue # fill byte
+            if m == 0x01 or 0xD0 <= m <= 0xD8:  continue # no payload
+            if m in (0xD9, 0xDA):               break # end of image, start of scan
+            length : int = struct.unpack('>H', f.read(2))[0]
+            data : bytes = f.read(length - 2)
+            if m == 0xE1 and data[:6] == b'Exif\x00\x00':
+                exifDict.update(Exif.readTiff(data[6:]))
+            elif 0xC0 <= m <= 0xCF and m not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', data[1:5])
+                exifDict['Bits Per Sample'] = str(data[0])
+                exifDict['Image Width'] = str(width)
+                exifDict['Image Height'] = str(height)
+                break
+        return exifDict
+
+    @staticmethod
+    def readTiff(data: bytes) -> dict[str,str]:
+        """ reads IFD0 and Exif IFD of the tiff structure of APP1 exif segment."""
+        endian : str = '<' if data[:2] == b'II' else '>'
+        typeSize : dict[int,int] = {1:1, 2:1, 3:2, 4:4, 5:8, 7:1, 9:4, 10:8}
+
+        def readIfd(offset: int) -> dict[int, object]:
+            tags : dict[int, object] = {}
+            nb : int = struct.unpack(endian+'H', data[offset:offset+2])[0]
+            for i in range(nb):
+                entry : int = offset + 2 + 12*i
+                tag, type, count = struct.unpack(endian+'HHI', data[entry:entry+8])
+                if type not in typeSize: continue
+                size : int = typeSize[type]*count
+                valueOffset : int = entry + 8 if size <= 4 else struct.unpack(endian+'I', data[entry+8:entry+12])[0]
+                value : bytes = data[valueOffset:valueOffset+size]
+                if type == 2:           tags[tag] = value.split(b'\x00')[0].decode('latin-1').strip()
+                elif type == 3:         tags[tag] = struct.unpack(endian+'H', value[:2])[0]
+                elif type in (4, 9):    tags[tag] = struct.unpack(endian+('I' if type == 4 else 'i'), value[:4])[0]
+                elif type in (5, 10):   tags[tag] = struct.unpack(endian+('II' if type == 5 else 'ii'), value[:8])
+            return tags
+
+        tags : dict[int, object] = readIfd(struct.unpack(endian+'I', data[4:8])[0])
+        if 0x8769 in tags: tags.update(readIfd(tags[0x8769]))
+
+        exifDict : dict[str,str] = {}
+        for tag, description in Exif.jpegTags.items():
+            if tag not in tags: continue
+            value = tags[tag]
+            if tag == 0x829A: # exposure time: 1/200
+                num, den = value
+                if num == 0 or den == 0: continue
+                gcd : int = math.gcd(num, den)
+                value = f'{num//gcd}/{den//gcd}' if den//gcd != 1 else f'{num//gcd}'
+            elif tag == 0x829D: # f number: 5.6
+                if value[1] == 0: continue
+                value = f'{value[0]/value[1]:.1f}'
+            elif tag == 0x920A: # focal length: 50.0 mm
+                if value[1] == 0: continue
+                value = f'{value[0]/value[1]:.1f} mm'
+            elif tag == 0xA001: # color space
+                value = 'sRGB' if value == 1 else 'Uncalibrated'
+            exifDict[description] = str(value)
+        return exifDict
+
+    @staticmethod
+    def readRadianceHeader(f) -> dict[str,str]:
+        """ reads radiance (.hdr) text header and resolution line."""
+        exifDict : dict[str,str] = {}
+        if not f.readline(1024).startswith(b'#?'): raise ValueError('not a radiance file')
+        for i in range(128):
+            line : bytes = f.readline(1024).strip()
+            if not line: break
+            if line.startswith(b'EXPOSURE='): exifDict['Exposure'] = line[9:].decode('latin-1')
+            if line.startswith(b'SOFTWARE='): exifDict['Software'] = line[9:].decode('latin-1')
+        resolution : list[bytes] = f.readline(1024).split()
+        if len(resolution) == 4:
+            dims : dict[bytes, bytes] = {resolution[0][1:]: resolution[1], resolution[2][1:]: resolution[3]}
+            exifDict['Image Width'] = dims[b'X'].decode()
+            exifDict['Image Height'] = dims[b'Y'].decode()
+        return exifDict
+
     @staticmethod
     def recoverExifData(exif : dict[str, str]) -> dict[str, str]:
         """ filter raw dict to recover some data:
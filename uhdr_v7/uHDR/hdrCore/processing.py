@@ -25,14 +25,14 @@ package hdrCore consists of the core classes for HDR imaging.
 # -----------------------------------------------------------------------------
 # --- Import ------------------------------------------------------------------
 # -----------------------------------------------------------------------------
-import copy, colour, skimage.transform, math, os
+import copy, colour, skimage.transform, math, os, threading
 import pathos.multiprocessing, multiprocessing, subprocess
 import numpy as np
 import skimage.transform
 import functools
 from geomdl import BSpline
 from geomdl import utilities
-from . import utils
+from . import utils, resample
 from core import image
 # RCZT 2023
 # from . import image, utils, numbafun, aesthetics
@@ -507,39 +507,37 @@ class resize(Processing):
     
     def compute(self,img, size=(None,None),anti_aliasing=False):
         """
-        Resize operator.
+        Resize operator: area-averaging resampling (see hdrCore.resample), float32, HDR values are not clipped.
 
         Args:
             img: hdrCore.image.Image
                 Required : hdr image
-            size: TODO
-                TODO
+            size: (int or None, int or None)
+                Optional : (height, width), aspect ratio is kept if one is None, height is 400 if both are None
             anti_aliasing: boolean
-                TODO
+                Optional : kept for compatibility, area averaging is always anti-aliased
                 
         Returns:
-            TODO
-                TODO
+            hdrCore.image.Image
+                resized image
         """
-        res = copy.deepcopy(img)
-        y, x, c =  tuple(res.cData.shape)
+        res = copy.deepcopy(img, {id(img.cData): None})     # colour data is not copied: replaced by resized colour data
+        y, x, c =  tuple(img.cData.shape)
         ny,nx = size
         if nx and (not ny): 
             factor = nx/x
-            res.cData = skimage.transform.resize(res.cData, (int(y * factor),nx ), anti_aliasing)
-            res.shape = res.cData.shape
+            shape = (int(y * factor),nx)
         elif (not nx) and ny:
             factor = ny/y
-            res.cData = skimage.transform.resize(res.cData, (ny,int(x * factor)), anti_aliasing)
-            res.shape = res.cData.shape
+            shape = (ny,int(x * factor))
         elif nx and ny:
-            res.cData = skimage.transform.resize(res.cData, (ny,nx), anti_aliasing)
-            res.shape = res.cData.shape
+            shape = (ny,nx)
         elif (not nx) and (not ny):
             ny=400
             factor = ny/y
-            res.cData = skimage.transform.resize(res.cData, (ny,int(x * factor)), anti_aliasing)
-            res.shape = res.cData.shape
+            shape = (ny,int(x * factor))
+        res.cData = resample.resize(img.cData, shape)
+        res.shape = res.cData.shape
         return res
 # -----------------------------------------------------------------------------
 # --- Class Ycurve -----------------------------------------------------------
@@ -606,8 +604,8 @@ class Ycurve(Processing):
             if Y.shape == FY.shape:
                 colorDataFY = np.interp(colorDataY, Y,FY)
 
-                # remove zeros
-                Ymin = np.amin(colorDataY[colorDataY>0])
+                # remove zeros (a black tile has no positive Y)
+                Ymin = np.amin(colorDataY[colorDataY>0]) if np.any(colorDataY>0) else 1.0
                 colorDataY[colorDataY==0] = Ymin
 
                 # transform colorData
@@ -696,12 +694,15 @@ class colorEditor(Processing):
                                 'tolerance': 0.1,
                                 'edit': {'hue':0.0,'exposure':0.0,'contrast':0.0,'saturation':0.0}, 
                                 'mask': False}                
+                maxima ((float,float), Optional): chroma and lightness maxima of whole image (see colorEditor.maxima),
+                    default: maxima of img (required when img is a tile of an image)
                 
         Returns:
             (hdrCore.image.Image): output image
                 
         """
         start = timer()
+        maxima = kwargs.pop('maxima', None)
         defaultValue= {'selection': {'lightness': (0,100),'chroma': (0,100),'hue':(0,360)}, 
                        'tolerance': 0.1,
                        'edit': {'hue':0.0,'exposure':0.0,'contrast':0.0,'saturation':0.0}, 
@@ -736,18 +737,19 @@ class colorEditor(Processing):
                     colorLCH = colour.Lab_to_LCHab(colorLab)
                 covnEnd = timer()
 
-            # selection from colorLCH
-            colorDataHue =          copy.deepcopy(colorLCH[:,:,2])
-            colorDataChroma =       copy.deepcopy(colorLCH[:,:,1])
-            colorDataLightness =    copy.deepcopy(colorLCH[:,:,0])
+            # selection from colorLCH (read only)
+            colorDataHue =          colorLCH[:,:,2]
+            colorDataChroma =       colorLCH[:,:,1]
+            colorDataLightness =    colorLCH[:,:,0]
 
             # selection mask
             hMin, hMax = kwargs['selection']['hue'] if 'hue' in kwargs['selection'].keys() else defaultValue['selection']['hue']
             cMin, cMax = kwargs['selection']['chroma'] if 'chroma' in kwargs['selection'].keys() else defaultValue['selection']['chroma']
             lMin, lMax = kwargs['selection']['lightness']if 'hue' in kwargs['selection'].keys() else defaultValue['selection']['lightness']
             # take into account Chroma, Lightness range
-            cMax = cMax*max(100.0,np.amax(colorDataChroma))/100.0
-            lMax = lMax*max(100.0,np.amax(colorDataLightness))/100.0
+            chromaMax, lightnessMax = maxima if maxima != None else (np.amax(colorDataChroma), np.amax(colorDataLightness))
+            cMax = cMax*max(100.0,chromaMax)/100.0
+            lMax = lMax*max(100.0,lightnessMax)/100.0
 
             # tolerance
             hueTolerance = kwargs['tolerance']*360      # hue range ~ 360
@@ -757,69 +759,81 @@ class colorEditor(Processing):
 
             maskStart = timer()
 
-            lightnessMask =     utils.NPlinearWeightMask(colorDataLightness, lMin, lMax, lightTolerance)
-            chromaMask =        utils.NPlinearWeightMask(colorDataChroma, cMin, cMax, chromaTolerance)
-            hueMask =           utils.NPlinearWeightMask(colorDataHue, hMin, hMax, hueTolerance)
+            # candidate pixels: mask is zero out of ]min-tolerance, max+tolerance] (see utils.NPlinearWeightMask)
+            # masks and edits are computed on candidate pixels only: other pixels are unchanged (x*0 + y*1 = y)
+            candidates =    ~((colorDataHue <= hMin - hueTolerance) | (colorDataHue > hMax + hueTolerance))
+            candidates &=   ~((colorDataChroma <= cMin - chromaTolerance) | (colorDataChroma > cMax + chromaTolerance))
+            candidates &=   ~((colorDataLightness <= lMin - lightTolerance) | (colorDataLightness > lMax + lightTolerance))
+            index = np.nonzero(candidates)
+
+            colorLCHsel =       colorLCH[index]
+            lightnessMask =     utils.NPlinearWeightMask(colorLCHsel[:,0:1], lMin, lMax, lightTolerance)[:,0]
+            chromaMask =        utils.NPlinearWeightMask(colorLCHsel[:,1:2], cMin, cMax, chromaTolerance)[:,0]
+            hueMask =           utils.NPlinearWeightMask(colorLCHsel[:,2:3], hMin, hMax, hueTolerance)[:,0]
 
             maskEnd = timer()
 
             mask = np.minimum(lightnessMask, np.minimum(chromaMask,hueMask))
-            compMask = 1.0 - mask
-            # hueShift (in Lch)
-            hueShift =  kwargs['edit']['hue']  if 'hue' in kwargs['edit'].keys() else defaultValue['edit']['hue']
-            if hueShift != 0.0:
-                colorLCH[:,:,2] = ((colorLCH[:,:,2]+hueShift)%360)*mask + colorLCH[:,:,2]*compMask
-
-            # saturation (in Lch)
-            saturation = kwargs['edit']['saturation'] if 'saturation' in kwargs['edit'].keys() else defaultValue['edit']['saturation']
-            if saturation != 0 :
-                gamma = 1/((saturation/25)+1) if saturation >= 0 else (-saturation/25)+1
-                colorLCH[:,:,1] =np.power(colorLCH[:,:,1]/100, gamma)*100*mask + colorLCH[:,:,1]*compMask
-
-            # exposure (in RGB)
-            ev =  kwargs['edit']['exposure'] if 'exposure' in kwargs['edit'].keys() else defaultValue['edit']['exposure']
-            if ev != 0.0 :
-                colorRGB = Lch_to_sRGB(colorLCH,apply_cctf_encoding=False, clip=False)
-                colorRGBev = copy.deepcopy(colorRGB*math.pow(2,ev))
-                colorRGBev[:,:,0] = colorRGBev[:,:,0]*mask
-                colorRGBev[:,:,1] = colorRGBev[:,:,1]*mask
-                colorRGBev[:,:,2] = colorRGBev[:,:,2]*mask
-
-                colorRGB[:,:,0] = colorRGB[:,:,0]*compMask
-                colorRGB[:,:,1] = colorRGB[:,:,1]*compMask
-                colorRGB[:,:,2] = colorRGB[:,:,2]*compMask
-                colorRGB = colorRGB + colorRGBev
-
-            # contrast (in RGB prime)
-            con =  kwargs['edit']['contrast'] if 'exposure' in kwargs['edit'].keys() else defaultValue['edit']['contrast']
-            if con != 0 :
-                con = con/100
-                maxContrastFactor = 2.0
-                if con>=0.0:
-                    scalingFactor = 1*(1-con)+maxContrastFactor*con
-                else:
-                    con = -con
-                    scalingFactor = 1*(1-con)+maxContrastFactor*con
-                    scalingFactor = 1/scalingFactor
 
-                pivot = math.pow(2,ev)*(lMin+lMax)/2/100
+            if kwargs['mask']:
+                # mask preview: edits are not computed
+                fullMask = np.zeros(candidates.shape)
+                fullMask[index] = mask
+                res.cData = np.stack((fullMask,fullMask,fullMask), axis=-1)
+                res.cSpace = image.ColorSpace.sRGB
+                res.linear = False
 
-                if not isinstance(colorRGB, np.ndarray):    colorRGB = Lch_to_sRGB(colorLCH,apply_cctf_encoding=True, clip=False)
-                else :                                      colorRGB = colour.cctf_encoding(colorRGB, function='sRGB')
-                
-                colorRGBcon = (colorRGB-pivot)*scalingFactor+pivot
+            else:
+                compMask = 1.0 - mask
+                # hueShift (in Lch)
+                hueShift =  kwargs['edit']['hue']  if 'hue' in kwargs['edit'].keys() else defaultValue['edit']['hue']
+                if hueShift != 0.0:
+                    colorLCHsel[:,2] = ((colorLCHsel[:,2]+hueShift)%360)*mask + colorLCHsel[:,2]*compMask
+
+                # saturation (in Lch)
+                saturation = kwargs['edit']['saturation'] if 'saturation' in kwargs['edit'].keys() else defaultValue['edit']['saturation']
+                if saturation != 0 :
+                    gamma = 1/((saturation/25)+1) if saturation >= 0 else (-saturation/25)+1
+                    colorLCHsel[:,1] =np.power(colorLCHsel[:,1]/100, gamma)*100*mask + colorLCHsel[:,1]*compMask
+
+                if hueShift != 0.0 or saturation != 0: colorLCH[index] = colorLCHsel
+
+                # exposure (in RGB)
+                ev =  kwargs['edit']['exposure'] if 'exposure' in kwargs['edit'].keys() else defaultValue['edit']['exposure']
+                if ev != 0.0 :
+                    colorRGB = Lch_to_sRGB(colorLCH,apply_cctf_encoding=False, clip=False)
+                    colorRGBsel = colorRGB[index]
+                    colorRGBev = colorRGBsel*math.pow(2,ev)
+                    colorRGB[index] = colorRGBsel*compMask[:,np.newaxis] + colorRGBev*mask[:,np.newaxis]
+
+                # contrast (in RGB prime)
+                con =  kwargs['edit']['contrast'] if 'exposure' in kwargs['edit'].keys() else defaultValue['edit']['contrast']
+                if con != 0 :
+                    con = con/100
+                    maxContrastFactor = 2.0
+                    if con>=0.0:
+                        scalingFactor = 1*(1-con)+maxContrastFactor*con
+                    else:
+                        con = -con
+                        scalingFactor = 1*(1-con)+maxContrastFactor*con
+                        scalingFactor = 1/scalingFactor
+
+                    pivot = math.pow(2,ev)*(lMin+lMax)/2/100
 
-                colorRGB[:,:,0] = colorRGBcon[:,:,0]*mask+ colorRGB[:,:,0]*compMask
-                colorRGB[:,:,1] = colorRGBcon[:,:,1]*mask+ colorRGB[:,:,1]*compMask
-                colorRGB[:,:,2] = colorRGBcon[:,:,2]*mask+ colorRGB[:,:,2]*compMask
+                    if not isinstance(colorRGB, np.ndarray):    colorRGB = Lch_to_sRGB(colorLCH,apply_cctf_encoding=True, clip=False)
+                    else :                                      colorRGB = colour.cctf_encoding(colorRGB, function='sRGB')
+                
+                    colorRGBsel = colorRGB[index]
+                    colorRGBcon = (colorRGBsel-pivot)*scalingFactor+pivot
+                    colorRGB[index] = colorRGBcon*mask[:,np.newaxis] + colorRGBsel*compMask[:,np.newaxis]
 
-                colorRGB = colour.cctf_decoding(colorRGB, function='sRGB')
+                    colorRGB = colour.cctf_decoding(colorRGB, function='sRGB')
 
-            # final step
-            if not isinstance(colorRGB, np.ndarray): colorRGB = Lch_to_sRGB(colorLCH,apply_cctf_encoding=False, clip=False)
-            res.cData = colorRGB
-            res.cSpace = image.ColorSpace.sRGB
-            res.linear = True
+                # final step
+                if not isinstance(colorRGB, np.ndarray): colorRGB = Lch_to_sRGB(colorLCH,apply_cctf_encoding=False, clip=False)
+                res.cData = colorRGB
+                res.cSpace = image.ColorSpace.sRGB
+                res.linear = True
 
         else:
             if res.cSpace.name == 'Lch':
@@ -830,19 +844,23 @@ class colorEditor(Processing):
                 res.cSpace = image.ColorSpace.sRGB
                 res.linear = True
 
-        showMask = kwargs['mask']
-        if showMask:
-            res.cData[:,:,0] = copy.deepcopy(mask)
-            res.cData[:,:,1] = copy.deepcopy(mask)
-            res.cData[:,:,2] = copy.deepcopy(mask)
-
-            res.cSpace = image.ColorSpace.sRGB
-            res.linear = False
-
         end = timer()
         # print(" [PROCESS-PROFILING](",end - start,") >> colorEditor(",img.name,"):", kwargs)
 
         return res
+
+    def maxima(self, img):
+        """return chroma and lightness maxima of image (range of selection, see compute).
+
+        Args:
+            img (hdrCore.image.Image, Required): input image
+
+        Returns:
+            (float, float): chroma and lightness maxima
+        """
+        if img.cSpace.name == 'Lch':    colorLCH = img.cData
+        else:                           colorLCH = colour.Lab_to_LCHab(sRGB_to_Lab(img.cData, apply_cctf_decoding=not img.linear))
+        return float(np.amax(colorLCH[:,:,1])), float(np.amax(colorLCH[:,:,0]))
 # -----------------------------------------------------------------------------
 # --- Class lightnessMask ----------------------------------------------------
 # -----------------------------------------------------------------------------
@@ -890,13 +908,17 @@ class lightnessMask(Processing):
                 res.linear = False
 
             colorDataY = sRGB_to_XYZ(res.cData, apply_cctf_decoding=False)[:,:,1]
-            mask = copy.deepcopy(res.cData)
 
-            for key in rangeMask.keys():
-                if kwargs[key]: # mask on
-                    mask[(colorDataY >= rangeMask[key][0]/100)*(colorDataY<rangeMask[key][1]/100),:] = np.asarray(maskColor[key])
+            # single pass: Y -> band index (0: Y < 0, 1..5: rangeMask keys, 6: Y >= 1 or nan)
+            bandEdges = [rangeMask[key][0]/100 for key in rangeMask.keys()] + [1.0]
+            bands = np.digitize(colorDataY, bandEdges)
+
+            # look up tables: band index -> mask on, mask color
+            bandOn = np.asarray([False] + [kwargs[key] for key in rangeMask.keys()] + [False])
+            bandColor = np.asarray([[0,0,0]] + [maskColor[key] for key in rangeMask.keys()] + [[0,0,0]], dtype=res.cData.dtype)
 
-            res.cData = mask
+            # res.cData is a copy: mask is set in place
+            np.copyto(res.cData, bandColor[bands], where=bandOn[bands][:,:,np.newaxis])
         
         end = timer()
         # print(" [PROCESS-PROFILING](",end - start,") >> lightnessMask(",res.name,"):", kwargs)
@@ -911,7 +933,10 @@ class geometry(Processing):
     """
     
     def compute(self, img, **kwargs): 
-        """geometry operator.
+        """geometry operator: crop to ratio, rotation, crop of the largest centered rectangle of the rotated image.
+            single pass: output rectangle and inverse mapping are computed up front (see mapping), only output pixels are interpolated 
+            (bilinear, float32, hdrCore.resample.warp). point-wise nodes commute with geometry (up to interpolation): 
+            it can be applied early (input image) or late (output image, region of interest: see ProcessPipe.computeRoi).
 
         Args:
             img (hdrCore.image.Image,Required): input image
@@ -932,37 +957,276 @@ class geometry(Processing):
         up =        kwargs['up']        if 'up' in kwargs.keys()        else defaultValue['up']
         rotation =  kwargs['rotation']  if 'rotation' in kwargs.keys()  else defaultValue['rotation']
 
-        # results image
-        res = copy.deepcopy(img)
+        # results image: output rectangle (crop to ratio, rotation, crop of rotated image) computed up front, 
+        # only output pixels are computed (inverse mapping, see mapping)
+        res = copy.deepcopy(img, {id(img.cData): None})     # colour data is not copied: replaced by output colour data
+        shape, A, b, bounds = self.mapping(img.cData.shape, **kwargs)
 
-        ##if kwargs != defaultValue:
-        h,w, c = res.cData.shape
-        imgRatio = w/h
+        if rotation == 0:
+            res.cData = img.cData[bounds[0]:bounds[1], bounds[2]:bounds[3],:]
+        else:
+            res.cData = resample.warp(img.cData, shape, A, b, bounds)
+        res.shape = res.cData.shape
 
+        end = timer()
+        # print(" [PROCESS-PROFILING] (",end-start,")>> geometry(",res.name,"):", kwargs)
+
+        return res
+
+    def mapping(self, shape, **kwargs):
+        """return output image shape and affine mapping from output image pixels to input image pixels (same crop and rotation as compute):
+            input (row, col) = A @ output (row, col) + b
+            input pixels outside bounds (crop to ratio) are black (0) for interpolation, as in compute.
+
+        Args:
+            shape ((int,int), Required): input image shape (height, width)
+            kwargs (dict,Optionnal) : parameters (see compute)
+
+        Returns:
+            ((int,int), numpy.ndarray, numpy.ndarray, (int,int,int,int)): output shape (height, width), A (2x2), b (2), bounds (row min, row max, col min, col max)
+        """
+        defaultValue = { 'ratio': (16,9), 'up': 0,'rotation': 0.0}
+        if not kwargs: kwargs = defaultValue  # default value 
+        ratio =     kwargs['ratio']     if 'ratio' in kwargs.keys()     else defaultValue['ratio']
+        up =        kwargs['up']        if 'up' in kwargs.keys()        else defaultValue['up']
+        rotation =  kwargs['rotation']  if 'rotation' in kwargs.keys()  else defaultValue['rotation']
+
+        # crop to ratio: offset (oy, ox) of cropped image
+        h, w = shape[0], shape[1]
+        rows, cols = range(h), range(w)
+        imgRatio = w/h
         if int(imgRatio*1000) != int(ratio[0]/ratio[1]*1000):
             if imgRatio < (ratio[0]/ratio[1]):
                 hh16x9 = int(w*ratio[1]/ratio[0]/2)
                 ch = h//2
                 up = int((h//2-hh16x9)*up/100)
-                res.cData = res.cData[(ch-hh16x9-up):(ch+hh16x9-up),:,:]
-                res.shape = res.cData.shape
+                rows = rows[(ch-hh16x9-up):(ch+hh16x9-up)]
             else:
                 ww16x9 = int(h*ratio[0]/ratio[1]/2)
                 ch = w//2
-                res.cData = res.cData[:,(ch-ww16x9):(ch+ww16x9),:]
-                res.shape = res.cData.shape
+                cols = cols[(ch-ww16x9):(ch+ww16x9)]
+        oy, ox = (rows[0] if len(rows) else 0), (cols[0] if len(cols) else 0)
+        h, w = len(rows), len(cols)
+        bounds = (oy, oy+h, ox, ox+w)
+
+        if rotation == 0: return (h, w), np.eye(2), np.array([oy, ox], dtype=np.float64), bounds
+
+        # rotation around center (as skimage.transform.rotate) then crop of the largest centered rectangle
+        hh,ww = utils.croppRotated(h,w,rotation)
+        r0, r1 = int(h/2-hh/2), int(h/2+hh/2)
+        c0, c1 = int(w/2-ww/2), int(w/2+ww/2)
+        rows, cols = range(h)[r0:r1], range(w)[c0:c1]
+        r0, c0 = (rows[0] if len(rows) else 0), (cols[0] if len(cols) else 0)
+
+        cy, cx = h/2-0.5, w/2-0.5
+        cosA, sinA = math.cos(math.radians(rotation)), math.sin(math.radians(rotation))
+        A = np.array([[cosA, sinA],[-sinA, cosA]])
+        b = np.array([oy + cy + sinA*(c0-cx) + cosA*(r0-cy),
+                      ox + cx + cosA*(c0-cx) - sinA*(r0-cy)])
+        return (len(rows), len(cols)), A, b, bounds
+# -----------------------------------------------------------------------------
 
-        if rotation != 0 :
-            res.cData = skimage.transform.rotate(res.cData, rotation, clip = False, resize=False)
-            h,w, _ = res.cData.shape
-            hh,ww = utils.croppRotated(h,w,rotation)
-            res.cData = res.cData[int(h/2-hh/2):int(h/2+hh/2), int(w/2-ww/2):int(w/2+ww/2),:]
-            res.shape = res.cData.shape
+# -----------------------------------------------------------------------------
+# --- Class DecodedImageCache ------------------------------------------------
+# -----------------------------------------------------------------------------
+class DecodedImageCache(object):
+    """
+    class DecodedImageCache: short-lived, memory-budgeted cache of full size decoded images (class attributes, shared by all users).
+        full size computations (display, compare, export) read image files with DecodedImageCache.read(), so that an image is decoded once
+        for successive computations; DecodedImageCache.warm() is used to decode an image speculatively (worker thread) when it is selected.
+        Cached images are read only: read() returns a copy that shares color data and has its own metadata.
 
-        end = timer()
-        # print(" [PROCESS-PROFILING] (",end-start,")>> geometry(",res.name,"):", kwargs)
+    Class Attributes:
+        entries (dict): key: (filename, linear), value: [image, size (bytes), file modification time, last access time], least recently used first
+        loading (dict): key: filename, value: threading.Event set when decoding of filename is over (concurrent reads wait for it)
+        maxBytes (int): memory budget (bytes)
+        maxAge (float): entries not accessed for maxAge seconds are released
+        lock (threading.Lock): protects entries and loading
+
+    Methods:
+        read                    (static) return decoded image (decoded once)
+        warm                    (static) decode image into the cache
+        release                 (static) remove cached images of filename (all images if None)
+        nbytes                  (static) memory used by cached images
+    """
+    entries =   {}
+    loading =   {}
+    maxBytes =  1024*1024*1024
+    maxAge =    120.0
+    lock =      threading.Lock()
+
+    @staticmethod
+    def read(filename, linear=False):
+        """return full size image of filename: decoded once, then taken from the cache while it is not released (budget, age) and the file is not modified.
+
+        Args:
+            filename (str, Required): image filename
+            linear (bool, Optional): True to get the image decoded to linear (as ProcessPipe.setImage does), cached as another entry
+
+        Returns:
+            (hdrCore.image.Image)
+        """
+        if linear:
+            res = DecodedImageCache.__get(filename, True, load=False)
+            if res != None: return res
 
+        img = DecodedImageCache.__get(filename, False)
+        if not linear or img.linear: return img
+
+        img.cData = np.float32(colour.cctf_decoding(img.cData, function='sRGB'))
+        img.linear = True
+        DecodedImageCache.__set(filename, True, img)
+        return DecodedImageCache.copy(img)
+
+    @staticmethod
+    def warm(filename, linear=False):
+        """decode image of filename into the cache (speculative decoding, called from worker thread).
+
+        Args:
+            filename (str, Required): image filename
+            linear (bool, Optional): see read
+        """
+        DecodedImageCache.read(filename, linear)
+
+    @staticmethod
+    def release(filename=None):
+        """remove cached images of filename, all images if filename is None."""
+        with DecodedImageCache.lock:
+            for key in list(DecodedImageCache.entries.keys()):
+                if filename == None or key[0] == filename: del DecodedImageCache.entries[key]
+
+    @staticmethod
+    def nbytes():
+        """return memory used by cached images (bytes)."""
+        with DecodedImageCache.lock: return sum(entry[1] for entry in DecodedImageCache.entries.values())
+
+    @staticmethod
+    def copy(img):
+        """return copy of cached image: color data is shared (not modified by processings that set a new array), metadata is copied."""
+        res = copy.copy(img)
+        if hasattr(img.metadata, 'metadata'):
+            # metadata object: own dictionary, back reference to the copy
+            res.metadata = copy.copy(img.metadata)
+            res.metadata.metadata = copy.deepcopy(img.metadata.metadata)
+            res.metadata.image = res
+        else: res.metadata = copy.deepcopy(img.metadata)
         return res
+
+    @staticmethod
+    def __get(filename, linear, load=True):
+        # return copy of cached image, decode it if load is True (once: concurrent reads wait for the decoding thread), None if not cached and not load
+        while True:
+            with DecodedImageCache.lock:
+                DecodedImageCache.__purge()
+                entry = DecodedImageCache.entries.pop((filename, linear), None)
+                if entry != None and entry[2] == DecodedImageCache.mtime(filename):
+                    entry[3] = timer()
+                    DecodedImageCache.entries[(filename, linear)] = entry           # most recently used
+                    return DecodedImageCache.copy(entry[0])
+                if not load: return None
+                event = DecodedImageCache.loading.get(filename)
+                if event == None:
+                    event = threading.Event()
+                    DecodedImageCache.loading[filename] = event
+                    break
+            # decoding by another thread: wait then retry
+            event.wait()
+
+        try:
+            img = image.Image.read(filename)
+            DecodedImageCache.__set(filename, linear, img)
+        finally:
+            with DecodedImageCache.lock: del DecodedImageCache.loading[filename]
+            event.set()
+        return DecodedImageCache.copy(img)
+
+    @staticmethod
+    def __set(filename, linear, img):
+        # keep img (least recently used images are released to fit the memory budget, an image larger than the budget is not kept)
+        nbytes = img.cData.nbytes
+        if nbytes > DecodedImageCache.maxBytes: return
+        with DecodedImageCache.lock:
+            DecodedImageCache.entries[(filename, linear)] = [img, nbytes, DecodedImageCache.mtime(filename), timer()]
+            total = sum(entry[1] for entry in DecodedImageCache.entries.values())
+            while total > DecodedImageCache.maxBytes:
+                total -= DecodedImageCache.entries.pop(next(iter(DecodedImageCache.entries)))[1]
+
+    @staticmethod
+    def __purge():
+        # release entries not accessed for maxAge seconds (lock held)
+        now = timer()
+        for key in [k for k, entry in DecodedImageCache.entries.items() if now - entry[3] > DecodedImageCache.maxAge]:
+            del DecodedImageCache.entries[key]
+
+    @staticmethod
+    def mtime(filename):
+        """return modification time of filename, None if it does not exist."""
+        try: return os.path.getmtime(filename)
+        except OSError: return None
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# --- Class ProcessPipeSnapshot ----------------------------------------------
+# -----------------------------------------------------------------------------
+class ProcessPipeSnapshot(object):
+    """
+    class ProcessPipeSnapshot: immutable and hashable description of a process-pipe (process nodes and parameters, no image).
+        cheap to copy and to compare, use it instead of copy.deepcopy(processpipe) then build the executable process-pipe with
+        ProcessPipe.fromSnapshot(snapshot, img).
+
+    Attributes:
+        nodes (tuple): ((name, processing class, frozen parameters), ...)
+
+    Methods:
+        toDict                  (list) parameters as ProcessPipe.toDict()
+        freeze                  (static) dict, list, tuple to hashable tuples
+        thaw                    (static) inverse of freeze
+    """
+    __slots__ = ('nodes', 'hash')
+
+    class FrozenDict(tuple): pass
+    class FrozenList(tuple): pass
+
+    def __init__(self, nodes):
+        object.__setattr__(self, 'nodes', tuple(nodes))
+        object.__setattr__(self, 'hash', hash(self.nodes))
+
+    def __setattr__(self, name, value): raise AttributeError('ProcessPipeSnapshot is immutable')
+
+    def __hash__(self): return self.hash
+
+    def __eq__(self, other): return isinstance(other, ProcessPipeSnapshot) and self.hash == other.hash and self.nodes == other.nodes
+
+    def __copy__(self): return self
+
+    def __deepcopy__(self, memo): return self
+
+    def __repr__(self): return "<class ProcessPipeSnapshot: "+str(self.toDict())+">"
+
+    def toDict(self):
+        """return parameters of process nodes (same format as ProcessPipe.toDict()).
+
+        Returns:
+            (list)
+        """
+        return [{name: ProcessPipeSnapshot.thaw(params)} for name, process, params in self.nodes]
+
+    @staticmethod
+    def freeze(value):
+        """return hashable copy of value: dict and list are turned to FrozenDict and FrozenList (tuples)."""
+        if isinstance(value, dict):     return ProcessPipeSnapshot.FrozenDict((k, ProcessPipeSnapshot.freeze(v)) for k, v in value.items())
+        elif isinstance(value, list):   return ProcessPipeSnapshot.FrozenList(ProcessPipeSnapshot.freeze(v) for v in value)
+        elif isinstance(value, tuple):  return tuple(ProcessPipeSnapshot.freeze(v) for v in value)
+        elif isinstance(value, np.ndarray): return ProcessPipeSnapshot.FrozenList(ProcessPipeSnapshot.freeze(v) for v in value.tolist())
+        else: return value
+
+    @staticmethod
+    def thaw(value):
+        """return mutable copy of frozen value (inverse of freeze)."""
+        if isinstance(value, ProcessPipeSnapshot.FrozenDict):   return {k: ProcessPipeSnapshot.thaw(v) for k, v in value}
+        elif isinstance(value, ProcessPipeSnapshot.FrozenList): return [ProcessPipeSnapshot.thaw(v) for v in value]
+        elif isinstance(value, tuple):  return tuple(ProcessPipeSnapshot.thaw(v) for v in value)
+        else: return value
 # -----------------------------------------------------------------------------
 
 # -----------------------------------------------------------------------------
@@ -985,6 +1249,8 @@ class ProcessPipe(object):
         autoResize (boolean): True resize automatically image for faster computation
         maxSize (int): 
         maxWorking (int):       
+        preparedInputs (dict): prepared (resized, decoded) input images, key: source identity (see setImage)
+        maxPreparedInputs (int): number of prepared input images kept
 
     Methods:
         append:                 (int) append a process node (ProcessNode) to process pipe (self)
@@ -1000,12 +1266,30 @@ class ProcessPipe(object):
         updateProcessPipeMetadata ()
         updateHDRuseCase        ()
         export                  ()
+        isUpToDate              (bool) True if output image is computed with current parameters
+        getProxyInputImage      (hdrCore.image.Image) input image at reduced size (pyramid level)
+        halfSize                (static)
+        snapshot                (hdrCore.processing.ProcessPipeSnapshot) process nodes and parameters (no image)
+        fromSnapshot            (static) build process-pipe from snapshot
+        sourceKey               (static)
+        computeRoi              (hdrCore.image.Image) region of interest of output image at source resolution (tiled)
+        getOutputMapping        () output image shape and mapping to source image pixels
     """
     
     # autoresizing for fast computation
     autoResize =    True
     maxSize =       1200 
     maxWorking =    1200 
+
+    # prepared input images cache (shared by all process-pipes, least recently used is removed)
+    preparedInputs =    {}
+    maxPreparedInputs = 4
+    preparedLock =      threading.Lock()
+
+    # region of interest computation: tile size (source pixels), number of computed tiles kept per process-pipe
+    roiTileSize =       256
+    maxRoiTiles =       128
+    roiLock =           threading.Lock()
      
     # -------------------------------------------------------------------------
     # --- Class ProcessNode --------------------------------------------------
@@ -1079,14 +1363,42 @@ class ProcessPipe(object):
         
         /!\ - Les constructeurs n'apparaissent pas dans la doc générées par sphinx.
         """
-        self.originalImage = None # 
+        self.__originalImage = None # 
         self.__inputImage = None
         self.__outputImage = None
         self.processNodes = []
 
+        # processpipe metadata version and version set in images metadata (lazy update)
+        self.__metadataVersion = 0
+        self.__imageMetadataVersion = {'original': 0, 'input': 0, 'output': 0}
+
+        # source identity of input image, processpipe metadata version of output image
+        self.__sourceKey = None
+        self.__outputVersion = -1
+
+        # pyramid of input image (proxies for progressive preview): level n is input image size/2^n
+        self.__pyramid = []
+
+        # computed tiles of region of interest: source color data, parameters of process nodes (snapshot), tiles (key: (tile row, tile col))
+        self.__roiSource = None
+        self.__roiKey = None
+        self.__roiTiles = {}
+        self.__roiMaxima = None
+
         self.previewHDR = True
         self.previewHDR_process = None
 
+    @property
+    def originalImage(self):
+        """original image (before resize), its metadata are updated if processpipe parameters have changed."""
+        self.__updateImageMetadata('original', self.__originalImage)
+        return self.__originalImage
+
+    @originalImage.setter
+    def originalImage(self, img):
+        self.__originalImage = img
+        self.__imageMetadataVersion['original'] = self.__metadataVersion
+
     def append(self,process,paramDict=None,name=None):
         """
         TODO - Documentation de la méthode append
@@ -1117,12 +1429,15 @@ class ProcessPipe(object):
 
     def setImage(self,img):
         """set the input image to the process-pipeline:
-            (1) a copy of the image is set to 'originalImage'
-            (2) if ProcessPipe.autoResize: the image is resized
-            (3) the (resize) is set to '__inputImage'
-            (4) a copy of the resized image is set to '__outputImage' (for display)
+            (1) if ProcessPipe.autoResize: the image is resized
+            (2) a copy of the (resized) image is set to 'originalImage' and to '__outputImage' (for display)
+            (3) the (resized) image is decoded to linear and set to '__inputImage'
+            (4) if the source image changed: for all processes in the pipe 'requireUpdate' is set to True
             (5) initialize processpipe using 'img.metadata'  
-            (6) for all processes in the pipe 'requireUpdate' is set to True
+
+            (1-3) are done once per source image: the prepared images are kept in ProcessPipe.preparedInputs (key: source identity)
+            and shared (read only) by process-pipes. Setting again the same source image only sets the parameters that have changed,
+            so that only the process nodes from the first changed one are recomputed.
 
         Args:
             img (hdrCore.image.Image, Required) : input image
@@ -1133,51 +1448,110 @@ class ProcessPipe(object):
         # if pref.verbose: print(" [PROCESS] >> ProcessPipe.setImage(",img.name,")")
         # print(" [PROCESS] >> ProcessPipe.setImage(",img.name,")")
 
-        # resize input for faster computation
-        if ProcessPipe.autoResize:
-            height, width, channels = img.cData.shape
-            if (height>= width) and (height>ProcessPipe.maxWorking):
-                img = img.process(resize(),size=(ProcessPipe.maxWorking,None))
+        key = ProcessPipe.sourceKey(img)
+        sameSource = (key != None) and (key == self.__sourceKey)
+        metadata = img.metadata
 
-            elif (width>=height) and (width>ProcessPipe.maxWorking):   
-                img = img.process(resize(),size=(None,ProcessPipe.maxWorking))
+        prepared = ProcessPipe.getPreparedInput(key, img)
+        if prepared:
+            original, input = copy.copy(prepared[0]), copy.copy(prepared[1])
+            original.metadata, input.metadata = copy.deepcopy(metadata), metadata
+        else:
+            source = img.cData
+            # resize input for faster computation
+            if ProcessPipe.autoResize:
+                height, width, channels = img.cData.shape
+                if (height>= width) and (height>ProcessPipe.maxWorking):
+                    img = img.process(resize(),size=(ProcessPipe.maxWorking,None))
 
-        self.originalImage= copy.deepcopy(img)
+                elif (width>=height) and (width>ProcessPipe.maxWorking):   
+                    img = img.process(resize(),size=(None,ProcessPipe.maxWorking))
 
-        # a copy is set as __outputImage
-        self.__outputImage = copy.deepcopy(img)
-     
-        if not img.linear: 
-            start = timer()
-            img.colorData =     np.float32(colour.cctf_decoding(img.colorData, function='sRGB'))
-            img.linear =        True
+            original = copy.deepcopy(img)
+
+            if not img.linear: 
+                start = timer()
+                img.colorData =     np.float32(colour.cctf_decoding(img.colorData, function='sRGB'))
+                img.linear =        True
+
+                dt = timer() - start
+            input = img
+
+            ProcessPipe.setPreparedInput(key, source, original, input)
 
-            dt = timer() - start
+        self.originalImage = original
 
         # input image is set as __inputImage
-        self.__inputImage = img
+        self.__inputImage = input
 
-        # requireUpdate is set to True
-        for processNode in self.processNodes: processNode.requireUpdate = True
+        if not sameSource:
+            # a copy is set as __outputImage (shares color data with originalImage)
+            self.__outputImage = copy.copy(original)
+            self.__outputVersion = -1
+            self.__pyramid = []
 
-        # recover medata to initialize processPipe
+            # requireUpdate is set to True
+            for processNode in self.processNodes: processNode.requireUpdate = True
+        self.__sourceKey = key
+        self.__imageMetadataVersion['input'] = self.__imageMetadataVersion['output'] = self.__metadataVersion
 
-        if img.metadata:
-            processpipeMetadata = img.metadata
+        # recover medata to initialize processPipe: only changed parameters are set
+
+        if metadata:
+            processpipeMetadata = metadata
             if isinstance(processpipeMetadata,list):
                 for pMeta in processpipeMetadata:
 
                     key = list(pMeta.keys())[0]
                     param = pMeta[key]
                     idProcess = self.getProcessNodeByName(key)
-                    if idProcess != -1:
+                    if idProcess != -1 and (self.processNodes[idProcess].params != param or not sameSource):
                         self.setParameters(idProcess,param)
+                # images metadata are set to processpipe metadata (lazy update)
+                for k in self.__imageMetadataVersion: self.__imageMetadataVersion[k] = -1
+
+    @staticmethod
+    def sourceKey(img):
+        """return identity of source image: (name, color data id, shape, resize settings), None if image is not cached (autoResize off).
+
+        Args:
+            img (hdrCore.image.Image, Required) : source image
+
+        Returns:
+            (tuple)
+        """
+        if not ProcessPipe.autoResize: return None
+        return (img.name, id(img.cData), img.cData.shape, ProcessPipe.maxWorking)
+
+    @staticmethod
+    def getPreparedInput(key, img):
+        """return (original, input) prepared images of source image, None if not cached."""
+        if key == None: return None
+        with ProcessPipe.preparedLock:
+            entry = ProcessPipe.preparedInputs.pop(key, None)
+            if entry == None or entry[0] is not img.cData: return None     # id of a deleted color data
+            ProcessPipe.preparedInputs[key] = entry                         # most recently used
+            return entry[1], entry[2]
+
+    @staticmethod
+    def setPreparedInput(key, source, original, input):
+        """keep (original, input) prepared images of source image (color data)."""
+        if key == None: return
+        with ProcessPipe.preparedLock:
+            ProcessPipe.preparedInputs[key] = (source, copy.copy(original), copy.copy(input))
+            while len(ProcessPipe.preparedInputs) > ProcessPipe.maxPreparedInputs:
+                del ProcessPipe.preparedInputs[next(iter(ProcessPipe.preparedInputs))]
+
+    def setOutput(self, img, proxy=False):
+        """setOuput: set the output image (computed with current parameters, not copied: img must not be modified by caller)
 
-    def setOutput(self, img):
-        """setOuput: set the output image
+        Args:
+            img (hdrCore.image.Image, Required): output image
+            proxy (bool, Optional): True if img is computed from a proxy input image (see getProxyInputImage), output still requires computation
         """
-        self.__outputImage = copy.deepcopy(img)
-        pass
+        self.__outputImage = copy.copy(img)
+        self.__imageMetadataVersion['output'] = -1
+        self.__outputVersion = -1 if proxy else self.__metadataVersion
 
     def getInputImage(self):
         """return input image
@@ -1185,8 +1559,46 @@ class ProcessPipe(object):
         Returns:
             (hdrCore.image.Image)
         """
+        self.__updateImageMetadata('input', self.__inputImage)
         return self.__inputImage
 
+    def getProxyInputImage(self, maxSize):
+        """return input image at reduced size: the first level of the input image pyramid (size/2^n) whose largest side is lower than or equal to maxSize.
+            pyramid levels are computed when first requested (2x2 box filter of the previous level) and kept until the input image changes.
+
+        Args:
+            maxSize (int, Required): maximal size (width or height) of the proxy image
+
+        Returns:
+            (hdrCore.image.Image)
+        """
+        if not isinstance(self.__inputImage, image.Image): return None
+        if not self.__pyramid: self.__pyramid = [self.__inputImage]
+
+        for level in self.__pyramid:
+            if max(level.cData.shape[:2]) <= maxSize: return level
+        level = self.__pyramid[-1]
+        while max(level.cData.shape[:2]) > maxSize and min(level.cData.shape[:2]) >= 2:
+            level = ProcessPipe.halfSize(level)
+            self.__pyramid.append(level)
+        return level
+
+    @staticmethod
+    def halfSize(img):
+        """return a copy of img at half size (2x2 box filter, odd last row/column is dropped).
+
+        Args:
+            img (hdrCore.image.Image, Required): image
+
+        Returns:
+            (hdrCore.image.Image)
+        """
+        height, width = (img.cData.shape[0]//2)*2, (img.cData.shape[1]//2)*2
+        data = img.cData[:height,:width,:]
+        res = copy.copy(img)
+        res.cData = np.float32(data.reshape(height//2, 2, width//2, 2, -1).mean(axis=(1,3)))
+        return res
+
     def getImage(self,toneMap=True):
         """
         TODO - Documentation de la méthode getImage
@@ -1200,6 +1612,7 @@ class ProcessPipe(object):
                 TODO
         """
         if isinstance(self.originalImage, image.Image): # if pipe has an image
+            self.__updateImageMetadata('output', self.__outputImage)
             # conditionnal encoding or decoding to prime, linear
 
             if (not self.originalImage.linear) and self.__outputImage.linear:
@@ -1232,15 +1645,19 @@ class ProcessPipe(object):
             return self.__outputImage
         else: return None
 
-    def compute(self,progress=None):
+    def compute(self,progress=None,roi=None,source=None):
         """compute the processpipe
 
         Args:
             progress: (object with showMessage and repaint method) object used to display progress
+            roi ((int,int,int,int), Optional): region of interest (x, y, width, height), only this region is computed and returned (see computeRoi)
+            source (hdrCore.image.Image, Optional): source image of region of interest (see computeRoi)
 
         Returns:
-                
+            (hdrCore.image.Image): output image of region of interest (roi only)
         """
+        if roi != None: return self.computeRoi(roi, source)
+
         if self.__inputImage:
 
             if len(self.processNodes)>0: 
@@ -1262,6 +1679,145 @@ class ProcessPipe(object):
                         progress.showMessage('computing: '+processNode.name+' done!')
                         progress.repaint()
             self.__outputImage=self.processNodes[-1].outputImage
+            self.__imageMetadataVersion['output'] = -1
+            self.__outputVersion = self.__metadataVersion
+
+    def computeRoi(self, roi, source=None):
+        """compute a region of interest of the output image at source resolution (e.g. zoomed 1:1 viewport on full size image):
+            (1) the source region used by roi is computed with geometry.mapping (crop and rotation),
+            (2) process nodes before geometry (point-wise) are computed on the tiles (size: ProcessPipe.roiTileSize) of the source region
+                that are not already computed with current parameters: panning only computes new tiles,
+            (3) geometry node is applied to the region (same interpolation as geometry.compute).
+            input image, output image and process nodes are not modified.
+
+        Args:
+            roi ((int,int,int,int), Required): region of interest (x, y, width, height) in output image coordinates at source resolution
+            source (hdrCore.image.Image, Optional): linear source image (e.g. full size image, see DecodedImageCache), default: input image
+
+        Returns:
+            (hdrCore.image.Image): output image of region of interest (clipped to output image), None if no source image
+        """
+        if source == None: source = self.__inputImage
+        if source == None or len(self.processNodes) == 0: return None
+
+        geometryNode = self.processNodes[-1] if isinstance(self.processNodes[-1].process, geometry) else None
+        pointNodes = self.processNodes[:-1] if geometryNode else self.processNodes
+
+        shape, A, b, bounds = self.getOutputMapping(source)
+
+        # clip roi to output image
+        x, y, width, height = [int(v) for v in roi]
+        x, y = max(0, min(x, shape[1]-1)), max(0, min(y, shape[0]-1))
+        width, height = max(1, min(width, shape[1]-x)), max(1, min(height, shape[0]-y))
+
+        # source region: bounding box of roi corners (+1 pixel for interpolation), clipped to bounds
+        corners = np.array([[y, x], [y, x+width-1], [y+height-1, x], [y+height-1, x+width-1]], dtype=np.float64) @ A.T + b
+        r0, r1 = max(bounds[0], math.floor(corners[:,0].min())), min(bounds[1], math.floor(corners[:,0].max())+2)
+        c0, c1 = max(bounds[2], math.floor(corners[:,1].min())), min(bounds[3], math.floor(corners[:,1].max())+2)
+
+        with ProcessPipe.roiLock:
+            region = self.__computeTiles(source, pointNodes, r0, r1, c0, c1)
+
+        res = copy.copy(region)
+        if np.array_equal(A, np.eye(2)):
+            # no rotation: crop
+            y0, x0 = y+int(b[0])-r0, x+int(b[1])-c0
+            res.cData = region.cData[y0:y0+height, x0:x0+width,:]
+        else:
+            # rotation: inverse mapping (x, y) from roi pixels to region pixels
+            offset = A @ np.array([y, x], dtype=np.float64) + b - np.array([r0, c0], dtype=np.float64)
+            res.cData = resample.warp(region.cData, (height, width), A, offset)
+        res.shape = res.cData.shape
+        return res
+
+    def getOutputMapping(self, source=None):
+        """return output image shape and mapping from output image pixels to source image pixels (see geometry.mapping).
+
+        Args:
+            source (hdrCore.image.Image, Optional): source image, default: input image
+
+        Returns:
+            ((int,int), numpy.ndarray, numpy.ndarray, (int,int,int,int)): output shape (height, width), A (2x2), b (2), bounds (row min, row max, col min, col max)
+        """
+        if source == None: source = self.__inputImage
+        h, w = source.cData.shape[0], source.cData.shape[1]
+        if len(self.processNodes) > 0 and isinstance(self.processNodes[-1].process, geometry):
+            return self.processNodes[-1].process.mapping((h,w), **self.processNodes[-1].params)
+        return (h,w), np.eye(2), np.zeros(2), (0,h,0,w)
+
+    def __computeTiles(self, source, pointNodes, r0, r1, c0, c1):
+        # return region [r0:r1, c0:c1] of source computed by pointNodes: computed tiles are kept while source and parameters do not change
+        key = ProcessPipeSnapshot((p.name, type(p.process), ProcessPipeSnapshot.freeze(p.params)) for p in pointNodes)
+        if self.__roiSource is not source.cData or self.__roiKey != key:
+            self.__roiSource, self.__roiKey, self.__roiTiles, self.__roiMaxima = source.cData, key, {}, None
+
+        size = ProcessPipe.roiTileSize
+        h, w = source.cData.shape[0], source.cData.shape[1]
+        tiles = [(ty, tx) for ty in range(r0//size, (r1-1)//size+1) for tx in range(c0//size, (c1-1)//size+1)]
+
+        # missing tiles: span of missing tiles per tile row, consecutive rows with the same span are computed at once
+        bands = []
+        for ty in sorted(set(t[0] for t in tiles)):
+            missing = [t[1] for t in tiles if t[0] == ty and t not in self.__roiTiles]
+            if not missing: continue
+            span = (min(missing), max(missing)+1)
+            if bands and bands[-1][1] == ty and bands[-1][2] == span: bands[-1][1] = ty+1
+            else: bands.append([ty, ty+1, span])
+        if bands and self.__roiMaxima == None: self.__roiMaxima = self.__computeMaxima(source, pointNodes)
+        for ty0, ty1, (tx0, tx1) in bands:
+            img = copy.copy(source)
+            img.cData = source.cData[ty0*size:min(ty1*size,h), tx0*size:min(tx1*size,w),:]
+            for i, node in enumerate(pointNodes):
+                if i in self.__roiMaxima:   img = node.process.compute(img, maxima=self.__roiMaxima[i], **node.params)
+                else:                       img = node.process.compute(img, **node.params)
+            for ty in range(ty0, ty1):
+                for tx in range(tx0, tx1):
+                    tile = copy.copy(img)
+                    tile.cData = img.cData[(ty-ty0)*size:(ty-ty0+1)*size, (tx-tx0)*size:(tx-tx0+1)*size,:].copy()
+                    self.__roiTiles[(ty, tx)] = tile
+
+        # assemble region (tiles used are the most recently used)
+        first = self.__roiTiles[tiles[0]]
+        cData = np.empty((r1-r0, c1-c0, first.cData.shape[2]), dtype=first.cData.dtype)
+        for ty, tx in tiles:
+            tile = self.__roiTiles.pop((ty, tx))
+            self.__roiTiles[(ty, tx)] = tile
+            ya, yb, xa, xb = max(r0, ty*size), min(r1, (ty+1)*size), max(c0, tx*size), min(c1, (tx+1)*size)
+            cData[ya-r0:yb-r0, xa-c0:xb-c0,:] = tile.cData[ya-ty*size:yb-ty*size, xa-tx*size:xb-tx*size,:]
+        while len(self.__roiTiles) > max(ProcessPipe.maxRoiTiles, len(tiles)):
+            del self.__roiTiles[next(iter(self.__roiTiles))]
+
+        res = copy.copy(first)
+        res.cData = cData
+        res.shape = cData.shape
+        return res
+
+    def __computeMaxima(self, source, pointNodes):
+        """return chroma and lightness maxima of colorEditor inputs (key: index of node in pointNodes, see colorEditor.maxima).
+            tiles deliberately share the maxima of the preview (whole image at working resolution) instead of the maxima of the
+            full resolution source: the colour selection of a zoomed region is the one of the preview, and the maxima are computed
+            at the cost of a preview. input image is used, else source reduced as setImage does (process-pipe without input image).
+        """
+        img = self.__inputImage
+        if img == None:
+            height, width = source.cData.shape[0], source.cData.shape[1]
+            if height >= width and height > ProcessPipe.maxWorking:  img = resize().compute(source, size=(ProcessPipe.maxWorking,None))
+            elif width >= height and width > ProcessPipe.maxWorking: img = resize().compute(source, size=(None,ProcessPipe.maxWorking))
+            else:                                                    img = source
+        editors = [i for i, node in enumerate(pointNodes) if isinstance(node.process, colorEditor)]
+        maxima = {}
+        for i, node in enumerate(pointNodes[:editors[-1]+1] if editors else []):
+            if i in editors: maxima[i] = node.process.maxima(img)
+            if i < editors[-1]: img = node.process.compute(img, **node.params)
+        return maxima
+
+    def isUpToDate(self):
+        """return True if output image is computed with current parameters (no computation required).
+
+        Returns:
+            (bool)
+        """
+        return self.__outputVersion == self.__metadataVersion
 
     def setParameters(self,id,paramDicts):
         """
@@ -1338,6 +1894,32 @@ class ProcessPipe(object):
         """
         return self.__repr__()
 
+    def snapshot(self):
+        """return immutable description of process nodes and parameters (images are not copied).
+
+        Returns:
+            (hdrCore.processing.ProcessPipeSnapshot)
+        """
+        return ProcessPipeSnapshot((p.name, type(p.process), ProcessPipeSnapshot.freeze(p.params)) for p in self.processNodes)
+
+    @staticmethod
+    def fromSnapshot(snapshot, img=None):
+        """build a process-pipe from a snapshot, then set its input image (if any).
+
+        Args:
+            snapshot (hdrCore.processing.ProcessPipeSnapshot, Required): process nodes and parameters
+            img (hdrCore.image.Image, Optional): input image
+
+        Returns:
+            (hdrCore.processing.ProcessPipe)
+        """
+        pp = ProcessPipe()
+        for name, process, params in snapshot.nodes:
+            id = pp.append(process(), paramDict=None, name=name)
+            pp.setParameters(id, ProcessPipeSnapshot.thaw(params))
+        if img != None: pp.setImage(img)
+        return pp
+
     def toDict(self):
         """
         TODO - Documentation de la méthode toDict
@@ -1352,13 +1934,16 @@ class ProcessPipe(object):
 
     def updateProcessPipeMetadata(self):
         """
-        TODO - Documentation de la méthode updateProcessPipeMetadata
+        mark images metadata as outdated: metadata of an image are updated (deep copy of toDict())
+        only when the image is requested (originalImage, getInputImage, getImage), not at each setParameters.
         """
-        ppMeta = self.toDict()
-        # print(" [PROCESS] >> ProcessPipe.updateMetadata(","):",ppMeta)
-        if isinstance(self.originalImage,image.Image):  self.originalImage.metadata =   copy.deepcopy(ppMeta)
-        if isinstance(self.__inputImage,image.Image):   self.__inputImage.metadata =    copy.deepcopy(ppMeta)
-        if isinstance(self.__outputImage,image.Image):  self.__outputImage.metadata =   copy.deepcopy(ppMeta)
+        self.__metadataVersion += 1
+
+    def __updateImageMetadata(self, key, img):
+        """set processpipe metadata into img if they are outdated."""
+        if isinstance(img,image.Image) and self.__imageMetadataVersion[key] != self.__metadataVersion:
+            img.metadata = copy.deepcopy(self.toDict())
+            self.__imageMetadataVersion[key] = self.__metadataVersion
 
     def updateUserMeta(self,tagRootName,meta):
         """
@@ -1369,7 +1954,7 @@ class ProcessPipe(object):
                 TODO
         """
         # print(" [PROCESS] >> ProcessPipe.updateUserMeta(",")")
-        if isinstance(self.originalImage,image.Image):  self.originalImage.metadata.metadata[tagRootName] =   copy.deepcopy(meta)
+        if isinstance(self.__originalImage,image.Image):  self.__originalImage.metadata.metadata[tagRootName] =   copy.deepcopy(meta)
         if isinstance(self.__inputImage,image.Image):   self.__inputImage.metadata.metadata[tagRootName] =    copy.deepcopy(meta)
         if isinstance(self.__outputImage,image.Image):  self.__outputImage.metadata.metadata[tagRootName] =   copy.deepcopy(meta)
 
@@ -1386,13 +1971,13 @@ class ProcessPipe(object):
         Returns:
             (hdrCore.image.Image)
         """
-        # recover input and processpipe metadata
-        input = copy.deepcopy(self.originalImage)
+        # recover input and processpipe metadata (color data is not modified: no need to copy it)
+        input = copy.copy(self.originalImage)
         input.metadata = self.toDict()
         input.metadata.save()
 
-        # load full size image
-        img = image.Image.read(self.originalImage.path+'/'+self.originalImage.name)
+        # load full size image (decoded once, see DecodedImageCache)
+        img = DecodedImageCache.read(self.originalImage.path+'/'+self.originalImage.name, linear=True)
         if size: img = img.process(resize(),size=(None, size[1]))
 
         ProcessPipe.autoResize = False # set off autoresize
@@ -1422,3 +2007,57 @@ class ProcessPipe(object):
         self.compute()
 
         return res
+
+# -----------------------------------------------------------------------------
+# consistency check and benchmark of ProcessPipe.computeRoi (tiles) against ProcessPipe.compute (whole image):
+#   (1) tiles of the input image are equal to the crop of the whole image render (colorEditor maxima shared by tiles),
+#   (2) tiles of a full resolution source computed without input image (zoom worker) are equal to the ones computed
+#       by the process-pipe of the preview (colorEditor maxima of the preview).
+# run: python -m hdrCore.processing
+if __name__ == '__main__':
+    import warnings
+    from core.colourSpace import ColorSpace
+    warnings.filterwarnings('ignore')
+
+    def processPipe(rotation):
+        pp = ProcessPipe()
+        for process, name, params in [(exposure(), 'exposure', {'EV': 0.7}),
+                                      (contrast(), 'contrast', {'contrast': 20}),
+                                      (colorEditor(), 'colorEditor', {'selection': {'lightness': (20,80), 'chroma': (10,90), 'hue': (0,200)}, 'tolerance': 0.1,
+                                                                      'edit': {'hue': 10.0, 'exposure': 0.5, 'contrast': 10.0, 'saturation': 5.0}, 'mask': False}),
+                                      (geometry(), 'geometry', {'ratio': (16,9), 'up': 0, 'rotation': rotation})]:
+            id = pp.append(process, paramDict=None, name=name)
+            pp.setParameters(id, params)
+        return pp
+
+    rng = np.random.default_rng(0)
+    full = image.Image(np.float32(rng.random((2400, 3600, 3))*0.8), ColorSpace.sRGB, True, True, 'source')
+    full.metadata = None
+    ProcessPipe.autoResize = False
+    working = resize().compute(full, size=(None, ProcessPipe.maxWorking))
+
+    for rotation in [0.0, 4.0]:
+        # (1) tiles vs whole image
+        pp = processPipe(rotation)
+        pp.setImage(working)
+        start = timer()
+        pp.compute()
+        dtFull = timer() - start
+        whole = pp.processNodes[-1].outputImage.cData
+        errors = []
+        for roi in [(0, 0, 300, 200), (400, 250, 512, 300)]:
+            start = timer()
+            region = pp.compute(roi=roi).cData
+            dtRoi = timer() - start
+            x, y = roi[0], roi[1]
+            errors.append(np.abs(region - whole[y:y+region.shape[0], x:x+region.shape[1]]).max())
+        print(f'rotation {rotation}: whole image {dtFull:.3f}s, roi {dtRoi:.3f}s, max difference tiles/whole image {max(errors):.5f}')
+
+        # (2) zoom worker (no input image) vs preview process-pipe, full resolution source
+        worker = ProcessPipe.fromSnapshot(pp.snapshot())
+        roi = (1200, 700, 800, 500)
+        start = timer()
+        zoomed = worker.compute(roi=roi, source=full).cData
+        dtRoi = timer() - start
+        reference = pp.compute(roi=roi, source=full).cData
+        print(f'rotation {rotation}: full resolution roi {dtRoi:.3f}s, max difference zoom worker/preview process-pipe {np.abs(zoomed-reference).max():.5f}')
@@ -0,0 +1,247 @@
+# uHDR: HDR image editing software
+#   Copyright (C) 2021  remi cozot
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+# hdrCore project 2020
+# author: remi.cozot@univ-littoral.fr
+
+# -----------------------------------------------------------------------------
+# --- Package hdrCore ---------------------------------------------------------
+# -----------------------------------------------------------------------------
+"""
+package hdrCore consists of the core classes for HDR imaging.
+
+module resample: area-averaging resampling of colour data (replaces skimage.transform.resize on the hot paths).
+
+    downsizing: integer box reduction (mean of k x k pixels) followed by a separable area finish to the exact size,
+    upsizing: separable linear interpolation.
+    affine warp (rotation): inverse mapping of output pixels only, bilinear interpolation.
+    colour data are float32 throughout, output pixels are convex combinations of input pixels:
+    HDR values (> 1.0) are neither clipped nor ringing (no negative values).
+    rows are processed in bands by a pool of threads (numpy releases the GIL).
+"""
+
+# -----------------------------------------------------------------------------
+# --- Import ------------------------------------------------------------------
+# -----------------------------------------------------------------------------
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# -----------------------------------------------------------------------------
+# --- Package attributes ------------------------------------------------------
+# -----------------------------------------------------------------------------
+threads = min(8, os.cpu_count() or 1)       # number of threads
+bandRows = 64                               # number of output rows per band (temporary arrays of a band stay small)
+
+_pool = None
+
+# -----------------------------------------------------------------------------
+# --- Package functions -------------------------------------------------------
+# -----------------------------------------------------------------------------
+def resize(colorData, shape):
+    """resize colour data to shape.
+
+    Args:
+        colorData (numpy.ndarray, Required): colour data (height, width) or (height, width, channels)
+        shape (tuple of int, Required): (height, width), channels are kept
+
+    Returns:
+        (numpy.ndarray): resized colour data (float32)
+    """
+    ny, nx = int(shape[0]), int(shape[1])
+    if ny < 1 or nx < 1: raise ValueError(f'hdrCore.resample.resize: invalid shape {shape}')
+
+    data = np.asarray(colorData, dtype=np.float32)
+    y, x = data.shape[:2]
+    if (y, x) == (ny, nx): return data.copy()
+
+    # (1) integer box reduction
+    k = max(1, min(y // ny, x // nx))
+    if k > 1: data = boxReduce(data, k)
+
+    # (2) separable area finish (linear when upsizing)
+    iy, wy = weights(data.shape[0], ny)
+    ix, wx = weights(data.shape[1], nx)
+    res = np.empty((ny, nx) + data.shape[2:], dtype=np.float32)
+
+    def band(r0, r1):
+        rows = taps(data, iy[r0:r1], wy[r0:r1], 0)
+        res[r0:r1] = taps(rows, ix, wx, 1)
+
+    bands(band, ny)
+    return res
+
+def boxReduce(colorData, k):
+    """reduce colour data by integer factor k: mean of k x k pixels (last rows and columns that do not fill a box are dropped).
+
+    Args:
+        colorData (numpy.ndarray, Required): colour data (height, width) or (height, width, channels)
+        k (int, Required): reduction factor
+
+    Returns:
+        (numpy.ndarray): reduced colour data (float32)
+    """
+    data = np.asarray(colorData, dtype=np.float32)
+    y, x = data.shape[0] // k, data.shape[1] // k
+    channels = data.shape[2:]
+    res = np.empty((y, x) + channels, dtype=np.float32)
+    scale = np.float32(1.0 / (k * k))
+
+    def band(r0, r1):
+        # sum of strided rows then of strided columns (contiguous adds, faster than a reshape sum)
+        rows = data[r0*k:r1*k:k, :x*k].copy()
+        for i in range(1, k): rows += data[r0*k+i:r1*k:k, :x*k]
+        cols = rows[:, 0::k].copy()
+        for j in range(1, k): cols += rows[:, j::k]
+        np.multiply(cols, scale, out=res[r0:r1])
+
+    bands(band, y)
+    return res
+
+def weights(n, m):
+    """return taps (indices and weights) of the resampling of n pixels to m pixels along an axis.
+
+    Args:
+        n (int, Required): number of input pixels
+        m (int, Required): number of output pixels
+
+    Returns:
+        (numpy.ndarray, numpy.ndarray): indices (m, taps) and weights (m, taps, float32), weights of an output pixel sum to 1
+    """
+    if m <= n:
+        # area: overlap of output pixel [i*s, (i+1)*s) with input pixels [j, j+1)
+        s = n / m
+        start = np.arange(m) * s
+        end = start + s
+        first = np.floor(start).astype(np.intp)
+        count = int(np.ceil(s)) + 1
+        idx = first[:, np.newaxis] + np.arange(count)
+        w = np.minimum(end[:, np.newaxis], idx + 1) - np.maximum(start[:, np.newaxis], idx)
+        w = np.clip(w, 0, None) / s
+    else:
+        # linear: pixel centers, clamped at borders
+        pos = np.clip((np.arange(m) + 0.5) * (n / m) - 0.5, 0, n - 1)
+        first = np.floor(pos).astype(np.intp)
+        idx = np.stack([first, first + 1], axis=-1)
+        w = np.stack([1 - (pos - first), pos - first], axis=-1)
+    idx = np.minimum(idx, n - 1)
+    return idx, (w / w.sum(axis=1, keepdims=True)).astype(np.float32)
+
+def warp(colorData, shape, A, b, bounds=None):
+    """affine warp of colour data: output pixel (row, col) is the bilinear interpolation of input colour data at A @ (row, col) + b.
+    only output pixels are computed (inverse mapping), input pixels outside bounds are black (0).
+
+    Args:
+        colorData (numpy.ndarray, Required): colour data (height, width) or (height, width, channels)
+        shape (tuple of int, Required): output shape (height, width)
+        A (numpy.ndarray, Required): 2x2 matrix (see hdrCore.processing.geometry.mapping)
+        b (numpy.ndarray, Required): offset (row, col)
+        bounds (tuple of int, Optional): input pixels used (row min, row max, col min, col max), default: all input pixels
+
+    Returns:
+        (numpy.ndarray): warped colour data (float32)
+    """
+    data = np.asarray(colorData, dtype=np.float32)
+    if data.ndim == 2: return warp(data[..., np.newaxis], shape, A, b, bounds)[..., 0]
+    h, w, c = data.shape
+    if bounds is None: bounds = (0, h, 0, w)
+    top, bottom, left, right = [int(v) for v in bounds]
+    A, b = np.asarray(A, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    ny, nx = int(shape[0]), int(shape[1])
+    res = np.empty((ny, nx, c), dtype=np.float32)
+    pixels = np.ascontiguousarray(data).reshape(-1, c)
+    cols = np.arange(nx, dtype=np.float64)
+
+    def fetch(yi, xi, inside):
+        # gather of pixels (yi, xi), pixels outside bounds are black
+        if inside: return pixels.take(yi*w + xi, axis=0)
+        valid = (yi >= top) & (yi < bottom) & (xi >= left) & (xi < right)
+        p = pixels.take(np.clip(yi, 0, h-1)*w + np.clip(xi, 0, w-1), axis=0)
+        p[~valid] = 0
+        return p
+
+    def band(r0, r1):
+        rows = np.arange(r0, r1, dtype=np.float64)[:, np.newaxis]
+        y = A[0,1]*cols + (A[0,0]*rows + b[0])
+        x = A[1,1]*cols + (A[1,0]*rows + b[1])
+        inside = y.min() >= top and x.min() >= left and y.max() < bottom-1 and x.max() < right-1
+        y0, x0 = np.floor(y), np.floor(x)
+        fy, fx = (y - y0).astype(np.float32)[..., np.newaxis], (x - x0).astype(np.float32)[..., np.newaxis]
+        y0, x0 = y0.astype(np.intp), x0.astype(np.intp)
+
+        # bilinear interpolation: p00 + fx*(p01-p00) on both rows, then along y (in place)
+        p00, p01 = fetch(y0, x0, inside), fetch(y0, x0+1, inside)
+        p01 -= p00; p01 *= fx; p00 += p01
+        p10, p11 = fetch(y0+1, x0, inside), fetch(y0+1, x0+1, inside)
+        p11 -= p10; p11 *= fx; p10 += p11
+        p10 -= p00; p10 *= fy
+        np.add(p00, p10, out=res[r0:r1])
+
+    bands(band, ny)
+    return res
+
+def taps(data, idx, w, axis):
+    """apply taps (see weights) along axis (0: rows, 1: columns) of data."""
+    shape = (-1, 1) if axis == 0 else (1, -1)
+    shape = shape + (1,) * (data.ndim - 2)
+    res = None
+    for t in range(idx.shape[1]):
+        term = np.take(data, idx[:, t], axis=axis) * w[:, t].reshape(shape)
+        if res is None: res = term
+        else: res += term
+    return res
+
+def bands(fn, rows):
+    """call fn(r0, r1) on bands of (at most bandRows) rows, bands are processed by the thread pool."""
+    global _pool
+    spans = [(r0, min(r0 + bandRows, rows)) for r0 in range(0, rows, bandRows)]
+    if threads == 1 or len(spans) == 1:
+        for r0, r1 in spans: fn(r0, r1)
+        return
+
+    if _pool is None: _pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='resample')
+    for future in [_pool.submit(fn, r0, r1) for r0, r1 in spans]: future.result()
+
+# -----------------------------------------------------------------------------
+# benchmark: resample.resize vs skimage.transform.resize (working image and thumbnail sizes),
+#            resample.warp vs skimage.transform.rotate of the whole image (rotation then crop, see hdrCore.processing.geometry)
+if __name__ == '__main__':
+    import skimage.transform
+    from timeit import default_timer as timer
+
+    rng = np.random.default_rng(0)
+    img = (rng.random((4000, 6000, 3), dtype=np.float32) * 4.0)      # HDR values up to 4.0
+    for shape in [(1000, 1500), (533, 800), (333, 500)]:
+        start = timer()
+        ref = skimage.transform.resize(img, shape, anti_aliasing=True)
+        dtSk = timer() - start
+        start = timer()
+        res = resize(img, shape)
+        dt = timer() - start
+        print(f'{img.shape[:2]} > {shape}: skimage {dtSk:.3f}s, resample {dt:.3f}s (x{dtSk/dt:.1f}), ' +
+              f'mean {ref.mean():.4f}/{res.mean():.4f}, max {res.max():.3f}, min {res.min():.3f}')
+
+    import math
+    for angle in [3.0, 12.5]:
+        h, w = img.shape[:2]
+        hh, ww = int(h*0.8), int(w*0.8)
+        start = timer()
+        ref = skimage.transform.rotate(img, angle, clip=False)[(h-hh)//2:(h-hh)//2+hh, (w-ww)//2:(w-ww)//2+ww]
+        dtSk = timer() - start
+        cosA, sinA = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+        A = np.array([[cosA, sinA], [-sinA, cosA]])
+        b = np.array([h/2-0.5, w/2-0.5]) - A @ np.array([hh/2-0.5, ww/2-0.5])
+        start = timer()
+        res = warp(img, (hh, ww), A, b)
+        dt = timer() - start
+        print(f'rotation {angle}: skimage {dtSk:.3f}s, resample {dt:.3f}s (x{dtSk/dt:.1f}), max difference {np.abs(ref-res).max():.5f}')
@@ -40,6 +40,9 @@ class Prefs:
 
     gallerySize : tuple[int,int] = (2,2)
 
+    # progressive preview (edit): proxy size (px), input interval (ms) below which editing is a drag, delay (ms) before refinement
+    preview : dict[str, int|bool] = {'enabled': True, 'proxySize': 300, 'dragInterval': 100, 'settleDelay': 150}
+
     #
 
     # constructor
@@ -79,6 +82,7 @@ class Prefs:
             # gui
             if "gui" in allPrefs.keys():
                 if "gallerySize" in allPrefs["gui"].keys(): Prefs.gallerySize = tuple(allPrefs["gui"]["gallerySize"])
+                if "preview" in allPrefs["gui"].keys(): Prefs.preview = {**Prefs.preview, **allPrefs["gui"]["preview"]}
 
     @staticmethod
     def __str__() -> str:
@@ -96,6 +100,7 @@ class Prefs:
             res+= f'\t {ext} \n'
 
         res +=f'gallery size: {Prefs.gallerySize}'
+        res +=f'preview: {Prefs.preview}'
 
         res += f'tags: {Prefs.tags}'
         return res
@@ -52,6 +52,7 @@ if __name__ == '__main__':
 
     appQt : QApplication = QApplication(sys.argv)
     appHDR : App = App()
+    appQt.aboutToQuit.connect(appHDR.imagesManagement.journal.flushSync)
 
     sys.exit(appQt.exec())
 # ------------------------------------------------------------------------------------------